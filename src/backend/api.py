@@ -14,6 +14,6 @@ api = FastAPI(lifespan=lifespan)
 @api.post("/prompt_model")
 async def prompt_model(query: Query) -> str:
     openai_prompt = OpenAIPrompt()
-    response = openai_prompt.generate(query.text)
+    response = await openai_prompt.generate_async(query.text)
 
     return response
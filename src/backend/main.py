@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
+from tools.async_db_tools import close_async_connection_pools
 
 ml_models = {}
 
@@ -8,4 +9,5 @@ async def lifespan(app: FastAPI):
     ml_models["summarizer"] = None
     #ModelCatalog().get_llm_toolkit(tool_list=["sql"])
     yield
+    await close_async_connection_pools()
     ml_models.clear()
@@ -0,0 +1,48 @@
+"""Compares reading vector embeddings from the legacy JSON file with reading them from the binary snapshot.
+
+Run from the src folder:
+    python -m benchmarks.embeddings_snapshot_benchmark
+"""
+import os
+import json
+import time
+import argparse
+import tempfile
+import numpy as np
+from tools.embeddings_snapshot import convert_embeddings_json_to_snapshot, iter_embeddings_snapshot
+
+
+def load_json_embeddings(json_file_path: str) -> int:
+    with open(json_file_path, "r") as fp:
+        json_data = json.load(fp)
+    # The same conversion pymilvus does for a row based insert.
+    return sum(len([float(v) for v in item["embedding"]]) for item in json_data)
+
+
+def load_snapshot_embeddings(snapshot_file_path: str, batch_size: int) -> int:
+    # The same conversion the column based insert of vector_db_tool does.
+    return sum(len(embeddings.tolist()) * embeddings.shape[1]
+               for _, embeddings in iter_embeddings_snapshot(snapshot_file_path, batch_size))
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmarks the vector embeddings file formats.")
+    arg_parser.add_argument("--rows", type=int, default=5000, help="number of embeddings")
+    arg_parser.add_argument("--dim", type=int, default=1024, help="embeddings dimension")
+    arg_parser.add_argument("--batch-size", type=int, default=1000, help="snapshot insert batch size")
+    args = arg_parser.parse_args()
+    rnd = np.random.default_rng(133)
+    embeddings = rnd.standard_normal((args.rows, args.dim), dtype=np.float32)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_file_path = os.path.join(temp_dir, "vector_embeddings.json")
+        snapshot_file_path = os.path.join(temp_dir, "vector_embeddings.bin")
+        with open(json_file_path, "w") as fp:
+            json.dump([{"id": i + 1, "embedding": [float(v) for v in e]} for i, e in enumerate(embeddings)], fp)
+        convert_embeddings_json_to_snapshot(json_file_path, snapshot_file_path)
+        for name, file_path, load_fn in [("json", json_file_path, load_json_embeddings),
+                                         ("snapshot", snapshot_file_path,
+                                          lambda path: load_snapshot_embeddings(path, args.batch_size))]:
+            start = time.perf_counter()
+            load_fn(file_path)
+            elapsed = time.perf_counter() - start
+            print(f"{name:>8}: {os.path.getsize(file_path) / 2 ** 20:8.1f} MiB, {elapsed * 1000:9.1f} ms")
@@ -0,0 +1,85 @@
+"""Compares the accuracy, latency and throughput of the inference backends on CPU.
+
+Embeddings are compared with the PyTorch embeddings by cosine similarity and summaries with the PyTorch
+summaries by ROUGE-L. Models are exported to ONNX, and quantized, before the timed runs. Run from the src folder:
+    python -m benchmarks.inference_backends_benchmark --meeting 133 --texts 32
+"""
+import time
+import torch
+import consts
+import argparse
+from statistics import mean
+from transformers import AutoTokenizer
+from tools.meetings_store import get_meetings_store
+from tools.meetings_tools import get_meeting_docs
+from tools.vector_db_tool import _get_batch_embeddings
+from tools.inference_backends import (
+    INFERENCE_BACKENDS,
+    PYTORCH_BACKEND,
+    load_embedding_model,
+    load_summarization_pipeline,
+    get_cosine_similarity,
+    get_rouge_l
+)
+
+
+def embed_texts(texts: list[str], tokenizer, embedding_model, batch_size: int) -> list[list[float]]:
+    embeddings = []
+    for i in range(0, len(texts), batch_size):
+        batch = tokenizer(texts[i:i + batch_size], max_length=512, padding=True, truncation=True, return_tensors="pt")
+        with torch.inference_mode():
+            embeddings.extend(_get_batch_embeddings(batch, embedding_model).tolist())
+    return embeddings
+
+
+def summarize_texts(texts: list[str], summarization_pipeline, max_length: int) -> list[str]:
+    return [summary["summary_text"] for summary in
+            summarization_pipeline(texts, min_length=min(30, max_length), max_length=max_length, truncation=True)]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmarks the summarization and embedding inference backends.")
+    arg_parser.add_argument("--meeting", type=int, default=133, help="number of the meeting the texts are taken from")
+    arg_parser.add_argument("--texts", type=int, default=32, help="number of embedded texts")
+    arg_parser.add_argument("--summarized-texts", type=int, default=4, help="number of summarized texts")
+    arg_parser.add_argument("--summary-max-length", type=int, default=128, help="maximum summary length in tokens")
+    arg_parser.add_argument("--batch-size", type=int, default=consts.EMBEDDING_BATCH_SIZE, help="embedding batch size")
+    arg_parser.add_argument("--backends", nargs="+", default=list(INFERENCE_BACKENDS), choices=INFERENCE_BACKENDS,
+                            help="compared backends, the PyTorch backend is always run as the reference")
+    arg_parser.add_argument("--summarizer-model", default=consts.SUMMARIZER_MODEL_NAME)
+    arg_parser.add_argument("--embedding-model", default=consts.EMBEDDING_MODEL_NAME)
+    arg_parser.add_argument("--tokenizer-model", default=consts.TOKENIZER_MODEL_NAME)
+    args = arg_parser.parse_args()
+    torch.manual_seed(133)
+    meeting = get_meetings_store().get_meeting(args.meeting)
+    texts = [doc["text"] for doc in get_meeting_docs(meeting) if doc["text"].strip()][:args.texts]
+    summarized_texts = sorted(texts, key=len, reverse=True)[:args.summarized_texts]
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer_model)
+    tokens_count = sum(len(input_ids) for input_ids in
+                       tokenizer(texts, max_length=512, truncation=True)["input_ids"])
+    print(f"Embedded texts: {len(texts)}, tokens: {tokens_count}, summarized texts: {len(summarized_texts)}")
+    reference_embeddings = None
+    reference_summaries = None
+    for backend in [PYTORCH_BACKEND] + [b for b in args.backends if b != PYTORCH_BACKEND]:
+        embedding_model = load_embedding_model(args.embedding_model, backend)
+        if isinstance(embedding_model, torch.nn.Module):
+            embedding_model.eval()
+        summarization_pipeline = load_summarization_pipeline(args.summarizer_model, args.tokenizer_model, backend)
+        # Warm up run, not timed.
+        embed_texts(texts[:1], tokenizer, embedding_model, args.batch_size)
+
+        start_time = time.perf_counter()
+        embeddings = embed_texts(texts, tokenizer, embedding_model, args.batch_size)
+        embedding_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        summaries = summarize_texts(summarized_texts, summarization_pipeline, args.summary_max_length)
+        summarization_time = time.perf_counter() - start_time
+
+        reference_embeddings = reference_embeddings or embeddings
+        reference_summaries = reference_summaries or summaries
+        cosine_similarities = [get_cosine_similarity(e, r) for e, r in zip(embeddings, reference_embeddings)]
+        rouge_scores = [get_rouge_l(s, r) for s, r in zip(summaries, reference_summaries)]
+        print(f"{backend:>9}: embeddings {embedding_time * 1000 / len(texts):.1f} ms/text, "
+              f"{tokens_count / embedding_time:.1f} tokens/s, cosine similarity mean {mean(cosine_similarities):.4f} "
+              f"min {min(cosine_similarities):.4f} | summaries {summarization_time / len(summaries):.2f} s/text, "
+              f"ROUGE-L mean {mean(rouge_scores):.4f}")
@@ -0,0 +1,43 @@
+"""Compares per-chunk summarization with batched summarization of the text chunks of all speakers of a meeting.
+
+Worker processes are started, and load the summarization model, before the timed runs. Run from the src folder:
+    python -m benchmarks.summarization_batching_benchmark --meeting 133 --batch-sizes 1 4 8
+"""
+import time
+import consts
+import argparse
+from tools.meetings_store import get_meetings_store
+from tools.meetings_tools import get_meeting_docs_per_person
+from tools.summarization_tools import SummarizationTool, SummarizationWorkerPool
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmarks batched summarization of meeting text chunks.")
+    arg_parser.add_argument("--meeting", type=int, default=133, help="number of the summarized meeting")
+    arg_parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 4, 8],
+                            help="summarization batch sizes, 1 summarizes every text chunk separately")
+    arg_parser.add_argument("--workers", type=int, default=consts.SUMMARIZATION_MAX_WORKERS,
+                            help="number of summarization worker processes")
+    arg_parser.add_argument("--summarizer-model", default=consts.SUMMARIZER_MODEL_NAME)
+    arg_parser.add_argument("--tokenizer-model", default=consts.TOKENIZER_MODEL_NAME)
+    arg_parser.add_argument("--max-input-length", type=int, default=1023,
+                            help="maximum text chunk length in tokens, including the special tokens")
+    arg_parser.add_argument("--min-tokens-count", type=int, default=100, help="minimum summary length in tokens")
+    args = arg_parser.parse_args()
+    meeting = get_meetings_store().get_meeting(args.meeting)
+    docs_lists = list(get_meeting_docs_per_person(meeting).values())
+    with SummarizationWorkerPool(max_workers=args.workers, summarizer_model_name=args.summarizer_model,
+                                 tokenizer_model_name=args.tokenizer_model) as worker_pool:
+        worker_pool.start()
+        for batch_size in args.batch_sizes:
+            summarization_tool = SummarizationTool(tokenizer_model_name=args.tokenizer_model,
+                                                   max_input_length=args.max_input_length,
+                                                   worker_pool=worker_pool, batch_size=batch_size,
+                                                   min_tokens_count=args.min_tokens_count)
+            start_time = time.perf_counter()
+            summaries = summarization_tool.run_batch(docs_lists)
+            elapsed_time = time.perf_counter() - start_time
+            tokens_count = summarization_tool.total_input_tokens_count
+            chunks_count = sum(len(speaker_summaries) for speaker_summaries in summaries)
+            print(f"batch size {batch_size:>3}: {chunks_count} chunks, {tokens_count} tokens, "
+                  f"{elapsed_time:.1f} s, {tokens_count / elapsed_time:.1f} tokens/s")
@@ -0,0 +1,64 @@
+"""Compares the per-word remove_special_character normalization with the per-paragraph normalization.
+
+Run from the src folder:
+    python -m benchmarks.text_normalization_benchmark
+"""
+import os
+import re
+import timeit
+import consts
+import argparse
+from lxml import etree
+from meetings_data_scraper import remove_special_character, normalize_text_line
+from benchmarks.xml_interventions_benchmark import EVIDENCE_XML_FIXTURE_PATH
+
+
+def get_cached_evidence_xml_paths(cache_dir: str) -> list[str]:
+    """Returns the evidence XML pages kept in the scraper HTTP cache, the other cached pages are HTML."""
+    if not os.path.isdir(cache_dir):
+        return []
+    xml_paths = []
+    for file_name in sorted(os.listdir(cache_dir)):
+        file_path = os.path.join(cache_dir, file_name)
+        if file_name.endswith(".body"):
+            with open(file_path, "rb") as fh:
+                if fh.read(64).lstrip().startswith(b"<?xml"):
+                    xml_paths.append(file_path)
+    return xml_paths
+
+
+def load_text_lines(xml_paths: list[str]) -> list[str]:
+    """Loads the ParaText paragraphs of the evidence XML files as the scraper gets them, before normalization."""
+    text_lines = []
+    for xml_path in xml_paths:
+        for _, element in etree.iterparse(xml_path, events=("end",), huge_tree=True):
+            if isinstance(element.tag, str) and etree.QName(element).localname.lower() == "paratext":
+                text_lines.append("".join(element.itertext()))
+    return text_lines
+
+
+def normalize_per_word(text_lines: list[str]) -> list[str]:
+    regex_multiple_spaces = re.compile(r"\s+")
+    return [" ".join([remove_special_character(word, regex_multiple_spaces) for word in line.strip().split(" ")])
+            for line in text_lines]
+
+
+def normalize_per_paragraph(text_lines: list[str]) -> list[str]:
+    return [normalize_text_line(line) for line in text_lines]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmarks the text normalization used by the scraper.")
+    arg_parser.add_argument("--cache-dir", default=consts.SCRAPER_CACHE_DIR,
+                            help="scraper HTTP cache folder, the evidence XML fixture is used if it has no evidence")
+    arg_parser.add_argument("--runs", type=int, default=5, help="number of timed runs")
+    args = arg_parser.parse_args()
+    text_lines = load_text_lines(get_cached_evidence_xml_paths(args.cache_dir) or [EVIDENCE_XML_FIXTURE_PATH])
+    if normalize_per_word(text_lines) != normalize_per_paragraph(text_lines):
+        raise ValueError("The normalization functions produced different results.")
+    words_count = sum(len(line.split(" ")) for line in text_lines)
+    print(f"Paragraphs: {len(text_lines)}, words: {words_count}")
+    number = max(1, 200000 // max(1, words_count))
+    for name, normalize_fn in [("per word", normalize_per_word), ("per paragraph", normalize_per_paragraph)]:
+        best_time = min(timeit.repeat(lambda: normalize_fn(text_lines), number=number, repeat=args.runs)) / number
+        print(f"{name:>13}: {best_time * 1000:.3f} ms, {words_count / best_time / 1e6:.2f} M words/s")
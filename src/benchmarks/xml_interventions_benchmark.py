@@ -0,0 +1,76 @@
+"""Compares the streaming evidence XML parser with the BeautifulSoup based parser.
+
+Run from the src folder:
+    python -m benchmarks.xml_interventions_benchmark --repeat 200
+"""
+import os
+import re
+import time
+import argparse
+import warnings
+import tracemalloc
+from io import BytesIO
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+from meetings_data_scraper import iter_meeting_interventions, remove_special_character
+
+EVIDENCE_XML_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "..", "tests", "data", "meeting_evidence.xml")
+
+
+def parse_interventions_with_beautifulsoup(xml: bytes) -> list[dict]:
+    regex_multiple_spaces = re.compile(r"\s+")
+    evidence_xml_page_parser = BeautifulSoup(xml.decode("utf8"), features="lxml")
+    interventions = []
+    for xml_intervention in evidence_xml_page_parser.find_all("intervention"):
+        interventions.append({
+            "id": xml_intervention.attrs["id"],
+            "person_speaking": remove_special_character(xml_intervention.find("affiliation").text,
+                                                        regex_multiple_spaces),
+            "text_lines": [" ".join([remove_special_character(word, regex_multiple_spaces)
+                                     for word in p.text.strip().split(" ")])
+                           for p in xml_intervention.find_all("paratext")]
+        })
+    return interventions
+
+
+def parse_interventions_with_iterparse(xml: bytes) -> list[dict]:
+    return list(iter_meeting_interventions(BytesIO(xml)))
+
+
+def build_long_hearing_xml(xml: bytes, repeat: int) -> bytes:
+    """Simulates a long hearing by repeating all interventions of the evidence XML."""
+    start = xml.index(b"<Intervention ")
+    end = xml.rindex(b"</Intervention>") + len(b"</Intervention>")
+    return b"".join([xml[:start], xml[start:end] * repeat, xml[end:]])
+
+
+def run_benchmark(parse_fn, xml: bytes, runs: int) -> tuple[float, float, int]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        interventions = parse_fn(xml)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    parse_fn(xml)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak_memory / 2**20, len(interventions)
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmarks parsing of the meeting evidence XML.")
+    arg_parser.add_argument("--xml-file", default=EVIDENCE_XML_FIXTURE_PATH, help="saved evidence XML file")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="how many times to repeat the interventions")
+    arg_parser.add_argument("--runs", type=int, default=5, help="number of timed runs per parser")
+    args = arg_parser.parse_args()
+    warnings.filterwarnings("ignore", category=XMLParsedAsHTMLWarning)
+    with open(args.xml_file, "rb") as fh:
+        evidence_xml = build_long_hearing_xml(fh.read(), args.repeat)
+    if parse_interventions_with_beautifulsoup(evidence_xml) != parse_interventions_with_iterparse(evidence_xml):
+        raise ValueError("The parsers produced different interventions.")
+    print(f"Evidence XML size: {len(evidence_xml) / 2**20:.2f} MiB")
+    for name, parse_fn in [("BeautifulSoup", parse_interventions_with_beautifulsoup),
+                           ("iterparse", parse_interventions_with_iterparse)]:
+        best_time, peak_memory, interventions_count = run_benchmark(parse_fn, evidence_xml, args.runs)
+        print(f"{name:>13}: {interventions_count} interventions, best of {args.runs}: {best_time * 1000:.1f} ms, "
+              f"Python heap peak: {peak_memory:.1f} MiB")
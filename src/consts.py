@@ -8,15 +8,62 @@ MEETING_EVIDENCE_URL_FORMAT = "https://www.ourcommons.ca/DocumentViewer/en/44-1/
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), "..", "output")
 DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
 MEETINGS_DATA_FILE_PATH = os.path.join(DATA_DIR, "meetings.json")
+MEETINGS_STORE_FILE_PATH = os.path.join(DATA_DIR, "meetings.jsonl")
 DB_LOG_FILE_PATH = os.path.join(OUTPUT_DIR, "db.log")
+# Connections of the process-wide DB connection pool used by pooled SQL query managers.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_MAX_IDLE_SECONDS = 300
+DB_POOL_CHECKOUT_TIMEOUT_SECONDS = 30
+DB_INSERT_BATCH_SIZE = 1000
 MILVUS_LOG_FILE_PATH = os.path.join(OUTPUT_DIR, "milvus.log")
 MAIN_LOG_FILE_PATH = os.path.join(OUTPUT_DIR, "main.log")
 SUMMARIZATION_LOG_FILE_PATH = os.path.join(OUTPUT_DIR, "summarization.log")
 TOKENIZER_MODEL_NAME = "facebook/bart-large-cnn"
 SUMMARIZER_MODEL_NAME = "facebook/bart-large-cnn"
-EMBEDDING_MODEL_NAME = "facebook/bart-large-cnn"
+# The embedding model can differ from the summarization model, e.g. a small sentence-transformers model.
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "facebook/bart-large-cnn")
+EMBEDDING_TOKENIZER_MODEL_NAME = os.getenv("EMBEDDING_TOKENIZER_MODEL_NAME", EMBEDDING_MODEL_NAME)
+# Embedding dimensions of known models, dimensions of other models are read from their configuration.
+EMBEDDING_MODEL_DIMS = {
+    "facebook/bart-large-cnn": 1024,
+    "sentence-transformers/all-MiniLM-L6-v2": 384,
+    "BAAI/bge-small-en-v1.5": 384
+}
+# One of "pytorch", "onnx" or "onnx-int8", the ONNX backends run the models exported to ONNX_MODELS_DIR.
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "pytorch")
+ONNX_MODELS_DIR = os.path.join(ML_MODELS_DOWNLOAD_DIR, "onnx")
 VECTOR_DB_EMBEDDINGS_FILE_PATH = os.path.join(DATA_DIR, "vector_embeddings.json")
+VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH = os.path.join(DATA_DIR, "vector_embeddings.bin")
+VECTOR_DB_INSERT_BATCH_SIZE = 1000
+EMBEDDING_BATCH_SIZE = 32
+EMBEDDING_MAX_BATCH_TOKENS = 8192
+SUMMARIZATION_MAX_WORKERS = 4
+SUMMARIZATION_BATCH_SIZE = 4
+# Maximum summary lengths are rounded down to multiples of the step, so text chunks of similar lengths share them.
+SUMMARIZATION_LENGTH_STEP_TOKENS = 32
+# Summarization jobs are failed after the timeout and failed text chunks are retried up to the retries count.
+SUMMARIZATION_JOB_TIMEOUT_SECONDS = 600
+SUMMARIZATION_MAX_RETRIES = 2
+# Jobs summarized at a time, meetings read ahead and meetings summarized by one job of the summarization scheduler.
+SUMMARIZATION_MAX_JOBS = 2 * SUMMARIZATION_MAX_WORKERS
+SUMMARIZATION_WINDOW_MEETINGS = 16
+SUMMARIZATION_JOB_MEETINGS = 2
+SUMMARY_TARGET_TOKENS_COUNT = 512
+SUMMARY_MAX_LEVELS = 4
+SUMMARY_CACHE_FILE_PATH = os.path.join(DATA_DIR, "summary_cache.sqlite3")
+SUMMARY_CACHE_MAX_SIZE_BYTES = 512 * 1024 * 1024
+BUILD_STATE_FILE_PATH = os.path.join(DATA_DIR, "build_state.json")
+BUILD_METRICS_FILE_PATH = os.path.join(DATA_DIR, "build_metrics.prom")
+SUMMARIES_SPOOL_FILE_PATH = os.path.join(DATA_DIR, "pending_summaries.jsonl")
+SUMMARIES_FLUSH_SIZE = 256
+SUMMARIES_FLUSH_MEETINGS = 10
 SQL_DATA_FILE_PATH = os.path.join(DATA_DIR, "data.sql")
+# INSERT statements of an SQL dump loaded per transaction.
+SQL_DUMP_COMMIT_STATEMENTS = 50
+SCRAPER_MAX_WORKERS = 8
+SCRAPER_MAX_WORKERS_PER_HOST = 4
+SCRAPER_REQUESTS_PER_SECOND = 4.0
+SCRAPER_CACHE_DIR = os.path.join(DATA_DIR, "http_cache")
 
 Path(OUTPUT_DIR).mkdir(parents=True, exist_ok=True)
 Path(DATA_DIR).mkdir(parents=True, exist_ok=True)
\ No newline at end of file
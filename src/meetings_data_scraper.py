@@ -1,22 +1,54 @@
+import os
 import re
+import sys
 import json
 import consts
+import argparse
 import requests
+from io import BytesIO
+from lxml import etree
 from pathlib import Path
+from typing import Iterator
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from tools.http_tools import HttpFetcher, ResponseCache
+
+HTTP_FETCHER = None
+# ASCII whitespace other than the space, DEL and all non-ASCII characters, i.e. the characters which
+# remove_special_character turns into spaces before collapsing the whitespace.
+_SPECIAL_CHARACTERS = r"\t-\r\x1c-\x1f\x7f-\U0010ffff"
+SPECIAL_CHARACTERS_REGEX = re.compile(f"[{_SPECIAL_CHARACTERS}]+")
+SPECIAL_CHARACTERS_AND_SPACES_REGEX = re.compile(f"[ {_SPECIAL_CHARACTERS}]+")
 
 
 class PageNotFoundException(BaseException):
     pass
 
 
-def parse_url(url: str, parser_features: str | list[str] = "html.parser"):
-    if parser_features is None:
-        parser_features = []
-    page = requests.get(url)
+def _get_http_fetcher(cache: ResponseCache = None) -> HttpFetcher:
+    global HTTP_FETCHER
+    if HTTP_FETCHER is None:
+        HTTP_FETCHER = HttpFetcher(max_workers=consts.SCRAPER_MAX_WORKERS,
+                                   max_workers_per_host=consts.SCRAPER_MAX_WORKERS_PER_HOST,
+                                   requests_per_second=consts.SCRAPER_REQUESTS_PER_SECOND,
+                                   cache=cache)
+    return HTTP_FETCHER
+
+
+def fetch_url(url: str, fetcher: HttpFetcher = None) -> requests.Response:
+    if fetcher is None:
+        fetcher = _get_http_fetcher()
+    page = fetcher.get(url)
     if page.status_code > 400:
         raise PageNotFoundException(f"Failed to fetch page content for url '{url}'")
+
+    return page
+
+
+def parse_url(url: str, parser_features: str | list[str] = "html.parser", fetcher: HttpFetcher = None):
+    if parser_features is None:
+        parser_features = []
+    page = fetch_url(url, fetcher)
     soup = BeautifulSoup(page.text, features=parser_features)
 
     return soup
@@ -67,49 +99,137 @@ def remove_special_character(text: str, regex_multiple_spaces: re.Pattern) -> st
 
     return filtered_text
 
-def get_meeting_interventions(meeting_num: int, url_format: str, regex_multiple_spaces: re.Pattern) -> list[object]:
+
+def normalize_text(text: str) -> str:
+    """Returns the same result as remove_special_character(text, re.compile(r"\\s+")) using a single regex pass."""
+    return SPECIAL_CHARACTERS_AND_SPACES_REGEX.sub(" ", text).strip(" ")
+
+
+def normalize_text_line(text: str) -> str:
+    """Normalizes a whole paragraph at once.
+
+    Returns the same result as normalizing every space separated word of the stripped text with
+    remove_special_character(word, re.compile(r"\\s+")) and joining the words back with spaces: special
+    characters at the edges of a word are removed and runs of special characters inside a word are
+    replaced with a single space, while the spaces between the words are kept as they are.
+    """
+    text = text.strip()
+
+    def replace_special_characters(match: re.Match) -> str:
+        start, end = match.span()
+        if start == 0 or end == len(text) or text[start - 1] == " " or text[end] == " ":
+            return ""
+        return " "
+
+    return SPECIAL_CHARACTERS_REGEX.sub(replace_special_characters, text)
+
+
+def _is_xml_element(element, name: str) -> bool:
+    # Tag names are matched case-insensitively, the same way the HTML parser used to match them.
+    return isinstance(element.tag, str) and etree.QName(element).localname.lower() == name
+
+
+def _get_xml_element_text(element) -> str:
+    return "".join(element.itertext())
+
+
+def iter_meeting_interventions(xml_source) -> Iterator[dict]:
+    """Parses the evidence XML incrementally and yields the interventions one at a time.
+
+    Each intervention element is released as soon as it is parsed, so the memory used does not
+    grow with the length of the meeting.
+    """
+    for _, element in etree.iterparse(xml_source, events=("end",), huge_tree=True):
+        if not _is_xml_element(element, "intervention"):
+            continue
+        affiliation = next(e for e in element.iter() if _is_xml_element(e, "affiliation"))
+        intervention = {
+            "id": element.attrib["id"],
+            "person_speaking": normalize_text(_get_xml_element_text(affiliation)),
+            "text_lines": [normalize_text_line(_get_xml_element_text(p))
+                           for p in element.iter() if _is_xml_element(p, "paratext")]
+        }
+        element.clear(keep_tail=True)
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+        yield intervention
+
+
+def get_meeting_interventions(meeting_num: int, url_format: str, fetcher: HttpFetcher = None) -> list[object]:
     url = url_format.format(meeting_num)
-    evidence_page_parser = parse_url(url)
+    evidence_page_parser = parse_url(url, fetcher=fetcher)
     evidence_xml_relative_url = evidence_page_parser.select_one("a[class*='btn-export-xml']").attrs["href"]
     evidence_xml_absolute_url = urljoin(url, evidence_xml_relative_url)
-    evidence_xml_page_parser = parse_url(evidence_xml_absolute_url, parser_features="lxml")
-    interventions = []
-    xml_interventions = evidence_xml_page_parser.find_all("intervention")
-    for xml_intervention in xml_interventions:
-        intervention = {
-            "id": xml_intervention.attrs["id"],
-            "person_speaking": remove_special_character(xml_intervention.find("affiliation").text, regex_multiple_spaces),
-            "text_lines": [" ".join([remove_special_character(word, regex_multiple_spaces)
-                                     for word in p.text.strip().split(" ")])
-                           for p in xml_intervention.find_all('paratext')]
-        }
-        interventions.append(intervention)
+    evidence_xml_page = fetch_url(evidence_xml_absolute_url, fetcher)
+    interventions = list(iter_meeting_interventions(BytesIO(evidence_xml_page.content)))
 
     return interventions
 
 
+def get_meeting(div_meeting, url_format: str, fetcher: HttpFetcher = None,
+                existing_meetings: dict[int, dict] = None) -> dict | None:
+    try:
+        meeting_num = get_meeting_num(div_meeting)
+        if existing_meetings and meeting_num in existing_meetings:
+            return existing_meetings[meeting_num]
+        meeting_start_time, meeting_end_time, meeting_time_zone = get_meeting_time(div_meeting)
+        meeting = {
+            "date": get_meeting_date(div_meeting),
+            "start_time": meeting_start_time,
+            "end_time": meeting_end_time,
+            "time_zone": meeting_time_zone,
+            "subjects": get_meeting_subjects(div_meeting),
+            "number": meeting_num,
+            "interventions": get_meeting_interventions(meeting_num, url_format, fetcher)
+        }
+        return meeting
+    except PageNotFoundException as ex:
+        print(ex)
+        return None
+
+
+def get_meetings(meetings_url: str, url_format: str, fetcher: HttpFetcher,
+                 existing_meetings: dict[int, dict] = None) -> list[dict]:
+    if existing_meetings is None:
+        existing_meetings = {}
+    meetings_page_parser = parse_url(meetings_url, fetcher=fetcher)
+    div_meetings = meetings_page_parser.select("div[class*='meeting-item-']")
+    # Meetings are scraped concurrently, but the results are kept in the order of the meetings page.
+    # Already scraped meetings are reused as they are, without fetching their evidence.
+    meetings = fetcher.map(lambda d: get_meeting(d, url_format, fetcher, existing_meetings), div_meetings)
+    meetings = [m for m in meetings if m is not None]
+    listed_meeting_nums = set(m["number"] for m in meetings)
+    meetings.extend([m for num, m in existing_meetings.items() if num not in listed_meeting_nums])
+
+    return meetings
+
+
+def load_existing_meetings(meetings_file_path: str) -> dict[int, dict]:
+    if not os.path.exists(meetings_file_path):
+        return {}
+    with open(meetings_file_path, encoding="utf8") as fh:
+        return {m["number"]: m for m in json.load(fh)}
+
+
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Scrapes data about the committee meetings.")
+    arg_parser.add_argument("--incremental", action="store_true",
+                            help="scrape only meetings missing from the meetings data file and "
+                                 "use conditional requests backed by the local page cache")
+    args = arg_parser.parse_args()
     Path(consts.DATA_DIR).mkdir(parents=True, exist_ok=True)
-    meetings_page_parser = parse_url(consts.MEETINGS_URL)
-    div_meetings = meetings_page_parser.select("div[class*='meeting-item-']")
-    meetings = []
-    regex_multiple_spaces = re.compile(r"\s+")
-    for d in div_meetings:
-        try:
-            meeting_start_time, meeting_end_time, meeting_time_zone = get_meeting_time(d)
-            meeting_num = get_meeting_num(d)
-            meeting = {
-                "date": get_meeting_date(d),
-                "start_time": meeting_start_time,
-                "end_time": meeting_end_time,
-                "time_zone": meeting_time_zone,
-                "subjects": get_meeting_subjects(d),
-                "number": meeting_num,
-                "interventions": get_meeting_interventions(meeting_num, consts.MEETING_EVIDENCE_URL_FORMAT, regex_multiple_spaces)
-            }
-            meetings.append(meeting)
-        except PageNotFoundException as ex:
-            print(ex)
+    existing_meetings = {}
+    response_cache = None
+    if args.incremental:
+        existing_meetings = load_existing_meetings(consts.MEETINGS_DATA_FILE_PATH)
+        response_cache = ResponseCache(consts.SCRAPER_CACHE_DIR)
+    with _get_http_fetcher(response_cache) as http_fetcher:
+        meetings = get_meetings(consts.MEETINGS_URL, consts.MEETING_EVIDENCE_URL_FORMAT, http_fetcher,
+                                existing_meetings)
+    new_meetings_count = len(meetings) - len(existing_meetings)
+    print(f"{new_meetings_count} new meetings scraped.")
+    if args.incremental and new_meetings_count == 0:
+        sys.exit(0)
     with open(consts.MEETINGS_DATA_FILE_PATH, mode="w", encoding="utf8") as fh:
         json_meetings = json.dumps(meetings)
         fh.write(json_meetings)
@@ -3,7 +3,8 @@ import nltk
 import consts
 from transformers import pipeline
 from nltk.tokenize import word_tokenize
-from tools.meetings_tools import load_meetings, get_meeting_docs
+from tools.meetings_tools import get_meeting_docs
+from tools.meetings_store import get_meetings_store
 
 
 MEETING_NUM = 133
@@ -76,8 +77,7 @@ if __name__ == "__main__":
         "google/pegasus-large",
         "allenai/led-large-16384-arxiv",
     ]
-    meetings = load_meetings(consts.MEETINGS_DATA_FILE_PATH)
-    meeting = [m for m in meetings if m["number"] == MEETING_NUM][0]
+    meeting = get_meetings_store().get_meeting(MEETING_NUM)
     meeting_docs = get_meeting_docs(meeting)
     dialog = meeting_docs[0]
     summary = "The House of Commons Standing Committee on Public Accounts is holding a meeting in a hybrid format, with members attending in person and possibly remotely using the Zoom application. The committee is resuming its study of report 6, Sustainable Development Technology Canada, from the 2024 reports 5 to 7 of the Auditor General of Canada. The committee is requesting that participants use approved black earpieces, keep them away from microphones, and place them face down on the table. The committee welcomes witnesses from the Office of the Auditor General, Sustainable Development Technology Canada, and Sustainable Development Technology Canada."
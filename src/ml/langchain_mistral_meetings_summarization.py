@@ -7,7 +7,7 @@ from collections import Counter
 from langchain.chains.llm import LLMChain
 from langchain.docstore.document import Document
 from langchain_community.llms import CTransformers
-from tools.meetings_tools import load_meetings
+from tools.meetings_store import get_meetings_store
 from langchain_core.prompts.prompt import PromptTemplate
 from langchain.chains.combine_documents.stuff import StuffDocumentsChain
 from langchain.chains.combine_documents.reduce import ReduceDocumentsChain
@@ -46,9 +46,9 @@ def get_reduce_prompt_template():
 
 
 if __name__ == "__main__":
-    meetings = load_meetings(src.consts.MEETINGS_DATA_FILE_PATH)
-    print(f"Total number of meetings: {len(meetings)}")
-    meeting_133 = [m for m in meetings if m["number"] == 133][0]
+    meetings_store = get_meetings_store()
+    print(f"Total number of meetings: {len(meetings_store)}")
+    meeting_133 = meetings_store.get_meeting(133)
     print(f"Meeting 133 total inverventions: {len(meeting_133['interventions'])}")
     meeting_133_tokens_per_intervention = []
     text_buffer = io.StringIO()
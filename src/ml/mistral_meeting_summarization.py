@@ -1,7 +1,8 @@
 import os
 import consts
 from ctransformers import AutoModelForCausalLM, AutoConfig
-from tools.meetings_tools import load_meetings, get_meeting_docs
+from tools.meetings_tools import get_meeting_docs
+from tools.meetings_store import get_meetings_store
 
 
 def get_summary_prompt_template():
@@ -32,8 +33,7 @@ if __name__ == "__main__":
                                                max_new_tokens=4096,
                                                context_length=30000,
                                                threads=os.cpu_count())
-    meetings = load_meetings(consts.MEETINGS_DATA_FILE_PATH)
-    meeting = [m for m in meetings if m["number"] == 133][0]
+    meeting = get_meetings_store().get_meeting(133)
     meeting_docs = get_meeting_docs(meeting)
     meeting_text = os.linesep.join([f"{d['speaker']}: {d['text']}" for d in meeting_docs])
     summary_prompt = get_summary_prompt_template().format(meeting_text)
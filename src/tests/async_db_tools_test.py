@@ -0,0 +1,137 @@
+import asyncio
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+from tools.async_db_tools import (
+    AsyncSqlQueryManager,
+    ASYNC_CONNECTION_POOLS,
+    close_async_connection_pools
+)
+from tools.config import DbConfig
+
+
+def create_mock_pool(in_transaction: bool = False) -> MagicMock:
+    mock_cursor = MagicMock(execute=AsyncMock(return_value=1), executemany=AsyncMock(return_value=2),
+                            fetchall=AsyncMock(return_value=((1, "Meeting"),)), close=AsyncMock())
+    mock_conn = MagicMock(cursor=AsyncMock(return_value=mock_cursor), commit=AsyncMock(), rollback=AsyncMock())
+    mock_conn.get_transaction_status.return_value = in_transaction
+    return MagicMock(acquire=AsyncMock(return_value=mock_conn), wait_closed=AsyncMock())
+
+
+@patch("tools.async_db_tools.aiomysql.create_pool", new_callable=AsyncMock)
+class TestAsyncSqlQueryManager(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await close_async_connection_pools()
+
+    async def test_query_managers_share_connection_pool(self, mock_create_pool):
+        # Arrange
+        mock_pool = create_mock_pool()
+        mock_create_pool.return_value = mock_pool
+        db_config = DbConfig()
+
+        # Act
+        for _ in range(3):
+            async with AsyncSqlQueryManager(db_config) as manager:
+                await manager.execute("SELECT 1")
+
+        # Assert
+        mock_create_pool.assert_awaited_once()
+        self.assertEqual(mock_create_pool.call_args.kwargs["db"], db_config.database_name)
+        self.assertEqual(mock_create_pool.call_args.kwargs["init_command"],
+                         "SET NAMES utf8mb4 COLLATE utf8mb4_unicode_ci")
+        self.assertEqual(mock_pool.acquire.await_count, 3)
+        self.assertEqual(mock_pool.release.call_count, 3)
+        mock_pool.acquire.return_value.rollback.assert_not_awaited()
+
+    async def test_execute_and_fetchall(self, mock_create_pool):
+        # Arrange
+        mock_pool = create_mock_pool()
+        mock_create_pool.return_value = mock_pool
+        mock_cursor = mock_pool.acquire.return_value.cursor.return_value
+
+        # Act
+        async with AsyncSqlQueryManager(DbConfig()) as manager:
+            await manager.execute("SELECT * FROM meetings WHERE meeting_number = %s", (1,))
+            results = await manager.fetchall()
+            await manager.executemany("INSERT INTO meetings VALUES (%s)", [(1,), (2,)])
+            await manager.commit()
+
+        # Assert
+        self.assertEqual(results, [(1, "Meeting")])
+        mock_cursor.execute.assert_awaited_once_with("SELECT * FROM meetings WHERE meeting_number = %s", (1,))
+        mock_cursor.executemany.assert_awaited_once_with("INSERT INTO meetings VALUES (%s)", [(1,), (2,)])
+        mock_pool.acquire.return_value.commit.assert_awaited_once()
+        mock_cursor.close.assert_awaited_once()
+
+    async def test_execute_without_params_passes_no_params(self, mock_create_pool):
+        # Arrange
+        mock_pool = create_mock_pool()
+        mock_create_pool.return_value = mock_pool
+
+        # Act
+        async with AsyncSqlQueryManager(DbConfig()) as manager:
+            await manager.execute("SELECT * FROM meetings WHERE title LIKE '%budget%'")
+
+        # Assert
+        mock_pool.acquire.return_value.cursor.return_value.execute.assert_awaited_once_with(
+            "SELECT * FROM meetings WHERE title LIKE '%budget%'", None)
+
+    async def test_query_manager_rolls_back_uncommitted_changes(self, mock_create_pool):
+        # Arrange
+        mock_pool = create_mock_pool(in_transaction=True)
+        mock_create_pool.return_value = mock_pool
+
+        # Act
+        async with AsyncSqlQueryManager(DbConfig()) as manager:
+            await manager.execute("DELETE FROM meetings")
+
+        # Assert
+        mock_pool.acquire.return_value.rollback.assert_awaited_once()
+        mock_pool.release.assert_called_once_with(mock_pool.acquire.return_value)
+
+    async def test_close_async_connection_pools(self, mock_create_pool):
+        # Arrange
+        mock_pool = create_mock_pool()
+        mock_create_pool.return_value = mock_pool
+        async with AsyncSqlQueryManager(DbConfig()) as manager:
+            await manager.execute("SELECT 1")
+
+        # Act
+        await close_async_connection_pools()
+
+        # Assert
+        mock_pool.close.assert_called_once()
+        mock_pool.wait_closed.assert_awaited_once()
+        self.assertEqual(ASYNC_CONNECTION_POOLS, {})
+
+
+
+class TestAsyncConnectionPoolsInSeveralEventLoops(unittest.TestCase):
+
+    @patch("tools.async_db_tools.aiomysql.create_pool")
+    def test_connection_pools_are_created_concurrently_in_every_event_loop(self, mock_create_pool):
+        # Arrange
+        async def create_pool(**kwargs):
+            # Connecting yields to the event loop, so the other query manager waits for the pools lock.
+            await asyncio.sleep(0)
+            return create_mock_pool()
+
+        async def run_query_managers():
+            async def run_query_manager():
+                async with AsyncSqlQueryManager(DbConfig()) as manager:
+                    await manager.execute("SELECT 1")
+            await asyncio.gather(run_query_manager(), run_query_manager())
+            await close_async_connection_pools()
+
+        mock_create_pool.side_effect = create_pool
+
+        # Act
+        for _ in range(2):
+            asyncio.run(run_query_managers())
+
+        # Assert
+        self.assertEqual(mock_create_pool.call_count, 2)
+        self.assertEqual(ASYNC_CONNECTION_POOLS, {})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import io
+import os
+import json
+import tempfile
+import unittest
+from unittest.mock import patch
+from tools.build_metrics import BuildMetrics, BuildProgress
+
+
+class TestBuildMetrics(unittest.TestCase):
+
+    def test_to_prometheus_text(self):
+        # Arrange
+        metrics = BuildMetrics()
+        metrics.increment("summarization_chunks_total", 2, {"worker": "SpawnProcess-1"})
+        metrics.increment("summarization_chunks_total", 3, {"worker": "SpawnProcess-1"})
+        metrics.set_gauge("summarization_queued_jobs", 4)
+        metrics.observe("milvus_insert_seconds", 0.5)
+        metrics.observe("milvus_insert_seconds", 1.5)
+
+        # Act
+        metrics_text = metrics.to_prometheus_text()
+
+        # Assert
+        self.assertIn("# TYPE meetings_build_summarization_chunks_total counter\n"
+                      'meetings_build_summarization_chunks_total{worker="SpawnProcess-1"} 5\n', metrics_text)
+        self.assertIn("meetings_build_summarization_queued_jobs 4\n", metrics_text)
+        self.assertIn("# TYPE meetings_build_milvus_insert_seconds summary\n"
+                      "meetings_build_milvus_insert_seconds_count 2\n"
+                      "meetings_build_milvus_insert_seconds_sum 2.000000\n"
+                      "# TYPE meetings_build_milvus_insert_seconds_max gauge\n"
+                      "meetings_build_milvus_insert_seconds_max 1.500000\n", metrics_text)
+
+    def test_to_prometheus_text_escapes_label_values(self):
+        # Arrange
+        metrics = BuildMetrics()
+        metrics.increment("errors_total", labels={"error": 'Table "meetings"\ndoesn\'t exist'})
+
+        # Act
+        metrics_text = metrics.to_prometheus_text()
+
+        # Assert
+        self.assertIn('meetings_build_errors_total{error="Table \\"meetings\\"\\ndoesn\'t exist"} 1\n', metrics_text)
+
+    def test_write_json_snapshot(self):
+        # Arrange
+        metrics = BuildMetrics()
+        metrics.increment("embedded_texts_total", 32)
+        with metrics.time("embedding_batch_seconds"):
+            pass
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "build_metrics.json")
+
+            # Act
+            metrics.write(file_path)
+
+            # Assert
+            with open(file_path, encoding="utf8") as fh:
+                snapshot = json.load(fh)
+            self.assertEqual(os.listdir(temp_dir), ["build_metrics.json"])
+        self.assertEqual(snapshot["counters"]["embedded_texts_total"], [{"labels": {}, "value": 32}])
+        self.assertEqual(snapshot["timings"]["embedding_batch_seconds"][0]["count"], 1)
+
+
+class TestBuildProgress(unittest.TestCase):
+
+    @patch("tools.build_metrics.time.monotonic")
+    def test_eta_leaves_out_skipped_meetings(self, mock_monotonic):
+        # Arrange
+        mock_monotonic.return_value = 100.0
+        metrics = BuildMetrics()
+        stream = io.StringIO()
+        progress = BuildProgress(10, metrics, stream)
+        progress.skip(4)
+        mock_monotonic.return_value = 130.0
+
+        # Act
+        progress.update(3)
+
+        # Assert
+        self.assertEqual(progress.get_eta_seconds(), 30.0)
+        self.assertEqual(metrics.get_gauge("meetings_done"), 7)
+        self.assertTrue(stream.getvalue().startswith("Meetings 7/10 (70.0%) |"))
+        self.assertTrue(stream.getvalue().endswith("ETA 0:00:30\n"))
+
+    def test_eta_is_unknown_before_first_meeting(self):
+        # Arrange
+        progress = BuildProgress(10, BuildMetrics(), io.StringIO())
+
+        # Act
+        line = progress.format_line()
+
+        # Assert
+        self.assertIsNone(progress.get_eta_seconds())
+        self.assertTrue(line.endswith("ETA -"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,23 @@
+import os
+import tempfile
 import unittest
 from datetime import datetime
 from unittest.mock import patch, MagicMock
 from tools.db_tools import (
     SqlQueryManager,
+    SqlConnectionPool,
+    SqlConnectionPoolTimeoutException,
     get_tables_schema,
     _create_tables,
     insert_meetings,
     insert_meeting_subjects,
     insert_meeting_conversations,
     insert_meeting_summaries,
-    _get_new_meetings,
-    _get_new_subjects,
+    _executemany_in_batches,
     get_meeting_summaries,
+    iter_meeting_summaries,
+    iter_sql_statements,
+    load_sql_dump,
     init_db
 )
 from tools.config import DbConfig
@@ -72,6 +78,63 @@ class TestDbTools(unittest.TestCase):
             mock_cursor.execute.assert_called_once_with(f"USE {db_config.database_name}")
             mock_cursor.executemany.assert_called_once_with(query, data)
 
+    @patch("tools.db_tools.connector.connect")
+    def test_execute_selects_database_once(self, mock_connect):
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        db_config = DbConfig()
+
+        # Act
+        with SqlQueryManager(db_config) as manager:
+            manager.execute("SHOW DATABASES", set_default_database=False)
+            manager.execute("SELECT number FROM meetings")
+            manager.executemany("INSERT INTO meeting_subjects (name, meeting_number) VALUES (%s, %s)", [("a", 1)])
+            manager.execute("SELECT summary FROM meeting_summaries WHERE vector_id IN (%s)", [1])
+
+        # Assert
+        self.assertEqual([c.args[0] for c in mock_cursor.execute.call_args_list], [
+            "SHOW DATABASES",
+            f"USE {db_config.database_name}",
+            "SELECT number FROM meetings",
+            "SELECT summary FROM meeting_summaries WHERE vector_id IN (%s)"
+        ])
+        mock_cursor.executemany.assert_called_once()
+
+    @patch("tools.db_tools.connector.connect")
+    def test_execute_selects_database_again_after_it_changes(self, mock_connect):
+        # Arrange
+        mock_cursor = MagicMock()
+        mock_connect.return_value.cursor.return_value = mock_cursor
+        db_config = DbConfig()
+
+        # Act
+        with SqlQueryManager(db_config) as manager:
+            manager.execute("SELECT 1")
+            manager.execute("DROP DATABASE IF EXISTS test; CREATE DATABASE test; USE test;")
+            manager.execute("SELECT 2")
+
+        # Assert
+        self.assertEqual([c.args[0] for c in mock_cursor.execute.call_args_list].count(
+            f"USE {db_config.database_name}"), 2)
+
+    @patch.dict("tools.db_tools.CONNECTION_POOLS", clear=True)
+    @patch("tools.db_tools.connector.connect")
+    def test_pooled_connection_keeps_selected_database(self, mock_connect):
+        # Arrange
+        mock_conn = MagicMock(in_transaction=False)
+        mock_connect.return_value = mock_conn
+        db_config = DbConfig()
+
+        # Act
+        for _ in range(3):
+            with SqlQueryManager(db_config, pooled=True) as manager:
+                manager.execute("SELECT number FROM meetings")
+
+        # Assert
+        self.assertEqual(mock_conn.cursor.return_value.execute.call_count, 4)
+        mock_conn.cursor.return_value.execute.assert_any_call(f"USE {db_config.database_name}")
+
     @patch("tools.db_tools.connector.connect")
     def test_fetchall(self, mock_connect):
         # Mock the connection and cursor
@@ -157,20 +220,8 @@ class TestDbTools(unittest.TestCase):
         mock_get_tables_schema.assert_called_once()
         mock_query_manager.execute.assert_called_once_with("CREATE TABLE `test_table` (id INT PRIMARY KEY)")
 
-    @patch("tools.db_tools._get_new_meetings")
     @patch("tools.db_tools.SqlQueryManager")
-    def test_insert_meetings(self, MockSqlQueryManager, mock_get_new_meetings):
-        # Mock the new meetings data
-        mock_get_new_meetings.return_value = [
-            {
-                "number": 1,
-                "date": "2023-10-01",
-                "start_time": "09:00",
-                "end_time": "10:00",
-                "time_zone": "EST"
-            }
-        ]
-
+    def test_insert_meetings(self, MockSqlQueryManager):
         # Mock the SqlQueryManager instance
         mock_query_manager = MockSqlQueryManager.return_value
         mock_query_manager.executemany = MagicMock()
@@ -196,12 +247,28 @@ class TestDbTools(unittest.TestCase):
              datetime.strptime("10:00", "%H:%M"), "EST")
         ]
         expected_sql = ("INSERT INTO meetings (number, date, start_time, end_time, time_zone) "
-                        "VALUES (%s, %s, %s, %s, %s)")
+                        "VALUES (%s, %s, %s, %s, %s) "
+                        "ON DUPLICATE KEY UPDATE number = number")
 
         # Assertions
-        mock_get_new_meetings.assert_called_once_with(meetings, mock_query_manager)
+        mock_query_manager.execute.assert_not_called()
         mock_query_manager.executemany.assert_called_once_with(expected_sql, expected_data)
 
+    def test_executemany_in_batches(self):
+        # Arrange
+        mock_query_manager = MagicMock(spec=SqlQueryManager)
+        rows = [(number,) for number in range(1, 6)]
+
+        # Act
+        _executemany_in_batches(mock_query_manager, "INSERT INTO meetings (number) VALUES (%s)", rows, batch_size=2)
+
+        # Assert
+        self.assertEqual([c.args for c in mock_query_manager.executemany.call_args_list], [
+            ("INSERT INTO meetings (number) VALUES (%s)", [(1,), (2,)]),
+            ("INSERT INTO meetings (number) VALUES (%s)", [(3,), (4,)]),
+            ("INSERT INTO meetings (number) VALUES (%s)", [(5,)])
+        ])
+
     @patch("tools.db_tools.SqlQueryManager")
     def test_insert_meetings_no_meetings(self, MockSqlQueryManager):
         # Mock the SqlQueryManager instance
@@ -217,24 +284,18 @@ class TestDbTools(unittest.TestCase):
         # Assertions
         mock_query_manager.executemany.assert_not_called()
 
-    @patch('tools.db_tools._get_new_subjects')
     @patch('tools.db_tools.SqlQueryManager')
-    def test_insert_meeting_subjects(self, MockSqlQueryManager, mock_get_new_subjects):
-        # Mock the new subjects data
-        mock_get_new_subjects.return_value = [
-            ("Subject1", 1),
-            ("Subject2", 2)
-        ]
-
+    def test_insert_meeting_subjects(self, MockSqlQueryManager):
         # Mock the SqlQueryManager instance
         mock_query_manager = MockSqlQueryManager.return_value
         mock_query_manager.execute = MagicMock()
         mock_query_manager.executemany = MagicMock()
 
-        # Define the meetings data
+        # Define the meetings data, with a subject repeated in a meeting
         meetings = [
-            {"number": 1, "subject": "Subject1"},
-            {"number": 2, "subject": "Subject2"}
+            {"number": 1, "subjects": ["Subject1", "Subject3", "Subject1"]},
+            {"number": 2, "subjects": ["Subject2"]},
+            {"number": 3, "subjects": []}
         ]
 
         # Call the function
@@ -243,17 +304,29 @@ class TestDbTools(unittest.TestCase):
         # Expected data
         expected_data = [
             ("Subject1", 1),
+            ("Subject3", 1),
             ("Subject2", 2)
         ]
         expected_sql = ("INSERT INTO meeting_subjects (name, meeting_number) "
-                        "VALUES (%s, %s)")
+                        "VALUES (%s, %s) "
+                        "ON DUPLICATE KEY UPDATE meeting_number = meeting_number")
 
         # Assertions
-        mock_get_new_subjects.assert_called_once_with(meetings, mock_query_manager)
         mock_query_manager.execute.assert_any_call("SET FOREIGN_KEY_CHECKS=0")
         mock_query_manager.executemany.assert_called_once_with(expected_sql, expected_data)
         mock_query_manager.execute.assert_any_call("SET FOREIGN_KEY_CHECKS=1")
 
+    @patch('tools.db_tools.SqlQueryManager')
+    def test_insert_meeting_subjects_restores_foreign_key_checks_on_error(self, MockSqlQueryManager):
+        # Arrange
+        mock_query_manager = MockSqlQueryManager.return_value
+        mock_query_manager.executemany.side_effect = RuntimeError("Packet too large")
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            insert_meeting_subjects([{"number": 1, "subjects": ["Subject1"]}], mock_query_manager)
+        mock_query_manager.execute.assert_called_with("SET FOREIGN_KEY_CHECKS=1")
+
     @patch('tools.db_tools.SqlQueryManager')
     def test_insert_meeting_subjects_no_meetings(self, MockSqlQueryManager):
         # Mock the SqlQueryManager instance
@@ -366,174 +439,6 @@ class TestDbTools(unittest.TestCase):
         # Assertions
         mock_query_manager.executemany.assert_called_once_with(expected_sql, meetings_summaries)
 
-    def test_get_new_meetings(self):
-        # Mock the SqlQueryManager instance
-        mock_query_manager = MagicMock(spec=SqlQueryManager)
-        mock_query_manager.execute = MagicMock()
-        mock_query_manager.fetchall = MagicMock(return_value=[(1,), (2,)])
-
-        # Define the meetings data
-        meetings = [
-            {"number": 1, "name": "Meeting1"},
-            {"number": 2, "name": "Meeting2"},
-            {"number": 3, "name": "Meeting3"}
-        ]
-
-        # Call the function
-        new_meetings = _get_new_meetings(meetings, mock_query_manager)
-
-        # Expected new meetings
-        expected_new_meetings = [
-            {"number": 3, "name": "Meeting3"}
-        ]
-
-        # Assertions
-        self.assertEqual(new_meetings, expected_new_meetings)
-        mock_query_manager.execute.assert_called_once_with(
-            "SELECT number FROM meetings WHERE number in (%s,%s,%s)",
-            [1, 2, 3]
-        )
-        mock_query_manager.fetchall.assert_called_once()
-
-    def test_get_new_meetings_no_existing(self):
-        # Mock the SqlQueryManager instance
-        mock_query_manager = MagicMock(spec=SqlQueryManager)
-        mock_query_manager.execute = MagicMock()
-        mock_query_manager.fetchall = MagicMock(return_value=[])
-
-        # Define the meetings data
-        meetings = [
-            {"number": 1, "name": "Meeting1"},
-            {"number": 2, "name": "Meeting2"},
-            {"number": 3, "name": "Meeting3"}
-        ]
-
-        # Call the function
-        new_meetings = _get_new_meetings(meetings, mock_query_manager)
-
-        # Expected new meetings
-        expected_new_meetings = meetings
-
-        # Assertions
-        self.assertEqual(new_meetings, expected_new_meetings)
-        mock_query_manager.execute.assert_called_once_with(
-            "SELECT number FROM meetings WHERE number in (%s,%s,%s)",
-            [1, 2, 3]
-        )
-        mock_query_manager.fetchall.assert_called_once()
-
-    def test_get_new_meetings_all_existing(self):
-        # Mock the SqlQueryManager instance
-        mock_query_manager = MagicMock(spec=SqlQueryManager)
-        mock_query_manager.execute = MagicMock()
-        mock_query_manager.fetchall = MagicMock(return_value=[(1,), (2,), (3,)])
-
-        # Define the meetings data
-        meetings = [
-            {"number": 1, "name": "Meeting1"},
-            {"number": 2, "name": "Meeting2"},
-            {"number": 3, "name": "Meeting3"}
-        ]
-
-        # Call the function
-        new_meetings = _get_new_meetings(meetings, mock_query_manager)
-
-        # Expected new meetings
-        expected_new_meetings = []
-
-        # Assertions
-        self.assertEqual(new_meetings, expected_new_meetings)
-        mock_query_manager.execute.assert_called_once_with(
-            "SELECT number FROM meetings WHERE number in (%s,%s,%s)",
-            [1, 2, 3]
-        )
-        mock_query_manager.fetchall.assert_called_once()
-
-    def test_get_new_subjects(self):
-        # Mock the SqlQueryManager instance
-        mock_query_manager = MagicMock(spec=SqlQueryManager)
-        mock_query_manager.execute = MagicMock()
-        mock_query_manager.fetchall = MagicMock(return_value=[("Subject1", 1), ("Subject2", 2)])
-
-        # Define the meetings data
-        meetings = [
-            {"number": 1, "subjects": ["Subject1", "Subject3"]},
-            {"number": 2, "subjects": ["Subject2", "Subject4"]},
-            {"number": 3, "subjects": ["Subject5"]}
-        ]
-
-        # Call the function
-        new_subjects = _get_new_subjects(meetings, mock_query_manager)
-
-        # Expected new subjects
-        expected_new_subjects = {("Subject3", 1), ("Subject4", 2), ("Subject5", 3)}
-
-        # Assertions
-        self.assertEqual(new_subjects, expected_new_subjects)
-        mock_query_manager.execute.assert_called_once_with(
-            "SELECT name, meeting_number FROM meeting_subjects WHERE (name, meeting_number) IN ((%s, %s),(%s, %s),(%s, %s),(%s, %s),(%s, %s))",
-            ["Subject1", 1, "Subject3", 1, "Subject2", 2, "Subject4", 2, "Subject5", 3]
-        )
-        mock_query_manager.fetchall.assert_called_once()
-
-    def test_get_new_subjects_no_existing(self):
-        # Mock the SqlQueryManager instance
-        mock_query_manager = MagicMock(spec=SqlQueryManager)
-        mock_query_manager.execute = MagicMock()
-        mock_query_manager.fetchall = MagicMock(return_value=[])
-
-        # Define the meetings data
-        meetings = [
-            {"number": 1, "subjects": ["Subject1", "Subject3"]},
-            {"number": 2, "subjects": ["Subject2", "Subject4"]},
-            {"number": 3, "subjects": ["Subject5"]}
-        ]
-
-        # Call the function
-        new_subjects = _get_new_subjects(meetings, mock_query_manager)
-
-        # Expected new subjects
-        expected_new_subjects = {("Subject1", 1), ("Subject3", 1), ("Subject2", 2), ("Subject4", 2), ("Subject5", 3)}
-
-        # Assertions
-        self.assertEqual(new_subjects, expected_new_subjects)
-        mock_query_manager.execute.assert_called_once_with(
-            ("SELECT name, meeting_number FROM meeting_subjects WHERE (name, meeting_number) IN "
-             "((%s, %s),(%s, %s),(%s, %s),(%s, %s),(%s, %s))"),
-            ["Subject1", 1, "Subject3", 1, "Subject2", 2, "Subject4", 2, "Subject5", 3]
-        )
-        mock_query_manager.fetchall.assert_called_once()
-
-    def test_get_new_subjects_all_existing(self):
-        # Mock the SqlQueryManager instance
-        mock_query_manager = MagicMock(spec=SqlQueryManager)
-        mock_query_manager.execute = MagicMock()
-        mock_query_manager.fetchall = MagicMock(return_value=[
-            ("Subject1", 1), ("Subject3", 1), ("Subject2", 2), ("Subject4", 2), ("Subject5", 3)
-        ])
-
-        # Define the meetings data
-        meetings = [
-            {"number": 1, "subjects": ["Subject1", "Subject3"]},
-            {"number": 2, "subjects": ["Subject2", "Subject4"]},
-            {"number": 3, "subjects": ["Subject5"]}
-        ]
-
-        # Call the function
-        new_subjects = _get_new_subjects(meetings, mock_query_manager)
-
-        # Expected new subjects
-        expected_new_subjects = set()
-
-        # Assertions
-        self.assertEqual(new_subjects, expected_new_subjects)
-        mock_query_manager.execute.assert_called_once_with(
-            ("SELECT name, meeting_number FROM meeting_subjects WHERE (name, meeting_number) IN "
-             "((%s, %s),(%s, %s),(%s, %s),(%s, %s),(%s, %s))"),
-            ["Subject1", 1, "Subject3", 1, "Subject2", 2, "Subject4", 2, "Subject5", 3]
-        )
-        mock_query_manager.fetchall.assert_called_once()
-
     def test_get_meeting_summaries(self):
         # Mock the SqlQueryManager instance
         mock_query_manager = MagicMock(spec=SqlQueryManager)
@@ -555,6 +460,20 @@ class TestDbTools(unittest.TestCase):
         )
         mock_query_manager.fetchall.assert_called_once()
 
+    def test_iter_meeting_summaries(self):
+        # Arrange
+        mock_query_manager = MagicMock(spec=SqlQueryManager)
+        mock_query_manager.fetchmany.side_effect = [[(1, "Summary 1"), (2, "Summary 2")], [(3, "Summary 3")], []]
+
+        # Act
+        batches = list(iter_meeting_summaries(mock_query_manager, batch_size=2))
+
+        # Assert
+        self.assertEqual(batches, [[(1, "Summary 1"), (2, "Summary 2")], [(3, "Summary 3")]])
+        mock_query_manager.execute.assert_called_once_with(
+            "SELECT vector_id, summary FROM meeting_summaries WHERE vector_id IS NOT NULL")
+        mock_query_manager.fetchmany.assert_called_with(2)
+
     def test_get_meeting_summaries_empty_vector_ids(self):
         # Mock the SqlQueryManager instance
         mock_query_manager = MagicMock(spec=SqlQueryManager)
@@ -606,5 +525,175 @@ class TestDbTools(unittest.TestCase):
         mock_create_tables.assert_called_once_with(mock_query_manager)
 
 
+
+@patch.dict("tools.db_tools.CONNECTION_POOLS", clear=True)
+class TestSqlConnectionPool(unittest.TestCase):
+
+    @patch("tools.db_tools.connector.connect")
+    def test_pooled_query_managers_reuse_connection(self, mock_connect):
+        # Arrange
+        mock_conn = MagicMock(in_transaction=False)
+        mock_connect.return_value = mock_conn
+        db_config = DbConfig()
+
+        # Act
+        for _ in range(3):
+            with SqlQueryManager(db_config, pooled=True) as manager:
+                manager.execute("SELECT 1")
+
+        # Assert
+        mock_connect.assert_called_once()
+        self.assertEqual(mock_conn.cursor.return_value.close.call_count, 3)
+        mock_conn.close.assert_not_called()
+        mock_conn.rollback.assert_not_called()
+
+    @patch("tools.db_tools.connector.connect")
+    def test_pooled_query_manager_rolls_back_uncommitted_changes(self, mock_connect):
+        # Arrange
+        mock_conn = MagicMock(in_transaction=True)
+        mock_connect.return_value = mock_conn
+
+        # Act
+        with SqlQueryManager(DbConfig(), pooled=True) as manager:
+            manager.execute("DELETE FROM meetings")
+
+        # Assert
+        mock_conn.rollback.assert_called_once()
+        mock_conn.close.assert_not_called()
+
+    def test_checkout_replaces_broken_connection(self):
+        # Arrange
+        broken_conn = MagicMock()
+        broken_conn.is_connected.return_value = False
+        new_conn = MagicMock()
+        connection_pool = SqlConnectionPool(MagicMock(side_effect=[broken_conn, new_conn]), size=2)
+        connection_pool.checkin(connection_pool.checkout())
+
+        # Act
+        db_conn = connection_pool.checkout()
+
+        # Assert
+        self.assertIs(db_conn, new_conn)
+        broken_conn.close.assert_called_once()
+
+    @patch("tools.db_tools.time.monotonic")
+    def test_idle_connections_are_recycled(self, mock_monotonic):
+        # Arrange
+        mock_monotonic.return_value = 1000.0
+        first_conn, second_conn = MagicMock(), MagicMock()
+        connection_pool = SqlConnectionPool(MagicMock(side_effect=[first_conn, second_conn]), size=2,
+                                            max_idle_seconds=60)
+        connection_pool.checkin(connection_pool.checkout())
+        mock_monotonic.return_value = 1061.0
+
+        # Act
+        db_conn = connection_pool.checkout()
+
+        # Assert
+        self.assertIs(db_conn, second_conn)
+        first_conn.close.assert_called_once()
+        first_conn.is_connected.assert_not_called()
+
+    def test_checkout_times_out_when_all_connections_are_checked_out(self):
+        # Arrange
+        connection_pool = SqlConnectionPool(MagicMock(), size=1, checkout_timeout_seconds=0.01)
+        connection_pool.checkout()
+
+        # Act & Assert
+        with self.assertRaises(SqlConnectionPoolTimeoutException):
+            connection_pool.checkout()
+
+    def test_discarded_connection_is_closed_and_frees_its_slot(self):
+        # Arrange
+        connection_pool = SqlConnectionPool(MagicMock(), size=1, checkout_timeout_seconds=0.01)
+        db_conn = connection_pool.checkout()
+
+        # Act
+        connection_pool.checkin(db_conn, discard=True)
+
+        # Assert
+        db_conn.close.assert_called_once()
+        self.assertIsNotNone(connection_pool.checkout())
+
+
+SQL_DUMP = """CREATE DATABASE IF NOT EXISTS test;
+-- MariaDB dump; not a statement
+/*!40014 SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0 */;
+/* A comment; not a statement */
+LOCK TABLES `test`.`meetings` WRITE;
+INSERT INTO `test`.`meetings` VALUES (1,'2024-01-01','09:00:00','10:00:00','EST');
+INSERT INTO `test`.`meeting_summaries` VALUES
+(1,10,'It\\'s a summary; with a semicolon',1,'The Chair'),
+(2,11,'A ''quoted'' word -- and a dash',1,'Mr. \\"Smith\\"');
+UNLOCK TABLES;
+"""
+
+
+class TestSqlDump(unittest.TestCase):
+
+    def test_iter_sql_statements(self):
+        # Act
+        statements = list(iter_sql_statements(SQL_DUMP.splitlines(keepends=True)))
+
+        # Assert
+        self.assertEqual(statements, [
+            "CREATE DATABASE IF NOT EXISTS test",
+            "/*!40014 SET @OLD_FOREIGN_KEY_CHECKS=@@FOREIGN_KEY_CHECKS, FOREIGN_KEY_CHECKS=0 */",
+            "LOCK TABLES `test`.`meetings` WRITE",
+            "INSERT INTO `test`.`meetings` VALUES (1,'2024-01-01','09:00:00','10:00:00','EST')",
+            ("INSERT INTO `test`.`meeting_summaries` VALUES\n"
+             "(1,10,'It\\'s a summary; with a semicolon',1,'The Chair'),\n"
+             "(2,11,'A ''quoted'' word -- and a dash',1,'Mr. \\\"Smith\\\"')"),
+            "UNLOCK TABLES"
+        ])
+
+    def test_iter_sql_statements_string_spanning_lines(self):
+        # Act
+        statements = list(iter_sql_statements(["INSERT INTO t VALUES ('first line;\n", "second line');\n",
+                                               "SELECT 1"]))
+
+        # Assert
+        self.assertEqual(statements, ["INSERT INTO t VALUES ('first line;\nsecond line')", "SELECT 1"])
+
+    def test_load_sql_dump(self):
+        # Arrange
+        mock_query_manager = MagicMock(spec=SqlQueryManager)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dump_file_path = os.path.join(temp_dir, "data.sql")
+            with open(dump_file_path, "w", encoding="utf-8") as fh:
+                fh.write(SQL_DUMP)
+
+            # Act
+            executed_statements = load_sql_dump(dump_file_path, mock_query_manager, commit_statements=1)
+
+        # Assert
+        self.assertEqual(executed_statements, 4)
+        executed = [c.args[0] for c in mock_query_manager.method_calls if c[0] == "execute"]
+        self.assertEqual(executed[:2], ["SET FOREIGN_KEY_CHECKS=0", "SET UNIQUE_CHECKS=0"])
+        self.assertEqual(executed[-2:], ["SET UNIQUE_CHECKS=1", "SET FOREIGN_KEY_CHECKS=1"])
+        self.assertFalse(any("LOCK TABLES" in statement for statement in executed))
+        # A transaction per INSERT statement, and the last one.
+        self.assertEqual(mock_query_manager.commit.call_count, 3)
+
+    def test_load_sql_dump_restores_checks_on_error(self):
+        # Arrange
+        def execute(statement):
+            if statement.startswith("INSERT"):
+                raise RuntimeError("Syntax error")
+
+        mock_query_manager = MagicMock(spec=SqlQueryManager)
+        mock_query_manager.execute.side_effect = execute
+        with tempfile.TemporaryDirectory() as temp_dir:
+            dump_file_path = os.path.join(temp_dir, "data.sql")
+            with open(dump_file_path, "w", encoding="utf-8") as fh:
+                fh.write(SQL_DUMP)
+
+            # Act & Assert
+            with self.assertRaises(RuntimeError):
+                load_sql_dump(dump_file_path, mock_query_manager)
+        mock_query_manager.commit.assert_not_called()
+        mock_query_manager.execute.assert_called_with("SET FOREIGN_KEY_CHECKS=1")
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,46 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from tools.embeddings_migration import migrate_meeting_summaries_embeddings, InvalidMigrationTargetException
+
+
+@patch("tools.embeddings_migration.SqlQueryManager")
+@patch("tools.embeddings_migration.iter_meeting_summaries")
+@patch("tools.embeddings_migration.vector_db_tool")
+class TestEmbeddingsMigration(unittest.TestCase):
+
+    def test_migrate_meeting_summaries_embeddings_keeps_vector_ids(self, mock_vector_db_tool,
+                                                                  mock_iter_meeting_summaries, MockSqlQueryManager):
+        # Arrange
+        mock_vector_db_tool.MILVUS_CONFIG.meeting_summaries = "meeting_summaries"
+        mock_vector_db_tool.get_embedding_dim.return_value = 384
+        mock_iter_meeting_summaries.return_value = iter([[(11, "Summary 1"), (12, "Summary 2")], [(15, "Summary 3")]])
+        embedding_service = mock_vector_db_tool.EmbeddingService.return_value
+        embedding_service.embed_batch.side_effect = lambda summaries: [[0.1] * 384 for _ in summaries]
+        collection = mock_vector_db_tool.init_collection.return_value
+        collection.insert.side_effect = lambda data: MagicMock(insert_count=len(data[0]))
+
+        # Act
+        rows_count = migrate_meeting_summaries_embeddings("meeting_summaries_minilm", "org/minilm", batch_size=2)
+
+        # Assert
+        self.assertEqual(rows_count, 3)
+        mock_vector_db_tool.EmbeddingService.assert_called_once_with("org/minilm", "org/minilm")
+        mock_vector_db_tool.init_collection.assert_called_once_with("meeting_summaries_minilm", 384, auto_id_pk=False)
+        mock_iter_meeting_summaries.assert_called_once_with(MockSqlQueryManager.return_value.__enter__.return_value, 2)
+        self.assertEqual([c.args[0][0] for c in collection.insert.call_args_list], [[11, 12], [15]])
+        embedding_service.embed_batch.assert_any_call(["Summary 1", "Summary 2"])
+        collection.flush.assert_called_once()
+
+    def test_migrate_meeting_summaries_embeddings_into_current_collection_raises_exception(
+            self, mock_vector_db_tool, mock_iter_meeting_summaries, MockSqlQueryManager):
+        # Arrange
+        mock_vector_db_tool.MILVUS_CONFIG.meeting_summaries = "meeting_summaries"
+
+        # Act & Assert
+        with self.assertRaises(InvalidMigrationTargetException):
+            migrate_meeting_summaries_embeddings("meeting_summaries", "org/minilm")
+        mock_vector_db_tool.init_collection.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
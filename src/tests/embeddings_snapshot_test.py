@@ -0,0 +1,103 @@
+import os
+import json
+import tempfile
+import unittest
+import numpy as np
+from tools.embeddings_snapshot import (
+    EmbeddingsSnapshotWriter,
+    InvalidSnapshotException,
+    save_embeddings_snapshot,
+    load_embeddings_snapshot,
+    iter_embeddings_snapshot,
+    convert_embeddings_json_to_snapshot
+)
+
+
+class TestEmbeddingsSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.snapshot_file_path = os.path.join(self.temp_dir.name, "vector_embeddings.bin")
+        rnd = np.random.default_rng(133)
+        self.ids = rnd.integers(1, 2 ** 62, size=7, dtype=np.int64)
+        self.embeddings = rnd.standard_normal((7, 5), dtype=np.float32)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_save_and_load_snapshot(self):
+        save_embeddings_snapshot(self.snapshot_file_path, self.ids, self.embeddings)
+
+        ids, embeddings = load_embeddings_snapshot(self.snapshot_file_path)
+
+        self.assertIsInstance(embeddings, np.memmap)
+        np.testing.assert_array_equal(ids, self.ids)
+        np.testing.assert_array_equal(embeddings, self.embeddings)
+
+    def test_writer_appends_chunks(self):
+        with EmbeddingsSnapshotWriter(self.snapshot_file_path, 5) as writer:
+            writer.write(self.ids[:3], self.embeddings[:3])
+            writer.write(self.ids[3:], self.embeddings[3:].tolist())
+
+        ids, embeddings = load_embeddings_snapshot(self.snapshot_file_path)
+
+        np.testing.assert_array_equal(ids, self.ids)
+        np.testing.assert_array_equal(embeddings, self.embeddings)
+        self.assertFalse(os.path.exists(f"{self.snapshot_file_path}.tmp"))
+
+    def test_writer_rejects_embeddings_with_wrong_dimension(self):
+        with self.assertRaises(ValueError):
+            with EmbeddingsSnapshotWriter(self.snapshot_file_path, 4) as writer:
+                writer.write(self.ids, self.embeddings)
+
+        self.assertFalse(os.path.exists(self.snapshot_file_path))
+        self.assertFalse(os.path.exists(f"{self.snapshot_file_path}.tmp"))
+
+    def test_iter_snapshot_in_chunks(self):
+        save_embeddings_snapshot(self.snapshot_file_path, self.ids, self.embeddings)
+
+        chunks = list(iter_embeddings_snapshot(self.snapshot_file_path, 3))
+
+        self.assertEqual([len(ids) for ids, _ in chunks], [3, 3, 1])
+        np.testing.assert_array_equal(np.concatenate([ids for ids, _ in chunks]), self.ids)
+        np.testing.assert_array_equal(np.concatenate([e for _, e in chunks]), self.embeddings)
+
+    def test_load_empty_snapshot(self):
+        save_embeddings_snapshot(self.snapshot_file_path, [], np.empty((0, 5)))
+
+        ids, embeddings = load_embeddings_snapshot(self.snapshot_file_path)
+
+        self.assertEqual(ids.shape, (0,))
+        self.assertEqual(embeddings.shape, (0, 5))
+
+    def test_load_truncated_snapshot_raises(self):
+        save_embeddings_snapshot(self.snapshot_file_path, self.ids, self.embeddings)
+        with open(self.snapshot_file_path, "r+b") as fh:
+            fh.truncate(os.path.getsize(self.snapshot_file_path) - 8)
+
+        with self.assertRaises(InvalidSnapshotException):
+            load_embeddings_snapshot(self.snapshot_file_path)
+
+    def test_load_json_file_raises(self):
+        with open(self.snapshot_file_path, "w") as fh:
+            fh.write('[{"id": 1, "embedding": [0.5]}]')
+
+        with self.assertRaises(InvalidSnapshotException):
+            load_embeddings_snapshot(self.snapshot_file_path)
+
+    def test_convert_legacy_json(self):
+        json_file_path = os.path.join(self.temp_dir.name, "vector_embeddings.json")
+        with open(json_file_path, "w") as fh:
+            json.dump([{"id": int(i), "embedding": [float(v) for v in e]}
+                       for i, e in zip(self.ids, self.embeddings)], fh)
+
+        convert_embeddings_json_to_snapshot(json_file_path, self.snapshot_file_path)
+        ids, embeddings = load_embeddings_snapshot(self.snapshot_file_path)
+
+        np.testing.assert_array_equal(ids, self.ids)
+        np.testing.assert_array_equal(embeddings, self.embeddings)
+        self.assertLess(os.path.getsize(self.snapshot_file_path), os.path.getsize(json_file_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+import time
+import tempfile
+import threading
+import unittest
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from tools.http_tools import HttpFetcher, HostRateLimiter, ResponseCache
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests_count += 1
+            server.client_ports.add(self.client_address[1])
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            failures_left = server.failures.get(self.path, 0)
+            if failures_left > 0:
+                server.failures[self.path] = failures_left - 1
+        time.sleep(server.response_delay)
+        if server.etag is not None and self.headers.get("If-None-Match") == server.etag:
+            with server.lock:
+                server.not_modified_count += 1
+                server.in_flight -= 1
+            self.send_response(304)
+            self.send_header("ETag", server.etag)
+            self.end_headers()
+            return
+        status = 503 if failures_left > 0 else 200
+        body = self.path.encode("utf8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if server.etag is not None:
+            self.send_header("ETag", server.etag)
+        self.end_headers()
+        self.wfile.write(body)
+        with server.lock:
+            server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestHttpTools(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubRequestHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests_count = 0
+        self.server.client_ports = set()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.failures = {}
+        self.server.response_delay = 0.0
+        self.server.etag = None
+        self.server.not_modified_count = 0
+        self.server_thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.server_thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_get_reuses_connection(self):
+        with HttpFetcher(requests_per_second=0) as fetcher:
+            for i in range(5):
+                response = fetcher.get(f"{self.base_url}/page-{i}")
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.text, f"/page-{i}")
+
+        self.assertEqual(self.server.requests_count, 5)
+        self.assertEqual(len(self.server.client_ports), 1)
+
+    def test_get_retries_failed_requests(self):
+        self.server.failures["/flaky"] = 2
+
+        with HttpFetcher(requests_per_second=0, max_retries=3, backoff_factor=0.01) as fetcher:
+            response = fetcher.get(f"{self.base_url}/flaky")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.requests_count, 3)
+
+    def test_get_returns_last_response_when_retries_exhausted(self):
+        self.server.failures["/down"] = 10
+
+        with HttpFetcher(requests_per_second=0, max_retries=2, backoff_factor=0.01) as fetcher:
+            response = fetcher.get(f"{self.base_url}/down")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.requests_count, 3)
+
+    def test_map_bounds_requests_per_host_and_keeps_order(self):
+        self.server.response_delay = 0.05
+        urls = [f"{self.base_url}/item-{i}" for i in range(12)]
+
+        with HttpFetcher(max_workers=8, max_workers_per_host=3, requests_per_second=0) as fetcher:
+            results = fetcher.map(lambda url: fetcher.get(url).text, urls)
+
+        self.assertEqual(results, [f"/item-{i}" for i in range(12)])
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_get_sends_conditional_requests_for_cached_pages(self):
+        self.server.etag = '"v1"'
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with HttpFetcher(requests_per_second=0, cache=ResponseCache(cache_dir)) as fetcher:
+                first_response = fetcher.get(f"{self.base_url}/evidence")
+                second_response = fetcher.get(f"{self.base_url}/evidence")
+
+        self.assertFalse(first_response.from_cache)
+        self.assertTrue(second_response.from_cache)
+        self.assertEqual(second_response.status_code, 200)
+        self.assertEqual(second_response.text, "/evidence")
+        self.assertEqual(self.server.requests_count, 2)
+        self.assertEqual(self.server.not_modified_count, 1)
+
+    def test_get_refreshes_cache_when_page_changes(self):
+        self.server.etag = '"v1"'
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir)
+            with HttpFetcher(requests_per_second=0, cache=cache) as fetcher:
+                fetcher.get(f"{self.base_url}/evidence")
+                self.server.etag = '"v2"'
+                response = fetcher.get(f"{self.base_url}/evidence")
+                metadata = cache.get_metadata(f"{self.base_url}/evidence")
+
+        self.assertFalse(response.from_cache)
+        self.assertEqual(self.server.not_modified_count, 0)
+        self.assertEqual(metadata["etag"], '"v2"')
+
+    def test_response_cache_store_detects_unchanged_content(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = ResponseCache(cache_dir)
+            with HttpFetcher(requests_per_second=0) as fetcher:
+                response = fetcher.get(f"{self.base_url}/page")
+                self.assertTrue(cache.store(f"{self.base_url}/page", response))
+                self.assertFalse(cache.store(f"{self.base_url}/page", response))
+                self.assertEqual(cache.load(f"{self.base_url}/page").text, "/page")
+            self.assertIsNone(cache.load(f"{self.base_url}/other"))
+
+    def test_host_rate_limiter(self):
+        rate_limiter = HostRateLimiter(requests_per_second=50)
+        start = time.monotonic()
+        for _ in range(6):
+            rate_limiter.wait()
+        elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 5 * (1 / 50) * 0.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,123 @@
+import os
+import torch
+import unittest
+import tempfile
+from unittest.mock import patch, MagicMock
+from tools.inference_backends import (
+    OnnxEmbeddingModel,
+    UnsupportedInferenceBackendException,
+    SEQ2SEQ_TASK,
+    FEATURE_EXTRACTION_TASK,
+    export_onnx_model,
+    get_onnx_model_dir,
+    load_embedding_model,
+    load_summarization_pipeline,
+    get_cosine_similarity,
+    get_rouge_l
+)
+
+
+class FakeOrtModel:
+
+    def __init__(self):
+        self.input_names = {"input_ids": 0, "attention_mask": 1, "decoder_input_ids": 2}
+        self.config = MagicMock(pad_token_id=1, decoder_start_token_id=2)
+        self.model = MagicMock()
+        self.model.run.return_value = [torch.ones((1, 3, 4)).numpy()]
+
+
+class TestInferenceBackends(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+
+    @patch("tools.inference_backends.pipeline")
+    def test_load_summarization_pipeline_with_pytorch_backend(self, mock_pipeline):
+        # Act
+        summarization_pipeline = load_summarization_pipeline("model", "tokenizer", "pytorch")
+
+        # Assert
+        self.assertEqual(summarization_pipeline, mock_pipeline.return_value)
+        mock_pipeline.assert_called_once_with("summarization", model="model", tokenizer="tokenizer")
+
+    @patch("tools.inference_backends.AutoTokenizer")
+    @patch("tools.inference_backends.pipeline")
+    @patch("tools.inference_backends.export_onnx_model", return_value="onnx_model_dir")
+    @patch("tools.inference_backends._get_ort_model_class")
+    def test_load_summarization_pipeline_with_quantized_onnx_backend(self, mock_get_ort_model_class,
+                                                                     mock_export_onnx_model, mock_pipeline,
+                                                                     mock_AutoTokenizer):
+        # Act
+        load_summarization_pipeline("model", "tokenizer", "onnx-int8")
+
+        # Assert
+        mock_export_onnx_model.assert_called_once_with("model", SEQ2SEQ_TASK, quantized=True)
+        mock_get_ort_model_class.return_value.from_pretrained.assert_called_once_with("onnx_model_dir")
+        mock_pipeline.assert_called_once_with("summarization",
+                                              model=mock_get_ort_model_class.return_value.from_pretrained.return_value,
+                                              tokenizer=mock_AutoTokenizer.from_pretrained.return_value)
+
+    @patch("tools.inference_backends.export_onnx_model", return_value="onnx_model_dir")
+    @patch("tools.inference_backends._get_ort_model_class")
+    def test_load_embedding_model_with_onnx_backend(self, mock_get_ort_model_class, mock_export_onnx_model):
+        # Act
+        embedding_model = load_embedding_model("model", "onnx")
+
+        # Assert
+        self.assertIsInstance(embedding_model, OnnxEmbeddingModel)
+        mock_export_onnx_model.assert_called_once_with("model", FEATURE_EXTRACTION_TASK, quantized=False)
+
+    def test_load_with_unsupported_backend_raises_exception(self):
+        with self.assertRaises(UnsupportedInferenceBackendException):
+            load_embedding_model("model", "tensorrt")
+        with self.assertRaises(UnsupportedInferenceBackendException):
+            load_summarization_pipeline("model", "tokenizer", "tensorrt")
+
+    @patch("tools.inference_backends._quantize_onnx_model")
+    @patch("tools.inference_backends._get_ort_model_class")
+    def test_export_onnx_model_exports_and_quantizes_once(self, mock_get_ort_model_class, mock_quantize_onnx_model):
+        # Arrange
+        mock_ort_model = mock_get_ort_model_class.return_value.from_pretrained.return_value
+        mock_ort_model.save_pretrained.side_effect = lambda model_dir: os.makedirs(model_dir)
+        mock_quantize_onnx_model.side_effect = lambda model_dir, quantized_model_dir: os.makedirs(quantized_model_dir)
+
+        # Act
+        first_model_dir = export_onnx_model("org/model", SEQ2SEQ_TASK, True, self.temp_dir.name)
+        second_model_dir = export_onnx_model("org/model", SEQ2SEQ_TASK, True, self.temp_dir.name)
+
+        # Assert
+        self.assertEqual(first_model_dir, get_onnx_model_dir("org/model", SEQ2SEQ_TASK, True, self.temp_dir.name))
+        self.assertEqual(second_model_dir, first_model_dir)
+        mock_get_ort_model_class.return_value.from_pretrained.assert_called_once_with("org/model", export=True)
+        mock_quantize_onnx_model.assert_called_once_with(
+            get_onnx_model_dir("org/model", SEQ2SEQ_TASK, False, self.temp_dir.name), first_model_dir)
+
+    def test_onnx_embedding_model_creates_decoder_inputs(self):
+        # Arrange
+        ort_model = FakeOrtModel()
+        embedding_model = OnnxEmbeddingModel(ort_model)
+
+        # Act
+        outputs = embedding_model(input_ids=torch.tensor([[0, 5, 2]]), attention_mask=torch.tensor([[1, 1, 1]]))
+
+        # Assert
+        self.assertTrue(torch.equal(outputs.last_hidden_state, torch.ones((1, 3, 4))))
+        onnx_inputs = ort_model.model.run.call_args.args[1]
+        self.assertEqual(onnx_inputs["decoder_input_ids"].tolist(), [[2, 0, 5]])
+        self.assertEqual(set(onnx_inputs.keys()), {"input_ids", "attention_mask", "decoder_input_ids"})
+
+    def test_get_cosine_similarity(self):
+        self.assertAlmostEqual(get_cosine_similarity([1.0, 2.0], [2.0, 4.0]), 1.0)
+        self.assertAlmostEqual(get_cosine_similarity([1.0, 0.0], [0.0, 1.0]), 0.0)
+        self.assertEqual(get_cosine_similarity([0.0, 0.0], [1.0, 1.0]), 0.0)
+
+    def test_get_rouge_l(self):
+        self.assertEqual(get_rouge_l("The committee met", "the committee met"), 1.0)
+        self.assertAlmostEqual(get_rouge_l("the committee met today", "the committee met"), 6 / 7)
+        self.assertEqual(get_rouge_l("budget", "the committee met"), 0.0)
+        self.assertEqual(get_rouge_l("", ""), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
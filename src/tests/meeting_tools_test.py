@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import mock_open, patch
+from unittest.mock import mock_open, patch, MagicMock
 import json
 from tools.meetings_tools import (
     load_meetings,
@@ -186,7 +186,7 @@ class TestMeetingTools(unittest.TestCase):
 
         # Mock the SummarizationTool instance
         mock_summarization_tool_instance = MockSummarizationTool.return_value
-        mock_summarization_tool_instance.run.side_effect = [
+        mock_summarization_tool_instance.run_batch.return_value = [
             ["Summary of Person1's speech."],
             ["Summary of Person2's speech."]
         ]
@@ -218,8 +218,24 @@ class TestMeetingTools(unittest.TestCase):
         # Assertions
         self.assertEqual(summaries, expected_summaries)
         mock_get_meeting_docs_per_person.assert_called_once_with(meeting)
-        self.assertEqual(mock_summarization_tool_instance.run.call_count, 2)
+        mock_summarization_tool_instance.run_batch.assert_called_once_with([["Line 1.", "Line 2."], ["Line 3."]])
         self.assertEqual(mock_summarization_tool_instance.total_input_tokens_count, 100)
+    @patch('tools.meetings_tools.get_meeting_docs_per_person')
+    @patch('tools.meetings_tools.SummarizationTool')
+    def test_create_meeting_summaries_with_shared_summarization_tool(self, MockSummarizationTool,
+                                                                     mock_get_meeting_docs_per_person):
+        # Arrange
+        mock_get_meeting_docs_per_person.return_value = {"Person1": ["Line 1."]}
+        summarization_tool = MagicMock()
+        summarization_tool.run_batch.return_value = [["Summary 1.", "Summary 2."]]
+
+        # Act
+        summaries = create_meeting_summaries({"interventions": []}, summarization_tool)
+
+        # Assert
+        self.assertEqual(summaries, [("Person1", "Summary 1. Summary 2.")])
+        MockSummarizationTool.assert_not_called()
+        summarization_tool.run_batch.assert_called_once_with([["Line 1."]])
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,241 @@
+import os
+import re
+import glob
+import random
+import consts
+import threading
+import unittest
+from bs4 import BeautifulSoup
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from tools.http_tools import HttpFetcher
+from meetings_data_scraper import (
+    get_meetings,
+    get_meeting_interventions,
+    iter_meeting_interventions,
+    remove_special_character,
+    normalize_text,
+    normalize_text_line,
+    PageNotFoundException,
+    parse_url
+)
+
+EVIDENCE_XML_FIXTURE_PATH = os.path.join(os.path.dirname(__file__), "data", "meeting_evidence.xml")
+
+MEETINGS_PAGE = """<html><body>
+<div class="meeting-item meeting-item-2024-06-20">
+  <span class="meeting-number">Meeting 133</span>
+  <span class="the-time">3:30 p.m. - 5:30 p.m. (EDT)</span>
+  <ul><li class="current-study">Report 6, Chapter 2</li></ul>
+</div>
+<div class="meeting-item meeting-item-2024-06-18">
+  <span class="meeting-number">Meeting 132</span>
+  <span class="the-time">11:00 a.m. - 1:00 p.m. (EDT)</span>
+  <ul><li class="current-study">Report 5</li><li class="current-study">Committee business</li></ul>
+</div>
+<div class="meeting-item meeting-item-2024-06-13">
+  <span class="meeting-number">Meeting 131</span>
+  <span class="the-time">3:30 p.m. - 5:30 p.m. (EDT)</span>
+  <ul><li class="current-study">Report 4</li></ul>
+</div>
+</body></html>"""
+
+EVIDENCE_PAGE = """<html><body>
+<a class="btn btn-export-xml" href="/Content/meeting-{0}.xml">XML</a>
+</body></html>"""
+
+EVIDENCE_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<Hansard><HansardBody>
+<Intervention id="{0}01">
+  <PersonSpeaking><Affiliation>The Chair (Mr. John Williamson)</Affiliation></PersonSpeaking>
+  <Content><ParaText>I call meeting {0} to order.</ParaText><ParaText>Welcome  to everyone.</ParaText></Content>
+</Intervention>
+<Intervention id="{0}02">
+  <PersonSpeaking><Affiliation>Ms. Karen Hogan (Auditor General)</Affiliation></PersonSpeaking>
+  <Content><ParaText>Thank you, Mr. Chair.</ParaText></Content>
+</Intervention>
+</HansardBody></Hansard>"""
+
+
+class StubParliamentHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requested_paths.append(self.path)
+        body = None
+        if self.path == "/meetings":
+            body = MEETINGS_PAGE
+        elif match := re.fullmatch(r"/meeting-(\d+)/evidence", self.path):
+            if match.group(1) not in self.server.missing_meetings:
+                body = EVIDENCE_PAGE.format(match.group(1))
+        elif match := re.fullmatch(r"/Content/meeting-(\d+)\.xml", self.path):
+            body = EVIDENCE_XML.format(match.group(1))
+        body = (body or "Not found").encode("utf8")
+        self.send_response(200 if body != b"Not found" else 404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestMeetingsDataScraper(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubParliamentHandler)
+        self.server.missing_meetings = set()
+        self.server.requested_paths = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.fetcher = HttpFetcher(requests_per_second=0, backoff_factor=0.01)
+
+    def tearDown(self):
+        self.fetcher.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_parse_url_raises_for_missing_page(self):
+        with self.assertRaises(PageNotFoundException):
+            parse_url(f"{self.base_url}/unknown", fetcher=self.fetcher)
+
+    def test_get_meeting_interventions(self):
+        interventions = get_meeting_interventions(133, self.base_url + "/meeting-{0}/evidence", self.fetcher)
+
+        self.assertEqual(interventions, [
+            {
+                "id": "13301",
+                "person_speaking": "The Chair (Mr. John Williamson)",
+                "text_lines": ["I call meeting 133 to order.", "Welcome  to everyone."]
+            },
+            {
+                "id": "13302",
+                "person_speaking": "Ms. Karen Hogan (Auditor General)",
+                "text_lines": ["Thank you, Mr. Chair."]
+            }
+        ])
+
+    def test_get_meetings_keeps_meetings_page_order(self):
+        meetings = get_meetings(f"{self.base_url}/meetings", self.base_url + "/meeting-{0}/evidence", self.fetcher)
+
+        self.assertEqual([m["number"] for m in meetings], [133, 132, 131])
+        self.assertEqual(meetings[1]["date"], "2024-06-18")
+        self.assertEqual(meetings[1]["start_time"], "11:00")
+        self.assertEqual(meetings[1]["end_time"], "13:00")
+        self.assertEqual(meetings[1]["time_zone"], "EDT")
+        self.assertEqual(meetings[1]["subjects"], ["Report 5", "Committee business"])
+        self.assertEqual(meetings[1]["interventions"][0]["id"], "13201")
+
+    def test_get_meetings_skips_missing_evidence(self):
+        self.server.missing_meetings.add("132")
+
+        meetings = get_meetings(f"{self.base_url}/meetings", self.base_url + "/meeting-{0}/evidence", self.fetcher)
+
+        self.assertEqual([m["number"] for m in meetings], [133, 131])
+
+    def test_get_meetings_reuses_existing_meetings(self):
+        existing_meetings = {
+            132: {"number": 132, "interventions": []},
+            120: {"number": 120, "interventions": []}
+        }
+
+        meetings = get_meetings(f"{self.base_url}/meetings", self.base_url + "/meeting-{0}/evidence", self.fetcher,
+                                existing_meetings)
+
+        self.assertEqual([m["number"] for m in meetings], [133, 132, 131, 120])
+        self.assertIs(meetings[1], existing_meetings[132])
+        self.assertNotIn("/meeting-132/evidence", self.server.requested_paths)
+        self.assertIn("/meeting-133/evidence", self.server.requested_paths)
+
+    def test_iter_meeting_interventions_matches_beautifulsoup_parser(self):
+        regex_multiple_spaces = re.compile(r"\s+")
+        with open(EVIDENCE_XML_FIXTURE_PATH, encoding="utf8") as fh:
+            soup = BeautifulSoup(fh.read(), features="lxml")
+        expected_interventions = [{
+            "id": xml_intervention.attrs["id"],
+            "person_speaking": remove_special_character(xml_intervention.find("affiliation").text,
+                                                        regex_multiple_spaces),
+            "text_lines": [" ".join([remove_special_character(word, regex_multiple_spaces)
+                                     for word in p.text.strip().split(" ")])
+                           for p in xml_intervention.find_all("paratext")]
+        } for xml_intervention in soup.find_all("intervention")]
+
+        interventions = list(iter_meeting_interventions(EVIDENCE_XML_FIXTURE_PATH))
+
+        self.assertEqual(len(interventions), 7)
+        self.assertEqual(interventions, expected_interventions)
+        self.assertEqual(interventions[0]["person_speaking"], "The Chair (Mr. John Williamson (Saint John Rothesay, CPC))")
+        self.assertEqual(interventions[1]["text_lines"][2][-51:], "that federal organizations considered alternatives.")
+        self.assertEqual(interventions[4]["text_lines"][1], "")
+
+    def test_iter_meeting_interventions_is_lazy(self):
+        interventions = iter_meeting_interventions(EVIDENCE_XML_FIXTURE_PATH)
+
+        self.assertEqual(next(interventions)["id"], "12345701")
+        self.assertEqual(next(interventions)["id"], "12345702")
+
+
+class TestTextNormalization(unittest.TestCase):
+    # Characters the per-word normalization treats differently: ASCII whitespace, ASCII control characters,
+    # DEL, non-ASCII whitespace and multi-byte UTF-8 characters.
+    ALPHABET = [" ", " ", " ", "\t", "\n", "\r", "\x0b", "\x0c", "\x1c", "\x1f", "\x7f", "\x00", "\x08",
+                "a", "B", "7", ".", "(", "\xe9", "\u2014", "\u2019", "\xa0", "\u2003", "\u3000", "\u200b",
+                "\x85", "\u2028", "\U0001f600"]
+
+    def setUp(self):
+        self.regex_multiple_spaces = re.compile(r"\s+")
+
+    def _normalize_text_line_per_word(self, text: str) -> str:
+        return " ".join([remove_special_character(word, self.regex_multiple_spaces)
+                         for word in text.strip().split(" ")])
+
+    def test_normalize_text_line(self):
+        self.assertEqual(normalize_text_line("  Saint John\u2014Rothesay,  CPC \u2014 done.\t"),
+                         "Saint John Rothesay,  CPC  done.")
+
+    def test_normalize_text(self):
+        self.assertEqual(normalize_text("\u2003The Chair\n (Mr.\u00a0John\tWilliamson) \u2014"),
+                         "The Chair (Mr. John Williamson)")
+
+    def test_normalization_matches_per_word_normalization_on_random_text(self):
+        rnd = random.Random(133)
+        for _ in range(20000):
+            text = "".join(rnd.choice(self.ALPHABET) for _ in range(rnd.randint(0, 16)))
+            self.assertEqual(normalize_text_line(text), self._normalize_text_line_per_word(text), repr(text))
+            self.assertEqual(normalize_text(text), remove_special_character(text, self.regex_multiple_spaces),
+                             repr(text))
+
+    def _assert_normalization_matches_on_evidence_xml(self, xml: str) -> list[str]:
+        # The raw Affiliation and ParaText texts, the scraper normalizes them while parsing
+        soup = BeautifulSoup(xml, features="lxml")
+        affiliations = [affiliation.text for affiliation in soup.find_all("affiliation")]
+        text_lines = [p.text for p in soup.find_all("paratext")]
+        self.assertTrue(text_lines)
+        for affiliation in affiliations:
+            self.assertEqual(normalize_text(affiliation),
+                             remove_special_character(affiliation, self.regex_multiple_spaces), repr(affiliation))
+        for text_line in text_lines:
+            self.assertEqual(normalize_text_line(text_line), self._normalize_text_line_per_word(text_line),
+                             repr(text_line))
+        return text_lines
+
+    def test_normalization_matches_per_word_normalization_on_evidence_fixture(self):
+        with open(EVIDENCE_XML_FIXTURE_PATH, encoding="utf8") as fh:
+            text_lines = self._assert_normalization_matches_on_evidence_xml(fh.read())
+
+        self.assertTrue(any(normalize_text_line(text_line) != text_line for text_line in text_lines))
+
+    @unittest.skipUnless(glob.glob(os.path.join(consts.SCRAPER_CACHE_DIR, "*.body")), "scraper cache not available")
+    def test_normalization_matches_per_word_normalization_on_cached_evidence(self):
+        evidence_xml_count = 0
+        for file_path in sorted(glob.glob(os.path.join(consts.SCRAPER_CACHE_DIR, "*.body"))):
+            with open(file_path, encoding="utf8", errors="replace") as fh:
+                body = fh.read()
+            if body.lstrip().startswith("<?xml"):
+                evidence_xml_count += 1
+                self._assert_normalization_matches_on_evidence_xml(body)
+        if not evidence_xml_count:
+            self.skipTest("no evidence XML in the scraper cache")
+
+
+if __name__ == "__main__":
+    unittest.main()
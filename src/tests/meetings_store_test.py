@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import tempfile
+import unittest
+from unittest.mock import patch
+from tools.meetings_store import MeetingsStore, convert_meetings_json, get_meetings_store
+
+
+def create_meeting(number: int, text: str = "Line 1.") -> dict:
+    return {
+        "number": number,
+        "date": "2024-06-20",
+        "subjects": [f"Subject {number}"],
+        "interventions": [{"id": f"{number}01", "person_speaking": "The Chair", "text_lines": [text]}]
+    }
+
+
+class TestMeetingsStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_file_path = os.path.join(self.temp_dir.name, "meetings.jsonl")
+        self.meetings_file_path = os.path.join(self.temp_dir.name, "meetings.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_append_and_get_meeting(self):
+        store = MeetingsStore(self.store_file_path)
+        store.append([create_meeting(133), create_meeting(132, "Café.")])
+        store.append(create_meeting(131))
+
+        self.assertEqual(len(store), 3)
+        self.assertIn(132, store)
+        self.assertNotIn(130, store)
+        self.assertEqual(store.meeting_numbers(), [133, 132, 131])
+        self.assertEqual(store.get_meeting(132), create_meeting(132, "Café."))
+        self.assertEqual(store.get_meeting(131), create_meeting(131))
+        with self.assertRaises(KeyError):
+            store.get_meeting(130)
+
+    def test_iter_meetings(self):
+        store = MeetingsStore(self.store_file_path)
+        self.assertEqual(list(store.iter_meetings()), [])
+        store.append([create_meeting(133), create_meeting(132)])
+
+        self.assertEqual(list(store.iter_meetings()), [create_meeting(133), create_meeting(132)])
+        # The store can be iterated over multiple times, like a list of meetings.
+        self.assertEqual([m["number"] for m in store], [133, 132])
+
+    def test_appended_meeting_supersedes_stored_meeting(self):
+        store = MeetingsStore(self.store_file_path)
+        store.append([create_meeting(133), create_meeting(132)])
+        store.append(create_meeting(133, "Updated."))
+
+        self.assertEqual(len(store), 2)
+        self.assertEqual(store.get_meeting(133), create_meeting(133, "Updated."))
+        self.assertEqual(list(store), [create_meeting(132), create_meeting(133, "Updated.")])
+
+    def test_index_is_reused_by_new_store_instances(self):
+        MeetingsStore(self.store_file_path).append([create_meeting(133), create_meeting(132)])
+
+        store = MeetingsStore(self.store_file_path)
+
+        self.assertEqual(store.meeting_numbers(), [133, 132])
+        self.assertEqual(store.get_meeting(132), create_meeting(132))
+
+    def test_outdated_index_is_rebuilt(self):
+        MeetingsStore(self.store_file_path).append(create_meeting(133))
+        with open(self.store_file_path, "a", encoding="utf8") as fh:
+            fh.write(json.dumps(create_meeting(132)) + "\n")
+
+        store = MeetingsStore(self.store_file_path)
+
+        self.assertEqual(store.meeting_numbers(), [133, 132])
+        self.assertEqual(store.get_meeting(132), create_meeting(132))
+
+    def test_incomplete_record_is_dropped(self):
+        MeetingsStore(self.store_file_path).append(create_meeting(133))
+        with open(self.store_file_path, "a", encoding="utf8") as fh:
+            fh.write(json.dumps(create_meeting(132))[:20])
+
+        store = MeetingsStore(self.store_file_path)
+        store.append(create_meeting(131))
+
+        self.assertEqual(list(MeetingsStore(self.store_file_path)), [create_meeting(133), create_meeting(131)])
+
+    def test_convert_meetings_json(self):
+        with open(self.meetings_file_path, "w", encoding="utf8") as fh:
+            json.dump([create_meeting(133), create_meeting(132)], fh)
+
+        store = convert_meetings_json(self.meetings_file_path, self.store_file_path)
+        convert_meetings_json(self.meetings_file_path, self.store_file_path)
+
+        self.assertEqual(list(store), [create_meeting(133), create_meeting(132)])
+        self.assertEqual(len(MeetingsStore(self.store_file_path)), 2)
+
+    def test_get_meetings_store_adds_meetings_from_updated_json_file(self):
+        with open(self.meetings_file_path, "w", encoding="utf8") as fh:
+            json.dump([create_meeting(132)], fh)
+        self.assertEqual(get_meetings_store(self.store_file_path, self.meetings_file_path).meeting_numbers(), [132])
+        with open(self.meetings_file_path, "w", encoding="utf8") as fh:
+            json.dump([create_meeting(133), create_meeting(132)], fh)
+        future_time = time.time() + 10
+        os.utime(self.meetings_file_path, (future_time, future_time))
+
+        store = get_meetings_store(self.store_file_path, self.meetings_file_path)
+
+        self.assertEqual(store.meeting_numbers(), [132, 133])
+
+    def test_get_meetings_store_does_not_reload_converted_json_file(self):
+        with open(self.meetings_file_path, "w", encoding="utf8") as fh:
+            json.dump([create_meeting(132)], fh)
+        get_meetings_store(self.store_file_path, self.meetings_file_path)
+        # The .json file is updated without new meetings.
+        future_time = time.time() + 10
+        os.utime(self.meetings_file_path, (future_time, future_time))
+        get_meetings_store(self.store_file_path, self.meetings_file_path)
+
+        with patch("tools.meetings_store.convert_meetings_json") as mock_convert_meetings_json:
+            store = get_meetings_store(self.store_file_path, self.meetings_file_path)
+
+        mock_convert_meetings_json.assert_not_called()
+        self.assertEqual(store.meeting_numbers(), [132])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,16 +1,49 @@
 import os
 import sys
+import tempfile
 import unittest
-from pymilvus import MilvusException
-from unittest.mock import patch, mock_open, MagicMock
+from unittest.mock import patch, MagicMock, call
 from tools.persistence_store_builder import (init_meetings_persistence_store,
                                              build_meetings_persistence_store,
                                              load_saved_data,
+                                             MeetingSummariesWriter,
+                                             BuildCheckpoint,
                                              SqlQueryManager)
 
 
 class TestPersistenceStoreBuilder(unittest.TestCase):
 
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.spool_file_path = os.path.join(self.temp_dir.name, "pending_summaries.jsonl")
+        self.state_file_path = os.path.join(self.temp_dir.name, "build_state.json")
+        self.metrics_file_path = os.path.join(self.temp_dir.name, "build_metrics.prom")
+        worker_pool_patcher = patch("tools.persistence_store_builder.SummarizationWorkerPool")
+        scheduler_patcher = patch("tools.persistence_store_builder.SummarizationScheduler")
+        self.mock_SummarizationWorkerPool = worker_pool_patcher.start()
+        self.mock_SummarizationScheduler = scheduler_patcher.start()
+        self.addCleanup(worker_pool_patcher.stop)
+        self.addCleanup(scheduler_patcher.stop)
+        self.scheduled_meetings = []
+        self.meeting_summaries = {}
+        self.mock_SummarizationScheduler.return_value.run.side_effect = self._run_scheduler
+        self.mock_SummarizationScheduler.return_value.failed_meeting_numbers = []
+        summary_cache_patcher = patch("tools.persistence_store_builder.SummaryCache")
+        self.mock_SummaryCache = summary_cache_patcher.start()
+        self.addCleanup(summary_cache_patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run_scheduler(self, meetings):
+        for meeting in meetings:
+            self.scheduled_meetings.append(meeting)
+            # Meetings without summaries stand for meetings with text chunks that failed every retry.
+            if meeting["number"] in self.meeting_summaries:
+                yield meeting, self.meeting_summaries[meeting["number"]]
+            else:
+                self.mock_SummarizationScheduler.return_value.failed_meeting_numbers.append(meeting["number"])
+
     @patch("tools.persistence_store_builder.vector_db_tool")
     @patch("tools.persistence_store_builder.init_db")
     def test_init_meetings_persistence_store(self, mock_init_db, mock_vector_db_tool):
@@ -22,7 +55,7 @@ class TestPersistenceStoreBuilder(unittest.TestCase):
         init_meetings_persistence_store(mock_query_manager, auto_id_pk)
 
         # Assert
-        mock_vector_db_tool.init_vectors_store.assert_called_once_with(auto_id_pk)
+        mock_vector_db_tool.init_vectors_store.assert_called_once_with(auto_id_pk, True)
         mock_init_db.assert_called_once_with(mock_query_manager)
 
     @patch("tools.persistence_store_builder.vector_db_tool")
@@ -36,21 +69,22 @@ class TestPersistenceStoreBuilder(unittest.TestCase):
         init_meetings_persistence_store(mock_query_manager, auto_id_pk)
 
         # Assert
-        mock_vector_db_tool.init_vectors_store.assert_called_once_with(auto_id_pk)
+        mock_vector_db_tool.init_vectors_store.assert_called_once_with(auto_id_pk, True)
         mock_init_db.assert_called_once_with(mock_query_manager)
 
     @patch("tools.persistence_store_builder.vector_db_tool")
     @patch("tools.persistence_store_builder.SqlQueryManager")
     @patch("tools.persistence_store_builder.init_meetings_persistence_store")
     @patch("tools.persistence_store_builder.consts")
-    @patch("builtins.open", new_callable=mock_open, read_data="SQL_DATA")
-    def test_load_saved_data(self, mock_open, mock_consts, mock_init_meetings_persistence_store, mock_SqlQueryManager,
-                             mock_vector_db_tool):
+    @patch("tools.persistence_store_builder.load_sql_dump")
+    def test_load_saved_data(self, mock_load_sql_dump, mock_consts, mock_init_meetings_persistence_store,
+                             mock_SqlQueryManager, mock_vector_db_tool):
         # Arrange
         mock_query_manager = MagicMock()
         mock_SqlQueryManager.return_value.__enter__.return_value = mock_query_manager
         mock_consts.SQL_DATA_FILE_PATH = "fake_path.sql"
         mock_consts.VECTOR_DB_EMBEDDINGS_FILE_PATH = "fake_embeddings_path"
+        mock_consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH = "fake_embeddings_snapshot_path"
 
         # Act
         load_saved_data()
@@ -59,48 +93,312 @@ class TestPersistenceStoreBuilder(unittest.TestCase):
         mock_vector_db_tool.connect.assert_called_once()
         mock_vector_db_tool.disconnect.assert_called_once()
         mock_init_meetings_persistence_store.assert_called_once_with(mock_query_manager, auto_id_pk=False)
-        mock_open.assert_called_once_with("fake_path.sql", "r")
-        mock_query_manager.execute.assert_called_once_with("SQL_DATA")
+        mock_load_sql_dump.assert_called_once_with("fake_path.sql", mock_query_manager, show_progress=False)
         mock_vector_db_tool.load_meeting_summaries_embeddings.assert_called_once_with("fake_embeddings_path")
+        mock_vector_db_tool.load_meeting_summaries_embeddings_snapshot.assert_not_called()
+
+    @patch("tools.persistence_store_builder.os.path.exists", return_value=True)
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.SqlQueryManager")
+    @patch("tools.persistence_store_builder.init_meetings_persistence_store")
+    @patch("tools.persistence_store_builder.consts")
+    @patch("tools.persistence_store_builder.load_sql_dump")
+    def test_load_saved_data_prefers_embeddings_snapshot(self, mock_load_sql_dump, mock_consts,
+                                                         mock_init_meetings_persistence_store, mock_SqlQueryManager,
+                                                         mock_vector_db_tool, mock_exists):
+        # Arrange
+        mock_consts.SQL_DATA_FILE_PATH = "fake_path.sql"
+        mock_consts.VECTOR_DB_EMBEDDINGS_FILE_PATH = "fake_embeddings_path"
+        mock_consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH = "fake_embeddings_snapshot_path"
+
+        # Act
+        load_saved_data()
+
+        # Assert
+        mock_exists.assert_called_once_with("fake_embeddings_snapshot_path")
+        mock_vector_db_tool.load_meeting_summaries_embeddings_snapshot.assert_called_once_with(
+            "fake_embeddings_snapshot_path")
+        mock_vector_db_tool.load_meeting_summaries_embeddings.assert_not_called()
 
     @patch("tools.persistence_store_builder.vector_db_tool")
     @patch("tools.persistence_store_builder.SqlQueryManager")
     @patch("tools.persistence_store_builder.init_meetings_persistence_store")
     @patch("tools.persistence_store_builder.insert_meetings")
     @patch("tools.persistence_store_builder.insert_meeting_subjects")
-    @patch("tools.persistence_store_builder.create_meeting_summaries")
     @patch("tools.persistence_store_builder.insert_meeting_summaries")
     @patch("tools.persistence_store_builder.logger")
     def test_build_meetings_persistence_store(self, mock_logger, mock_insert_meeting_summaries,
-                                              mock_create_meeting_summaries, mock_insert_meeting_subjects,
+                                              mock_insert_meeting_subjects,
                                               mock_insert_meetings, mock_init_meetings_persistence_store,
                                               mock_SqlQueryManager, mock_vector_db_tool):
         # Arrange
         meetings = [{"number": 1}, {"number": 2}]
         mock_query_manager = MagicMock()
         mock_SqlQueryManager.return_value.__enter__.return_value = mock_query_manager
-        mock_create_meeting_summaries.return_value = [("speaker1", "summary1"), ("speaker2", "summary2")]
-        mock_vector_db_tool.insert_meeting_summary.side_effect = [1, 2, 3, MilvusException("Error")]
+        self.meeting_summaries = {1: [("speaker1", "summary1"), ("speaker2", "summary2")],
+                                  2: [("speaker1", "summary1"), ("speaker2", "summary2")]}
+        mock_vector_db_tool.insert_meeting_summaries.return_value = [1, 2, 3, 4]
 
         # Act
-        build_meetings_persistence_store(meetings)
+        build_meetings_persistence_store(meetings, spool_file_path=self.spool_file_path,
+                                         state_file_path=self.state_file_path,
+                                         metrics_file_path=self.metrics_file_path)
 
         # Assert
         mock_vector_db_tool.connect.assert_called_once()
         mock_vector_db_tool.disconnect.assert_called_once()
-        mock_init_meetings_persistence_store.assert_called_once_with(mock_query_manager)
+        mock_init_meetings_persistence_store.assert_called_once_with(mock_query_manager, drop_existing=True)
         mock_insert_meetings.assert_called_once_with(meetings, mock_query_manager)
         mock_insert_meeting_subjects.assert_called_once_with(meetings, mock_query_manager)
-        mock_create_meeting_summaries.assert_any_call(meetings[0])
-        mock_create_meeting_summaries.assert_any_call(meetings[1])
-        mock_vector_db_tool.insert_meeting_summary.assert_any_call("summary1")
-        mock_vector_db_tool.insert_meeting_summary.assert_any_call("summary2")
-        mock_insert_meeting_summaries.assert_called_once_with([(1, "summary1", 1, "speaker1")], mock_query_manager)
-        mock_insert_meeting_summaries.assert_called_once_with([(1, "summary1", 1, "speaker1")], mock_query_manager)
+        self.mock_SummarizationScheduler.assert_called_once_with(
+            self.mock_SummarizationWorkerPool.return_value.__enter__.return_value, batch_size=4,
+            summary_cache=self.mock_SummaryCache.return_value.__enter__.return_value)
+        self.assertEqual(self.scheduled_meetings, meetings)
+        mock_vector_db_tool.insert_meeting_summaries.assert_called_once_with(
+            ["summary1", "summary2", "summary1", "summary2"])
+        mock_insert_meeting_summaries.assert_called_once_with(
+            [(1, "summary1", 1, "speaker1"), (2, "summary2", 1, "speaker2"),
+             (3, "summary1", 2, "speaker1"), (4, "summary2", 2, "speaker2")], mock_query_manager)
+        mock_query_manager.commit.assert_called_once()
+        self.assertEqual(BuildCheckpoint(self.state_file_path).get_stage(2), BuildCheckpoint.PERSISTED)
         mock_logger.info.assert_any_call("Processing meeting 1 ...")
         mock_logger.info.assert_any_call("Processing meeting 2 ...")
-        mock_logger.info.assert_any_call("2 summaries created.")
-        mock_logger.info.assert_any_call("2 summaries created.")
+        mock_logger.info.assert_any_call("2 summaries of meeting 2 created.")
+        with open(self.metrics_file_path, encoding="utf8") as fh:
+            metrics_text = fh.read()
+        self.assertIn("meetings_build_persisted_meetings_total 2", metrics_text)
+        self.assertIn("meetings_build_persisted_summaries_total 4", metrics_text)
+        self.assertIn("meetings_build_meetings_done 2", metrics_text)
+        self.assertFalse(os.path.exists(self.spool_file_path))
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    def test_summaries_writer_flushes_at_thresholds(self, mock_insert_meeting_summaries, mock_vector_db_tool):
+        # Arrange
+        mock_query_manager = MagicMock()
+        mock_vector_db_tool.insert_meeting_summaries.side_effect = lambda summaries: list(range(len(summaries)))
+        summaries_writer = MeetingSummariesWriter(mock_query_manager, self.spool_file_path,
+                                                  flush_size=3, flush_meetings=2)
+
+        # Act
+        summaries_writer.add(1, [("speaker1", "summary1"), ("speaker2", "summary2"), ("speaker3", "summary3")])
+        summaries_writer.add(2, [("speaker1", "summary4")])
+        summaries_writer.add(3, [("speaker1", "summary5")])
+        summaries_writer.add(4, [("speaker1", "summary6")])
+
+        # Assert
+        self.assertEqual(mock_vector_db_tool.insert_meeting_summaries.call_args_list, [
+            call(["summary1", "summary2", "summary3"]),
+            call(["summary4", "summary5"])
+        ])
+        self.assertEqual(mock_insert_meeting_summaries.call_count, 2)
+        self.assertTrue(summaries_writer.is_pending(4))
+        self.assertFalse(summaries_writer.is_pending(3))
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    def test_summaries_writer_resumes_failed_chunk(self, mock_insert_meeting_summaries, mock_vector_db_tool):
+        # Arrange
+        mock_query_manager = MagicMock()
+        mock_vector_db_tool.insert_meeting_summaries.return_value = [10, 11]
+        mock_insert_meeting_summaries.side_effect = [Exception("Lost connection"), None]
+        summaries_writer = MeetingSummariesWriter(mock_query_manager, self.spool_file_path, flush_size=10)
+        summaries_writer.add(1, [("speaker1", "summary1"), ("speaker2", "summary2")])
+
+        # Act
+        with self.assertRaises(Exception):
+            summaries_writer.flush()
+        resumed_summaries_writer = MeetingSummariesWriter(mock_query_manager, self.spool_file_path, flush_size=10)
+        resumed_summaries_writer.flush()
+
+        # Assert
+        mock_query_manager.rollback.assert_called_once()
+        mock_vector_db_tool.delete_meeting_summaries.assert_called_once_with([10, 11])
+        self.assertFalse(resumed_summaries_writer.is_pending(1))
+        mock_insert_meeting_summaries.assert_called_with([(10, "summary1", 1, "speaker1"),
+                                                          (11, "summary2", 1, "speaker2")], mock_query_manager)
+        mock_query_manager.commit.assert_called_once()
+        self.assertFalse(os.path.exists(self.spool_file_path))
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.SqlQueryManager")
+    @patch("tools.persistence_store_builder.init_meetings_persistence_store")
+    @patch("tools.persistence_store_builder.insert_meetings")
+    @patch("tools.persistence_store_builder.insert_meeting_subjects")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    @patch("tools.persistence_store_builder.get_summarized_meeting_numbers", return_value=set())
+    def test_build_meetings_persistence_store_skips_spooled_meetings(self, mock_get_summarized_meeting_numbers,
+                                                                     mock_insert_meeting_summaries,
+                                                                     mock_insert_meeting_subjects,
+                                                                     mock_insert_meetings,
+                                                                     mock_init_meetings_persistence_store,
+                                                                     mock_SqlQueryManager, mock_vector_db_tool):
+        # Arrange
+        with open(self.spool_file_path, "w", encoding="utf8") as fh:
+            fh.write('{"meeting_number": 1, "speaker": "speaker1", "summary": "spooled summary"}\n')
+            fh.write('{"meeting_number": 2, "speak')
+        self.meeting_summaries = {2: [("speaker1", "summary2")]}
+        mock_vector_db_tool.insert_meeting_summaries.return_value = [1, 2]
+
+        # Act
+        build_meetings_persistence_store([{"number": 1}, {"number": 2}], spool_file_path=self.spool_file_path,
+                                         resume=True, state_file_path=self.state_file_path,
+                                         metrics_file_path=self.metrics_file_path)
+
+        # Assert
+        self.assertEqual(self.scheduled_meetings, [{"number": 2}])
+        mock_vector_db_tool.insert_meeting_summaries.assert_called_once_with(["spooled summary", "summary2"])
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.SqlQueryManager")
+    @patch("tools.persistence_store_builder.init_meetings_persistence_store")
+    @patch("tools.persistence_store_builder.insert_meetings")
+    @patch("tools.persistence_store_builder.insert_meeting_subjects")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    def test_build_meetings_persistence_store_drops_spooled_summaries_without_resume(
+            self, mock_insert_meeting_summaries, mock_insert_meeting_subjects, mock_insert_meetings,
+            mock_init_meetings_persistence_store, mock_SqlQueryManager, mock_vector_db_tool):
+        # Arrange
+        with open(self.spool_file_path, "w", encoding="utf8") as fh:
+            fh.write('{"meeting_number": 1, "speaker": "speaker1", "summary": "spooled summary"}\n')
+        self.meeting_summaries = {1: [("speaker1", "summary1")], 2: [("speaker1", "summary2")]}
+        mock_vector_db_tool.insert_meeting_summaries.return_value = [1, 2]
+
+        # Act
+        build_meetings_persistence_store([{"number": 1}, {"number": 2}], spool_file_path=self.spool_file_path,
+                                         state_file_path=self.state_file_path,
+                                         metrics_file_path=self.metrics_file_path)
+
+        # Assert
+        self.assertEqual(self.scheduled_meetings, [{"number": 1}, {"number": 2}])
+        mock_vector_db_tool.insert_meeting_summaries.assert_called_once_with(["summary1", "summary2"])
+        self.assertFalse(os.path.exists(self.spool_file_path))
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.SqlQueryManager")
+    @patch("tools.persistence_store_builder.init_meetings_persistence_store")
+    @patch("tools.persistence_store_builder.insert_meetings")
+    @patch("tools.persistence_store_builder.insert_meeting_subjects")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    @patch("tools.persistence_store_builder.get_summarized_meeting_numbers")
+    def test_build_meetings_persistence_store_resumes_from_checkpoint(self, mock_get_summarized_meeting_numbers,
+                                                                      mock_insert_meeting_summaries,
+                                                                       mock_insert_meeting_subjects,
+                                                                      mock_insert_meetings,
+                                                                      mock_init_meetings_persistence_store,
+                                                                      mock_SqlQueryManager, mock_vector_db_tool):
+        # Arrange
+        meetings = [{"number": 1}, {"number": 2}, {"number": 3}, {"number": 4}]
+        mock_query_manager = MagicMock()
+        mock_SqlQueryManager.return_value.__enter__.return_value = mock_query_manager
+        checkpoint = BuildCheckpoint(self.state_file_path)
+        checkpoint.set_stage([1], BuildCheckpoint.PERSISTED)
+        # Meeting 2 was committed but the build stopped before its checkpoint was saved.
+        checkpoint.set_stage([2, 3], BuildCheckpoint.EMBEDDED, {2: [20], 3: [30, 31]})
+        with open(self.spool_file_path, "w", encoding="utf8") as fh:
+            fh.write('{"meeting_number": 2, "speaker": "speaker1", "summary": "summary2"}\n')
+            fh.write('{"meeting_number": 3, "speaker": "speaker1", "summary": "summary3"}\n')
+        mock_get_summarized_meeting_numbers.return_value = {1, 2}
+        self.meeting_summaries = {4: [("speaker1", "summary4")]}
+        mock_vector_db_tool.insert_meeting_summaries.return_value = [40, 41]
+
+        # Act
+        build_meetings_persistence_store(meetings, spool_file_path=self.spool_file_path, resume=True,
+                                         state_file_path=self.state_file_path,
+                                         metrics_file_path=self.metrics_file_path)
+
+        # Assert
+        mock_init_meetings_persistence_store.assert_called_once_with(mock_query_manager, drop_existing=False)
+        mock_vector_db_tool.delete_meeting_summaries.assert_called_once_with([30, 31])
+        self.assertEqual(self.scheduled_meetings, [{"number": 4}])
+        mock_vector_db_tool.insert_meeting_summaries.assert_called_once_with(["summary3", "summary4"])
+        mock_insert_meeting_summaries.assert_called_once_with([(40, "summary3", 3, "speaker1"),
+                                                               (41, "summary4", 4, "speaker1")], mock_query_manager)
+        checkpoint = BuildCheckpoint(self.state_file_path)
+        self.assertEqual([checkpoint.get_stage(n) for n in [1, 2, 3, 4]], [BuildCheckpoint.PERSISTED] * 4)
+        self.assertEqual(checkpoint.get_embedded_vector_ids(), {})
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.SqlQueryManager")
+    @patch("tools.persistence_store_builder.init_meetings_persistence_store")
+    @patch("tools.persistence_store_builder.insert_meetings")
+    @patch("tools.persistence_store_builder.insert_meeting_subjects")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    @patch("tools.persistence_store_builder.get_summarized_meeting_numbers", return_value={1})
+    @patch("tools.persistence_store_builder.logger")
+    def test_build_meetings_persistence_store_leaves_failed_meetings_to_resume(
+            self, mock_logger, mock_get_summarized_meeting_numbers, mock_insert_meeting_summaries,
+            mock_insert_meeting_subjects, mock_insert_meetings, mock_init_meetings_persistence_store,
+            mock_SqlQueryManager, mock_vector_db_tool):
+        # Arrange
+        meetings = [{"number": 1}, {"number": 2}]
+        mock_query_manager = MagicMock()
+        mock_SqlQueryManager.return_value.__enter__.return_value = mock_query_manager
+        self.meeting_summaries = {1: [("speaker1", "summary1")]}
+        mock_vector_db_tool.insert_meeting_summaries.side_effect = [[10], [20]]
+
+        # Act
+        build_meetings_persistence_store(meetings, spool_file_path=self.spool_file_path,
+                                         state_file_path=self.state_file_path,
+                                         metrics_file_path=self.metrics_file_path)
+        failed_build_checkpoint = BuildCheckpoint(self.state_file_path)
+        self.scheduled_meetings = []
+        self.meeting_summaries = {2: [("speaker1", "summary2")]}
+        self.mock_SummarizationScheduler.return_value.failed_meeting_numbers = []
+        build_meetings_persistence_store(meetings, spool_file_path=self.spool_file_path, resume=True,
+                                         state_file_path=self.state_file_path,
+                                         metrics_file_path=self.metrics_file_path)
+
+        # Assert
+        self.assertEqual(failed_build_checkpoint.get_stage(1), BuildCheckpoint.PERSISTED)
+        self.assertIsNone(failed_build_checkpoint.get_stage(2))
+        mock_logger.error.assert_called_once_with("Summarization of meetings [2] failed, they are not persisted "
+                                                  "and are summarized again when the build is resumed.")
+        self.assertEqual(self.scheduled_meetings, [{"number": 2}])
+        mock_vector_db_tool.insert_meeting_summaries.assert_has_calls([call(["summary1"]), call(["summary2"])])
+        mock_insert_meeting_summaries.assert_has_calls([call([(10, "summary1", 1, "speaker1")], mock_query_manager),
+                                                        call([(20, "summary2", 2, "speaker1")], mock_query_manager)])
+        self.assertEqual(BuildCheckpoint(self.state_file_path).get_stage(2), BuildCheckpoint.PERSISTED)
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    def test_summaries_writer_persists_meetings_without_summaries(self, mock_insert_meeting_summaries,
+                                                                  mock_vector_db_tool):
+        # Arrange
+        checkpoint = BuildCheckpoint(self.state_file_path)
+        summaries_writer = MeetingSummariesWriter(MagicMock(), self.spool_file_path, flush_size=10,
+                                                  checkpoint=checkpoint)
+        summaries_writer.add(1, [])
+
+        # Act
+        summaries_writer.flush()
+
+        # Assert
+        mock_vector_db_tool.insert_meeting_summaries.assert_not_called()
+        mock_insert_meeting_summaries.assert_not_called()
+        self.assertFalse(summaries_writer.is_pending(1))
+        self.assertEqual(BuildCheckpoint(self.state_file_path).get_stage(1), BuildCheckpoint.PERSISTED)
+
+    @patch("tools.persistence_store_builder.vector_db_tool")
+    @patch("tools.persistence_store_builder.insert_meeting_summaries")
+    def test_summaries_writer_records_embedded_vectors_in_checkpoint(self, mock_insert_meeting_summaries,
+                                                                    mock_vector_db_tool):
+        # Arrange
+        checkpoint = BuildCheckpoint(self.state_file_path)
+        mock_vector_db_tool.insert_meeting_summaries.return_value = [10, 11, 12]
+        mock_insert_meeting_summaries.side_effect = SystemExit()
+        summaries_writer = MeetingSummariesWriter(MagicMock(), self.spool_file_path, flush_size=10,
+                                                  checkpoint=checkpoint)
+        summaries_writer.add(1, [("speaker1", "summary1"), ("speaker2", "summary2")])
+        summaries_writer.add(2, [("speaker1", "summary3")])
+
+        # Act
+        with self.assertRaises(SystemExit):
+            summaries_writer.flush()
+
+        # Assert
+        self.assertEqual(BuildCheckpoint(self.state_file_path).get_embedded_vector_ids(), {1: [10, 11], 2: [12]})
+        mock_vector_db_tool.delete_meeting_summaries.assert_not_called()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import patch, MagicMock, AsyncMock
+from tools.async_db_tools import close_async_connection_pools
+from tools.prompt_tool import Query, QueryPlan, QueryType, OpenAIPrompt
+
+
+def create_mock_pool(*fetchall_results: tuple) -> MagicMock:
+    # aiomysql cursors return the rows of a query as a tuple.
+    mock_cursor = MagicMock(execute=AsyncMock(return_value=1), fetchall=AsyncMock(side_effect=fetchall_results),
+                            close=AsyncMock())
+    mock_conn = MagicMock(cursor=AsyncMock(return_value=mock_cursor), rollback=AsyncMock())
+    mock_conn.get_transaction_status.return_value = False
+    return MagicMock(acquire=AsyncMock(return_value=mock_conn), wait_closed=AsyncMock())
+
+
+def create_query_plan() -> QueryPlan:
+    return QueryPlan(query_plan=[
+        Query(id=1, parameters={"columns": ["number"]}, dependencies=[], query_type=QueryType.MEETING_SEARCH),
+        Query(id=2, parameters={"columns": ["speaker"], "filter": [{"field": "meeting_number", "value": "1.number"}]},
+              dependencies=[1], query_type=QueryType.SUMMARY_SEARCH)
+    ])
+
+
+@patch("tools.async_db_tools.aiomysql.create_pool", new_callable=AsyncMock)
+class TestPromptToolAsync(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        await close_async_connection_pools()
+
+    async def test_query_run_async_returns_list(self, mock_create_pool):
+        # Arrange
+        mock_create_pool.return_value = create_mock_pool(((1,), (2,)))
+        query = create_query_plan().query_plan[0]
+
+        # Act
+        results = await query.run_async()
+
+        # Assert
+        self.assertEqual(results, [(1,), (2,)])
+
+    async def test_query_plan_execute_async_filters_by_dependency_results(self, mock_create_pool):
+        # Arrange
+        mock_pool = create_mock_pool(((1,), (2,)), (("Speaker A",),))
+        mock_create_pool.return_value = mock_pool
+        mock_cursor = mock_pool.acquire.return_value.cursor.return_value
+
+        # Act
+        results = await create_query_plan().execute_async()
+
+        # Assert
+        self.assertEqual(results, {1: [(1,), (2,)], 2: [("Speaker A",)]})
+        self.assertEqual(mock_cursor.execute.await_args_list[1].args[0],
+                         "SELECT speaker FROM meeting_summaries WHERE meeting_number IN (1,2)")
+
+    @patch.object(OpenAIPrompt, "_prompt_llm_model", return_value="Speaker A spoke in meetings 1 and 2.")
+    @patch.object(OpenAIPrompt, "_get_query_planner")
+    async def test_generate_async(self, mock_get_query_planner, mock_prompt_llm_model, mock_create_pool):
+        # Arrange
+        mock_get_query_planner.return_value = create_query_plan()
+        mock_create_pool.return_value = create_mock_pool(((1,), (2,)), (("Speaker A",),))
+
+        # Act
+        answer = await OpenAIPrompt().generate_async("Who spoke in the meetings?")
+
+        # Assert
+        self.assertEqual(answer, "Speaker A spoke in meetings 1 and 2.")
+        prompt_text = mock_prompt_llm_model.call_args.args[0]
+        self.assertIn("meetings numbers: 1,2", prompt_text)
+        self.assertIn("summaries speakers: Speaker A", prompt_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
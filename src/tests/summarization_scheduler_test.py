@@ -0,0 +1,132 @@
+import unittest
+from unittest.mock import patch, MagicMock
+from tools.summarization_scheduler import SummarizationScheduler
+
+
+def create_meeting(number: int, speeches: list[tuple[str, str]]) -> dict:
+    return {
+        "number": number,
+        "interventions": [{"person_speaking": speaker, "text_lines": [text]} for speaker, text in speeches]
+    }
+
+
+class TestSummarizationScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.summarized_docs = []
+        summarization_tool_patcher = patch("tools.summarization_scheduler.SummarizationTool")
+        hierarchical_tool_patcher = patch("tools.summarization_scheduler.HierarchicalSummarizationTool")
+        self.mock_SummarizationTool = summarization_tool_patcher.start()
+        self.mock_HierarchicalSummarizationTool = hierarchical_tool_patcher.start()
+        self.addCleanup(summarization_tool_patcher.stop)
+        self.addCleanup(hierarchical_tool_patcher.stop)
+        self.mock_HierarchicalSummarizationTool.return_value.run_batch.side_effect = self._summarize
+
+    def _summarize(self, docs_lists):
+        self.summarized_docs.append(docs_lists)
+        return [f"Summary of {' '.join(docs)}" for docs in docs_lists]
+
+    def test_run_yields_summaries_of_all_speakers_of_every_meeting(self):
+        # Arrange
+        meetings = [
+            create_meeting(1, [("Chair (Mr. Smith)", "Welcome."), ("Witness", "Thanks."), ("Chair", "Next.")]),
+            create_meeting(2, []),
+            create_meeting(3, [("Member", "A question.")])
+        ]
+        scheduler = SummarizationScheduler(MagicMock(), summary_cache="summary_cache")
+
+        # Act
+        results = {meeting["number"]: summaries for meeting, summaries in scheduler.run(meetings)}
+
+        # Assert
+        self.assertEqual(results, {
+            1: [("Chair", "Summary of Welcome. Next."), ("Witness", "Summary of Thanks.")],
+            2: [],
+            3: [("Member", "Summary of A question.")]
+        })
+        self.mock_SummarizationTool.assert_called_with(worker_pool=scheduler.worker_pool, batch_size=4,
+                                                       summary_cache="summary_cache")
+        self.mock_HierarchicalSummarizationTool.assert_called_with(self.mock_SummarizationTool.return_value)
+
+    def test_run_starts_longest_jobs_first_across_meetings(self):
+        # Arrange
+        meetings = [
+            create_meeting(1, [("Witness", "Yes."), ("Chair", "A long opening statement.")]),
+            create_meeting(2, [("Member", "A question."), ("Minister", "A very long answer to the question.")])
+        ]
+        scheduler = SummarizationScheduler(MagicMock(), max_jobs=1, job_meetings=1)
+
+        # Act
+        list(scheduler.run(meetings))
+
+        # Assert
+        self.assertEqual(self.summarized_docs, [[["A question."], ["A very long answer to the question."]],
+                                                [["Yes."], ["A long opening statement."]]])
+
+    def test_run_summarizes_speakers_of_several_meetings_in_one_batch(self):
+        # Arrange
+        meetings = [
+            create_meeting(1, [("Chair", "Welcome."), ("Witness", "Thanks.")]),
+            create_meeting(2, [("Chair", "Order."), ("Member", "A question.")]),
+            create_meeting(3, [("Chair", "Adjourned.")])
+        ]
+        scheduler = SummarizationScheduler(MagicMock(), max_jobs=1, job_meetings=2)
+
+        # Act
+        results = {meeting["number"]: summaries for meeting, summaries in scheduler.run(meetings)}
+
+        # Assert
+        self.assertEqual(self.summarized_docs, [[["Order."], ["A question."], ["Welcome."], ["Thanks."]],
+                                                [["Adjourned."]]])
+        self.assertEqual(results[2], [("Chair", "Summary of Order."), ("Member", "Summary of A question.")])
+        self.assertEqual(results[1], [("Chair", "Summary of Welcome."), ("Witness", "Summary of Thanks.")])
+
+    def test_run_yields_meetings_before_reading_past_the_window(self):
+        # Arrange
+        read_meeting_numbers = []
+
+        def read_meetings():
+            for number in [1, 2, 3]:
+                read_meeting_numbers.append(number)
+                yield create_meeting(number, [("Chair", f"Meeting {number}.")])
+
+        scheduler = SummarizationScheduler(MagicMock(), window_meetings=2)
+
+        # Act
+        results = scheduler.run(read_meetings())
+        first_meeting, _ = next(results)
+
+        # Assert
+        self.assertIn(first_meeting["number"], [1, 2])
+        self.assertEqual(read_meeting_numbers, [1, 2])
+        self.assertEqual(len(list(results)), 2)
+        self.assertEqual(read_meeting_numbers, [1, 2, 3])
+
+    def test_run_leaves_out_meetings_with_failed_speakers(self):
+        # Arrange
+        meetings = [
+            create_meeting(1, [("Chair", "Welcome."), ("Witness", "Thanks.")]),
+            create_meeting(2, [("Chair", "Order.")])
+        ]
+        self.mock_HierarchicalSummarizationTool.return_value.failed_docs_indices = {1}
+        scheduler = SummarizationScheduler(MagicMock(), max_jobs=1, job_meetings=2)
+
+        # Act
+        results = list(scheduler.run(meetings))
+
+        # Assert
+        self.assertEqual(results, [(meetings[1], [("Chair", "Summary of Order.")])])
+        self.assertEqual(scheduler.failed_meeting_numbers, [1])
+
+    def test_run_raises_exception_of_failed_job(self):
+        # Arrange
+        self.mock_HierarchicalSummarizationTool.return_value.run_batch.side_effect = RuntimeError("Worker pool broken")
+        scheduler = SummarizationScheduler(MagicMock())
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            list(scheduler.run([create_meeting(1, [("Chair", "Welcome.")])]))
+
+
+if __name__ == "__main__":
+    unittest.main()
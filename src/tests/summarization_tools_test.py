@@ -0,0 +1,598 @@
+import os
+import time
+import unittest
+import tempfile
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch, MagicMock
+from tools.build_metrics import METRICS
+from tools.summary_cache import SummaryCache
+from tools.summarization_tools import (
+    get_summary_length_limits,
+    summarize_text_chunks_batch,
+    SummarizationTool,
+    SummarizationWorkerPool,
+    SummarizationJobTimeoutException,
+    HierarchicalSummarizationTool
+)
+
+
+class FakeTokenizer:
+
+    def __init__(self, special_tokens_count=0):
+        self.special_tokens_count = special_tokens_count
+        self.tokenized_texts = []
+
+    def num_special_tokens_to_add(self):
+        return self.special_tokens_count
+
+    def tokenize(self, text):
+        self.tokenized_texts.append(text)
+        return text.split()
+
+    def convert_tokens_to_string(self, tokens):
+        return " ".join(tokens)
+
+
+class FakeWorkerPool:
+    """Summarizes text chunks in the calling process by upper-casing them."""
+
+    def __init__(self, failing_indices=(), transient_failures=None, summarizer_model_name="facebook/bart-large-cnn",
+                 inference_backend="pytorch"):
+        self.failing_indices = failing_indices
+        self.summarizer_model_name = summarizer_model_name
+        self.inference_backend = inference_backend
+        # Text chunk key -> number of times the chunk fails before it is summarized.
+        self.transient_failures = dict(transient_failures or {})
+        self.submitted = []
+        self.submitted_batches = []
+
+    def _fails(self, index):
+        if self.transient_failures.get(index, 0) > 0:
+            self.transient_failures[index] -= 1
+            return True
+        return index in self.failing_indices
+
+    def submit(self, index, text_chunk, min_tokens_count=100, length_step=32):
+        self.submitted.append((index, text_chunk))
+        future = Future()
+        if self._fails(index):
+            future.set_exception(RuntimeError("index out of range"))
+        else:
+            future.set_result((index, text_chunk.upper()))
+        return future
+
+    def submit_batch(self, text_chunks, min_tokens_count=100, length_step=32):
+        self.submitted_batches.append([key for key, _, _ in text_chunks])
+        future = Future()
+        if any([self._fails(key) for key, _, _ in text_chunks]):
+            future.set_exception(RuntimeError("index out of range"))
+        else:
+            future.set_result([(key, text_chunk.upper()) for key, text_chunk, _ in text_chunks])
+        return future
+
+
+@patch("tools.summarization_tools.AutoTokenizer.from_pretrained", side_effect=lambda name: FakeTokenizer())
+class TestSummarizationTool(unittest.TestCase):
+
+    def test_run_submits_chunks_to_shared_worker_pool(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool()
+        summarization_tool = SummarizationTool(max_input_length=3, worker_pool=worker_pool)
+
+        # Act
+        first_summaries = summarization_tool.run(["one two", "three four", "five"])
+        second_summaries = summarization_tool.run(["six"])
+
+        # Assert
+        self.assertEqual(first_summaries, ["ONE TWO.", "THREE FOUR. FIVE."])
+        self.assertEqual(second_summaries, ["SIX."])
+        self.assertEqual(len(worker_pool.submitted), 3)
+
+    def test_run_skips_failed_chunks(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool(failing_indices=[(0, 1)])
+        summarization_tool = SummarizationTool(max_input_length=3, worker_pool=worker_pool)
+
+        # Act
+        summaries = summarization_tool.run(["one two", "three four", "five"])
+
+        # Assert
+        self.assertEqual(len(summaries), 1)
+
+    @patch("tools.summarization_tools.SummarizationWorkerPool")
+    def test_run_without_worker_pool_uses_temporary_pool(self, mock_SummarizationWorkerPool, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool()
+        mock_SummarizationWorkerPool.return_value.__enter__.return_value = worker_pool
+        summarization_tool = SummarizationTool(max_input_length=3, max_parallel_processes=4)
+
+        # Act
+        summaries = summarization_tool.run(["one two", "three four", "five"])
+
+        # Assert
+        mock_SummarizationWorkerPool.assert_called_once_with(max_workers=2)
+        mock_SummarizationWorkerPool.return_value.__exit__.assert_called_once()
+        self.assertEqual(summaries, ["ONE TWO.", "THREE FOUR. FIVE."])
+
+    def test_run_batch_groups_chunks_of_all_docs_lists_by_length_limits(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool()
+        summarization_tool = SummarizationTool(max_input_length=3, worker_pool=worker_pool, batch_size=2,
+                                               length_step=2)
+
+        # Act
+        summaries = summarization_tool.run_batch([["one two", "three four", "five"], ["six"], [], ["seven eight"]])
+
+        # Assert
+        self.assertEqual(summaries, [["ONE TWO.", "THREE FOUR. FIVE."], ["SIX."], [], ["SEVEN EIGHT."]])
+        # Chunks of 3 and 2 tokens share the maximum length of 2 tokens, the 1 token chunk runs alone.
+        self.assertEqual(worker_pool.submitted_batches, [[(0, 1), (0, 0)], [(3, 0)], [(1, 0)]])
+        self.assertEqual(worker_pool.submitted, [])
+
+    def test_run_batch_retries_chunks_of_failed_batches_alone(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool(failing_indices=[(0, 0)])
+        summarization_tool = SummarizationTool(max_input_length=3, worker_pool=worker_pool, batch_size=2,
+                                               length_step=2)
+
+        # Act
+        summaries = summarization_tool.run_batch([["one two", "three four", "five"], ["six"]])
+
+        # Assert
+        self.assertEqual(summaries, [["THREE FOUR. FIVE."], ["SIX."]])
+        self.assertEqual(worker_pool.submitted_batches, [[(0, 1), (0, 0)], [(1, 0)], [(0, 1)], [(0, 0)], [(0, 0)]])
+        self.assertEqual(summarization_tool.failed_docs_indices, {0})
+        self.assertEqual(summarization_tool.failed_chunk_errors, {(0, 0): "RuntimeError('index out of range')"})
+
+    def test_run_retries_transiently_failing_chunk(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool(transient_failures={(0, 0): 2})
+        summarization_tool = SummarizationTool(max_input_length=3, worker_pool=worker_pool)
+
+        # Act
+        summaries = summarization_tool.run(["one two", "three four", "five"])
+
+        # Assert
+        self.assertEqual(summaries, ["ONE TWO.", "THREE FOUR. FIVE."])
+        self.assertEqual([index for index, _ in worker_pool.submitted], [(0, 0), (0, 1), (0, 0), (0, 0)])
+        self.assertEqual(summarization_tool.failed_chunk_errors, {})
+
+    def test_run_batch_summarizes_only_chunks_missing_from_summary_cache(self, mock_from_pretrained):
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                SummaryCache(os.path.join(temp_dir, "summary_cache.sqlite3")) as summary_cache:
+            first_worker_pool = FakeWorkerPool()
+            SummarizationTool(max_input_length=3, worker_pool=first_worker_pool,
+                              summary_cache=summary_cache).run(["one two", "three four", "five"])
+            worker_pool = FakeWorkerPool()
+            summarization_tool = SummarizationTool(max_input_length=3, worker_pool=worker_pool,
+                                                   summary_cache=summary_cache)
+
+            # Act
+            summaries = summarization_tool.run_batch([["one two", "three four", "five"], ["six"]])
+            batched_summaries = SummarizationTool(max_input_length=3, worker_pool=worker_pool, batch_size=2,
+                                                  summary_cache=summary_cache).run(["one two"])
+
+        # Assert
+        self.assertEqual(summaries, [["ONE TWO.", "THREE FOUR. FIVE."], ["SIX."]])
+        self.assertEqual(summarization_tool.cached_chunks_count, 2)
+        self.assertEqual(batched_summaries, ["ONE TWO."])
+        # Chunks summarized with other generation parameters are not taken from the cache.
+        self.assertEqual(worker_pool.submitted, [((1, 0), "six.")])
+        self.assertEqual(worker_pool.submitted_batches, [[(0, 0)]])
+
+    def test_run_does_not_take_summaries_of_other_worker_pool_model_from_summary_cache(self, mock_from_pretrained):
+        # Arrange
+        with tempfile.TemporaryDirectory() as temp_dir, \
+                SummaryCache(os.path.join(temp_dir, "summary_cache.sqlite3")) as summary_cache:
+            SummarizationTool(max_input_length=3, worker_pool=FakeWorkerPool(),
+                              summary_cache=summary_cache).run(["one two"])
+            other_model_worker_pool = FakeWorkerPool(summarizer_model_name="sshleifer/distilbart-cnn-12-6")
+            other_backend_worker_pool = FakeWorkerPool(inference_backend="onnx")
+
+            # Act
+            SummarizationTool(max_input_length=3, worker_pool=other_model_worker_pool,
+                              summary_cache=summary_cache).run(["one two"])
+            SummarizationTool(max_input_length=3, worker_pool=other_backend_worker_pool,
+                              summary_cache=summary_cache).run(["one two"])
+
+        # Assert
+        self.assertEqual(other_model_worker_pool.submitted, [((0, 0), "one two.")])
+        self.assertEqual(other_backend_worker_pool.submitted, [((0, 0), "one two.")])
+
+    def test_get_text_chunks_tokenizes_each_doc_once(self, mock_from_pretrained):
+        # Arrange
+        summarization_tool = SummarizationTool(max_input_length=5)
+        docs = [f"word{i} word" for i in range(100)]
+
+        # Act
+        total_tokens_count, text_chunks = summarization_tool._get_text_chunks(docs)
+
+        # Assert
+        self.assertEqual(len(summarization_tool.tokenizer.tokenized_texts), 100)
+        self.assertEqual(total_tokens_count, 200)
+        self.assertEqual(len(text_chunks), 50)
+        self.assertEqual(text_chunks[0], (0, "word0 word. word1 word."))
+
+    def test_get_text_chunks_respects_max_input_length(self, mock_from_pretrained):
+        # Arrange
+        summarization_tool = SummarizationTool(max_input_length=7)
+        docs = ["a b c", "d e", "f g h i", "j", "k l m n o p", "q r"]
+
+        # Act
+        total_tokens_count, text_chunks = summarization_tool._get_text_chunks(docs)
+
+        # Assert
+        self.assertEqual(total_tokens_count, 18)
+        self.assertEqual([index for index, _ in text_chunks], list(range(len(text_chunks))))
+        self.assertTrue(all(len(text_chunk.split()) <= 7 for _, text_chunk in text_chunks))
+        self.assertEqual(" ".join(text_chunk for _, text_chunk in text_chunks),
+                         "a b c. d e. f g h i. j. k l m n o p. q r.")
+
+    def test_get_text_chunks_splits_oversized_doc_at_sentence_ends(self, mock_from_pretrained):
+        # Arrange
+        summarization_tool = SummarizationTool(max_input_length=6)
+        docs = ["Short one.", "First sentence is here. Second one. Third sentence goes on and on without an end"]
+
+        # Act
+        total_tokens_count, text_chunks = summarization_tool._get_text_chunks(docs)
+
+        # Assert
+        self.assertEqual(total_tokens_count, 17)
+        self.assertEqual(text_chunks, [
+            (0, "Short one."),
+            (1, "First sentence is here. Second one."),
+            (2, "Third sentence goes on and on"),
+            (3, "without an end.")
+        ])
+
+    def test_get_text_chunks_max_input_length_includes_special_tokens(self, mock_from_pretrained):
+        # Arrange
+        mock_from_pretrained.side_effect = lambda name: FakeTokenizer(special_tokens_count=2)
+        summarization_tool = SummarizationTool(max_input_length=7)
+        docs = ["a b c", "d e", "f g h i j k l m n o p"]
+
+        # Act
+        _, text_chunks = summarization_tool._pack_text_chunks(docs)
+
+        # Assert
+        self.assertEqual(summarization_tool.max_chunk_tokens_count, 5)
+        self.assertTrue(all(tokens_count + 2 <= 7 and len(text_chunk.split()) == tokens_count
+                            for _, text_chunk, tokens_count in text_chunks))
+        self.assertEqual([text_chunk for _, text_chunk, _ in text_chunks],
+                         ["a b c. d e.", "f g h i j", "k l m n o", "p."])
+
+    def test_get_text_chunks_without_docs(self, mock_from_pretrained):
+        self.assertEqual(SummarizationTool()._get_text_chunks([]), (0, []))
+        self.assertEqual(SummarizationTool(worker_pool=FakeWorkerPool()).run([]), [])
+
+
+class TestSummaryLengthLimits(unittest.TestCase):
+
+    def test_get_summary_length_limits(self):
+        self.assertEqual(get_summary_length_limits(1021, 100, 32), (100, 992))
+        self.assertEqual(get_summary_length_limits(40, 100, 32), (32, 32))
+        self.assertEqual(get_summary_length_limits(20, 100, 32), (20, 20))
+        self.assertEqual(get_summary_length_limits(20, 10, 32), (10, 20))
+
+    @patch("tools.summarization_tools.SUMMARIZATION_PIPELINE")
+    def test_summarize_text_chunks_batch_uses_limits_of_every_chunk(self, mock_pipeline):
+        # Arrange
+        mock_pipeline.side_effect = lambda texts, batch_size, min_length, max_length: [
+            {"summary_text": f"{text} ({min_length}-{max_length})"} for text in texts]
+        text_chunks = [("a", "long", 1000), ("b", "short", 20), ("c", "longer", 1010)]
+
+        # Act
+        summaries = summarize_text_chunks_batch(text_chunks, min_tokens_count=100, length_step=32)
+
+        # Assert
+        self.assertEqual(summaries, [("a", "long (100-992)"), ("b", "short (20-20)"), ("c", "longer (100-992)")])
+        self.assertEqual(mock_pipeline.call_count, 2)
+
+
+class HalvingWorkerPool(FakeWorkerPool):
+    """Summarizes text chunks by keeping the first half of their words."""
+
+    def submit(self, index, text_chunk, min_tokens_count=100, length_step=32):
+        self.submitted.append((index, text_chunk))
+        words = text_chunk.split()
+        future = Future()
+        if self._fails(index):
+            future.set_exception(RuntimeError("index out of range"))
+        else:
+            future.set_result((index, " ".join(words[:max(1, len(words) // 2)])))
+        return future
+
+
+@patch("tools.summarization_tools.AutoTokenizer.from_pretrained", side_effect=lambda name: FakeTokenizer())
+class TestHierarchicalSummarizationTool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.summary_cache = SummaryCache(os.path.join(self.temp_dir.name, "summary_cache.sqlite3"))
+        self.addCleanup(self.summary_cache.close)
+
+    def test_run_batch_reduces_summaries_until_they_fit_target(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = HalvingWorkerPool()
+        summarization_tool = SummarizationTool(max_input_length=8, worker_pool=worker_pool)
+        hierarchical_tool = HierarchicalSummarizationTool(summarization_tool, target_tokens_count=4)
+        docs = [f"a{i} b{i} c{i} d{i} e{i} f{i} g{i} h{i}" for i in range(4)]
+
+        # Act
+        summaries = hierarchical_tool.run_batch([docs, ["short"], []])
+
+        # Assert
+        self.assertEqual(summaries, ["a0 b0 c0 d0.", "short.", ""])
+        self.assertEqual(len(worker_pool.submitted), 8)
+
+    def test_run_batch_stops_when_summaries_do_not_shrink(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = FakeWorkerPool()
+        summarization_tool = SummarizationTool(max_input_length=8, worker_pool=worker_pool)
+        hierarchical_tool = HierarchicalSummarizationTool(summarization_tool, target_tokens_count=2)
+
+        # Act
+        summary = hierarchical_tool.run(["one two three four"])
+
+        # Assert
+        self.assertEqual(summary, "ONE TWO THREE FOUR.")
+        self.assertEqual(len(worker_pool.submitted), 2)
+
+    def test_run_batch_keeps_failed_docs_indices_and_does_not_reduce_them(self, mock_from_pretrained):
+        # Arrange
+        worker_pool = HalvingWorkerPool(failing_indices=[(0, 3)])
+        summarization_tool = SummarizationTool(max_input_length=8, worker_pool=worker_pool, max_retries=0)
+        hierarchical_tool = HierarchicalSummarizationTool(summarization_tool, target_tokens_count=4)
+        docs = [f"a{i} b{i} c{i} d{i} e{i} f{i} g{i} h{i}" for i in range(4)]
+
+        # Act
+        summaries = hierarchical_tool.run_batch([docs, docs])
+
+        # Assert
+        self.assertEqual(hierarchical_tool.failed_docs_indices, {0})
+        self.assertEqual(summaries[1], "a0 b0 c0 d0.")
+        # The 8 chunks of both lists are summarized at the first level, only the second list is reduced further.
+        self.assertEqual(len(worker_pool.submitted), 11)
+
+    def test_run_batch_reuses_cached_levels(self, mock_from_pretrained):
+        # Arrange
+        docs = [f"a{i} b{i} c{i} d{i} e{i} f{i} g{i} h{i}" for i in range(4)]
+        first_worker_pool = HalvingWorkerPool()
+        HierarchicalSummarizationTool(SummarizationTool(max_input_length=8, worker_pool=first_worker_pool,
+                                                        summary_cache=self.summary_cache),
+                                      target_tokens_count=4).run(docs)
+        second_worker_pool = HalvingWorkerPool()
+        hierarchical_tool = HierarchicalSummarizationTool(
+            SummarizationTool(max_input_length=8, worker_pool=second_worker_pool, summary_cache=self.summary_cache),
+            target_tokens_count=4)
+
+        # Act
+        cached_summary = hierarchical_tool.run(docs)
+        cached_submitted_count = len(second_worker_pool.submitted)
+        changed_summary = hierarchical_tool.run(docs[:3] + ["x y z"])
+
+        # Assert
+        self.assertEqual(cached_summary, "a0 b0 c0 d0.")
+        self.assertEqual(cached_submitted_count, 0)
+        self.assertEqual(changed_summary, "a0 b0 c0")
+        self.assertEqual(second_worker_pool.submitted[0], ((0, 3), "x y z."))
+        self.assertEqual(len(second_worker_pool.submitted), 3)
+
+    def test_run_batch_does_not_reuse_levels_of_other_generation_params(self, mock_from_pretrained):
+        # Arrange
+        docs = [f"a{i} b{i} c{i} d{i} e{i} f{i} g{i} h{i}" for i in range(4)]
+        HierarchicalSummarizationTool(SummarizationTool(max_input_length=8, worker_pool=HalvingWorkerPool(),
+                                                        summary_cache=self.summary_cache),
+                                      target_tokens_count=4).run(docs)
+        worker_pool = HalvingWorkerPool()
+        hierarchical_tool = HierarchicalSummarizationTool(
+            SummarizationTool(max_input_length=8, worker_pool=worker_pool, summary_cache=self.summary_cache,
+                              min_tokens_count=50),
+            target_tokens_count=4)
+
+        # Act
+        summary = hierarchical_tool.run(docs)
+
+        # Assert
+        self.assertEqual(summary, "a0 b0 c0 d0.")
+        self.assertEqual(len(worker_pool.submitted), 7)
+
+    def test_run_batch_does_not_cache_failed_levels(self, mock_from_pretrained):
+        # Arrange
+        summarization_tool = SummarizationTool(max_input_length=3, summary_cache=self.summary_cache,
+                                               worker_pool=FakeWorkerPool(failing_indices=[(0, 1)]))
+        hierarchical_tool = HierarchicalSummarizationTool(summarization_tool)
+        docs = ["one two", "three four", "five"]
+
+        # Act
+        summary = hierarchical_tool.run(docs)
+
+        # Assert
+        self.assertEqual(summary, "ONE TWO.")
+        self.assertEqual(self.summary_cache.load_many(hierarchical_tool._get_level_cache_keys([docs])), {})
+
+
+class HangingExecutor:
+    """Sends submitted jobs to two worker processes, which never complete them, like workers stuck on text chunks.
+
+    Only the jobs of the text chunks starting with "hang" are started by worker process 101, the other jobs are
+    queued. Terminating a worker process breaks the executor, like it breaks a `ProcessPoolExecutor`. Executors
+    created after the first one run their jobs in the calling process.
+    """
+    instances = []
+
+    def __init__(self, *args, initargs=(), **kwargs):
+        self.job_starts_queue = initargs[-1]
+        self.inline = len(HangingExecutor.instances) > 0
+        self.futures = []
+        self.broken = False
+        self.shut_down = False
+        self._processes = {101: MagicMock(), 102: MagicMock()}
+        self._processes[101].terminate.side_effect = self._break
+        HangingExecutor.instances.append(self)
+
+    def _break(self):
+        self.broken = True
+        for future in self.futures:
+            future.set_exception(BrokenProcessPool("A child process terminated abruptly."))
+
+    def submit(self, function, job_id, job_function, *args):
+        if self.broken:
+            raise BrokenProcessPool("A child process terminated abruptly.")
+        future = Future()
+        if self.inline:
+            future.set_result(function(job_id, job_function, *args))
+            return future
+        future.set_running_or_notify_cancel()
+        if args[1].startswith("hang"):
+            self.job_starts_queue.put((job_id, 101))
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class InlineExecutor:
+    """Runs submitted jobs in the calling process, like a worker process which has loaded the model."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def submit(self, function, *args):
+        future = Future()
+        try:
+            future.set_result(function(*args))
+        except Exception as ex:
+            future.set_exception(ex)
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+@patch("tools.summarization_tools.export_onnx_models")
+@patch("tools.summarization_tools.ProcessPoolExecutor", InlineExecutor)
+@patch("tools.summarization_tools.WORKER_MODEL_LOAD_SECONDS", 2.5)
+class TestSummarizationWorkerPool(unittest.TestCase):
+
+    def setUp(self):
+        METRICS.reset()
+        self.addCleanup(METRICS.reset)
+
+    @patch("tools.summarization_tools.summarize_text_chunks_batch", side_effect=lambda text_chunks, min_tokens_count, length_step:
+           [(key, text_chunk.upper()) for key, text_chunk, _ in text_chunks])
+    def test_submit_batch_records_worker_metrics(self, mock_summarize_text_chunks_batch, mock_export_onnx_models):
+        # Arrange
+        worker_pool = SummarizationWorkerPool(max_workers=1)
+
+        # Act
+        first_result = worker_pool.submit_batch([(0, "one", 1), (1, "two", 1)]).result()
+        second_result = worker_pool.submit_batch([(2, "three", 1)]).result()
+
+        # Assert
+        self.assertEqual(first_result, [(0, "ONE"), (1, "TWO")])
+        self.assertEqual(second_result, [(2, "THREE")])
+        snapshot = METRICS.get_snapshot()
+        self.assertEqual(snapshot["counters"]["summarization_chunks_total"],
+                         [{"labels": {"worker": "MainProcess"}, "value": 3}])
+        self.assertEqual(snapshot["timings"]["summarization_job_seconds"][0]["count"], 2)
+        self.assertEqual(snapshot["gauges"]["summarization_model_load_seconds"],
+                         [{"labels": {"worker": "MainProcess"}, "value": 2.5}])
+        self.assertEqual(METRICS.get_gauge("summarization_queued_jobs"), 0)
+
+    @patch("tools.summarization_tools.summarize_text_chunk", side_effect=RuntimeError("index out of range"))
+    def test_submit_passes_on_worker_exception(self, mock_summarize_text_chunk, mock_export_onnx_models):
+        # Arrange
+        worker_pool = SummarizationWorkerPool(max_workers=1)
+
+        # Act
+        future = worker_pool.submit(0, "one")
+
+        # Assert
+        self.assertIsInstance(future.exception(), RuntimeError)
+        self.assertEqual(METRICS.get_counter("summarization_failed_jobs_total"), 1)
+        self.assertEqual(METRICS.get_counter("summarization_chunks_total"), 0)
+
+
+
+@patch("tools.summarization_tools.export_onnx_models")
+@patch("tools.summarization_tools.ProcessPoolExecutor", HangingExecutor)
+class TestSummarizationWorkerPoolTimeout(unittest.TestCase):
+
+    def setUp(self):
+        METRICS.reset()
+        self.addCleanup(METRICS.reset)
+        HangingExecutor.instances = []
+
+    def test_submit_fails_hanging_job_after_timeout(self, mock_export_onnx_models):
+        # Arrange
+        worker_pool = SummarizationWorkerPool(max_workers=1, job_timeout_seconds=0.1)
+        self.addCleanup(worker_pool.shutdown)
+
+        # Act
+        future = worker_pool.submit(0, "hang")
+
+        # Assert
+        self.assertIsInstance(future.exception(timeout=5), SummarizationJobTimeoutException)
+        HangingExecutor.instances[0]._processes[101].terminate.assert_called_once()
+        HangingExecutor.instances[0]._processes[102].terminate.assert_not_called()
+        self.assertEqual(METRICS.get_counter("summarization_timed_out_jobs_total"), 1)
+
+    def test_submit_does_not_time_out_queued_job(self, mock_export_onnx_models):
+        # Arrange
+        worker_pool = SummarizationWorkerPool(max_workers=1, job_timeout_seconds=0.1)
+        self.addCleanup(worker_pool.shutdown)
+
+        # Act
+        future = worker_pool.submit(0, "one")
+        time.sleep(0.5)
+
+        # Assert
+        self.assertFalse(future.done())
+        self.assertEqual(METRICS.get_counter("summarization_timed_out_jobs_total"), 0)
+
+    @patch("tools.summarization_tools.summarize_text_chunk", side_effect=lambda index, text_chunk, min_tokens_count,
+           length_step: (index, text_chunk.upper()))
+    def test_submit_submits_jobs_stopped_with_hanging_job_again(self, mock_summarize_text_chunk,
+                                                                mock_export_onnx_models):
+        # Arrange
+        worker_pool = SummarizationWorkerPool(max_workers=2, job_timeout_seconds=0.1)
+        self.addCleanup(worker_pool.shutdown)
+
+        # Act
+        hanging_future = worker_pool.submit(0, "hang")
+        future = worker_pool.submit(1, "one")
+
+        # Assert
+        self.assertIsInstance(hanging_future.exception(timeout=5), SummarizationJobTimeoutException)
+        self.assertEqual(future.result(timeout=5), (1, "ONE"))
+        self.assertTrue(HangingExecutor.instances[0].shut_down)
+        self.assertIs(worker_pool.executor, HangingExecutor.instances[1])
+        self.assertEqual(METRICS.get_counter("summarization_failed_jobs_total"), 1)
+        self.assertEqual(METRICS.get_gauge("summarization_queued_jobs"), 0)
+
+    @patch("tools.summarization_tools.AutoTokenizer.from_pretrained", side_effect=lambda name: FakeTokenizer())
+    @patch("tools.summarization_tools.summarize_text_chunk", side_effect=lambda index, text_chunk, min_tokens_count,
+           length_step: (index, text_chunk.upper()))
+    def test_summarization_tool_does_not_retry_jobs_stopped_with_hanging_job(self, mock_summarize_text_chunk,
+                                                                             mock_from_pretrained,
+                                                                             mock_export_onnx_models):
+        # Arrange
+        worker_pool = SummarizationWorkerPool(max_workers=2, job_timeout_seconds=0.1)
+        self.addCleanup(worker_pool.shutdown)
+        summarization_tool = SummarizationTool(max_input_length=2, worker_pool=worker_pool, max_retries=0)
+
+        # Act
+        summaries = summarization_tool.run(["hang on", "one two"])
+
+        # Assert
+        self.assertEqual(summaries, ["ONE TWO."])
+        self.assertEqual(set(summarization_tool.failed_chunk_errors), {(0, 0)})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import unittest
+import tempfile
+from unittest.mock import patch
+from tools.summary_cache import SummaryCache
+
+
+class TestSummaryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.file_path = os.path.join(self.temp_dir.name, "summary_cache.sqlite3")
+
+    def test_get_key_depends_on_model_params_and_text(self):
+        # Arrange
+        key = SummaryCache.get_key("model", {"min_tokens_count": 100}, "text")
+
+        # Act
+        other_keys = [
+            SummaryCache.get_key("other model", {"min_tokens_count": 100}, "text"),
+            SummaryCache.get_key("model", {"min_tokens_count": 50}, "text"),
+            SummaryCache.get_key("model", {"min_tokens_count": 100}, "other text")
+        ]
+
+        # Assert
+        self.assertEqual(key, SummaryCache.get_key("model", {"min_tokens_count": 100}, "text"))
+        self.assertNotIn(key, other_keys)
+        self.assertEqual(len(set(other_keys)), 3)
+
+    def test_store_many_and_load_many_persist_summaries(self):
+        # Arrange
+        with SummaryCache(self.file_path) as summary_cache:
+            summary_cache.store_many({"key1": "summary1", "key2": "summary2"})
+
+        # Act
+        with SummaryCache(self.file_path) as summary_cache:
+            summaries = summary_cache.load_many(["key1", "key2", "key3"])
+
+        # Assert
+        self.assertEqual(summaries, {"key1": "summary1", "key2": "summary2"})
+
+    def test_load_many_with_more_keys_than_query_batch_size(self):
+        # Arrange
+        summaries = {f"key{i}": f"summary{i}" for i in range(1200)}
+        with SummaryCache(self.file_path) as summary_cache:
+            summary_cache.store_many(summaries)
+
+            # Act
+            loaded_summaries = summary_cache.load_many(list(summaries.keys()))
+
+        # Assert
+        self.assertEqual(loaded_summaries, summaries)
+
+    @patch("tools.summary_cache.time.time")
+    def test_store_many_evicts_least_recently_used_summaries(self, mock_time):
+        # Arrange
+        with SummaryCache(self.file_path, max_size_bytes=30) as summary_cache:
+            mock_time.return_value = 1.0
+            summary_cache.store_many({"key1": "summary1"})
+            mock_time.return_value = 2.0
+            summary_cache.store_many({"key2": "summary2"})
+            mock_time.return_value = 3.0
+            summary_cache.load_many(["key1"])
+
+            # Act
+            mock_time.return_value = 4.0
+            summary_cache.store_many({"key3": "summary3"})
+
+            # Assert
+            self.assertEqual(summary_cache.load_many(["key1", "key2", "key3"]),
+                             {"key1": "summary1", "key3": "summary3"})
+            self.assertEqual(summary_cache.get_size(), 24)
+
+
+if __name__ == "__main__":
+    unittest.main()
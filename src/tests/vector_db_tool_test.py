@@ -0,0 +1,227 @@
+import torch
+import unittest
+import threading
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+from tools import vector_db_tool
+from tools.vector_db_tool import EmbeddingService, get_embedding_service, _get_length_buckets
+
+
+class FakeTokenizer:
+    """Tokenizes texts into word lengths, padded with zeros."""
+
+    def __init__(self):
+        self.pad_calls = []
+
+    def __call__(self, text, **kwargs):
+        input_ids = [[len(w) for w in t.split(" ")] for t in text]
+        return {"input_ids": input_ids, "attention_mask": [[1] * len(ids) for ids in input_ids]}
+
+    def pad(self, encodings, return_tensors=None):
+        max_length = max(len(ids) for ids in encodings["input_ids"])
+        self.pad_calls.append((len(encodings["input_ids"]), max_length))
+        return {key: torch.tensor([values + [0] * (max_length - len(values)) for values in encodings[key]])
+                for key in encodings}
+
+
+class FakeEmbeddingModel(torch.nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.weight = torch.nn.Parameter(torch.tensor([1.0, 2.0]))
+        self.inference_mode_enabled = []
+
+    def forward(self, input_ids, attention_mask):
+        self.inference_mode_enabled.append(torch.is_inference_mode_enabled())
+        return SimpleNamespace(last_hidden_state=input_ids[..., None].float() * self.weight)
+
+
+class TestEmbeddingService(unittest.TestCase):
+
+    def setUp(self):
+        self.embedding_model = FakeEmbeddingModel()
+        self.embedding_model.train()
+
+    @patch("tools.vector_db_tool._get_text_embedding_model")
+    @patch("tools.vector_db_tool._get_tokenizer")
+    def test_embed_loads_model_once(self, mock_get_tokenizer, mock_get_text_embedding_model):
+        # Arrange
+        mock_get_tokenizer.return_value = FakeTokenizer()
+        mock_get_text_embedding_model.return_value = self.embedding_model
+        embedding_service = EmbeddingService("tokenizer", "model")
+
+        # Act
+        first_embedding = embedding_service.embed(["ab abcd"])
+        second_embedding = embedding_service.embed(["abc"])
+
+        # Assert
+        mock_get_tokenizer.assert_called_once_with("tokenizer")
+        mock_get_text_embedding_model.assert_called_once_with("model")
+        self.assertEqual(first_embedding, [3.0, 6.0])
+        self.assertEqual(second_embedding, [3.0, 6.0])
+
+    @patch("tools.vector_db_tool._get_text_embedding_model")
+    @patch("tools.vector_db_tool._get_tokenizer")
+    def test_embed_runs_model_in_inference_mode(self, mock_get_tokenizer, mock_get_text_embedding_model):
+        # Arrange
+        mock_get_tokenizer.return_value = FakeTokenizer()
+        mock_get_text_embedding_model.return_value = self.embedding_model
+
+        # Act
+        embedding = EmbeddingService().embed(["ab"])
+
+        # Assert
+        self.assertFalse(self.embedding_model.training)
+        self.assertEqual(self.embedding_model.inference_mode_enabled, [True])
+        self.assertIsInstance(embedding, list)
+
+    @patch("tools.vector_db_tool._get_text_embedding_model")
+    @patch("tools.vector_db_tool._get_tokenizer")
+    def test_embed_from_multiple_threads_loads_model_once(self, mock_get_tokenizer, mock_get_text_embedding_model):
+        # Arrange
+        mock_get_tokenizer.return_value = FakeTokenizer()
+        mock_get_text_embedding_model.side_effect = lambda name: self.embedding_model
+        embedding_service = EmbeddingService()
+        barrier = threading.Barrier(8)
+        results = []
+
+        def embed():
+            barrier.wait()
+            results.append(embedding_service.embed(["ab abcd"]))
+
+        # Act
+        threads = [threading.Thread(target=embed) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Assert
+        mock_get_text_embedding_model.assert_called_once()
+        self.assertEqual(results, [[3.0, 6.0]] * 8)
+
+    @patch("tools.vector_db_tool._get_text_embedding_model")
+    @patch("tools.vector_db_tool._get_tokenizer")
+    def test_embed_batch_returns_embedding_per_text_in_input_order(self, mock_get_tokenizer,
+                                                                   mock_get_text_embedding_model):
+        # Arrange
+        tokenizer = FakeTokenizer()
+        mock_get_tokenizer.return_value = tokenizer
+        mock_get_text_embedding_model.return_value = self.embedding_model
+        texts = ["a", "abc abc abc abc abc abc", "ab abcd", "abcdef", "abcd abcd abcd abcd abcd abcd abcd abcd"]
+
+        # Act
+        embeddings = EmbeddingService().embed_batch(texts, batch_size=2, max_batch_tokens=15)
+
+        # Assert
+        self.assertEqual(embeddings, [[1.0, 2.0], [3.0, 6.0], [3.0, 6.0], [6.0, 12.0], [4.0, 8.0]])
+        self.assertEqual(tokenizer.pad_calls, [(1, 8), (2, 6), (2, 1)])
+
+    def test_embed_batch_with_empty_list(self):
+        self.assertEqual(EmbeddingService().embed_batch([]), [])
+
+    def test_get_length_buckets(self):
+        lengths = [5, 100, 7, 6, 90, 1, 8]
+
+        buckets = _get_length_buckets(lengths, batch_size=3, max_batch_tokens=200)
+
+        self.assertEqual(buckets, [[1, 4], [6, 2, 3], [0, 5]])
+        self.assertEqual(sorted(i for bucket in buckets for i in bucket), list(range(len(lengths))))
+
+    def test_get_length_buckets_puts_long_text_in_own_batch(self):
+        self.assertEqual(_get_length_buckets([600, 3, 4], batch_size=8, max_batch_tokens=512), [[0], [2, 1]])
+
+    @patch("tools.vector_db_tool.EMBEDDING_SERVICE", None)
+    def test_get_embedding_service_returns_shared_instance(self):
+        self.assertIs(get_embedding_service(), get_embedding_service())
+
+    @patch("tools.vector_db_tool.Collection")
+    @patch("tools.vector_db_tool.get_embedding_service")
+    def test_search_and_insert_use_shared_embedding_service(self, mock_get_embedding_service, mock_collection):
+        # Arrange
+        mock_get_embedding_service.return_value.embed.return_value = [0.5, 0.5]
+        mock_collection.return_value.insert.return_value = MagicMock(insert_count=1, primary_keys=[42])
+
+        # Act
+        vector_id = vector_db_tool.insert_meeting_summary("summary")
+        vector_db_tool.search("question")
+
+        # Assert
+        self.assertEqual(vector_id, 42)
+        mock_get_embedding_service.return_value.embed.assert_any_call(["summary"])
+        mock_get_embedding_service.return_value.embed.assert_any_call(["question"])
+        mock_collection.return_value.search.assert_called_once_with([[0.5, 0.5]], param={"metric_type": "COSINE"},
+                                                                    limit=3, anns_field="embedding")
+
+    @patch("tools.vector_db_tool.Collection")
+    @patch("tools.vector_db_tool.get_embedding_service")
+    def test_insert_meetings_embeds_all_persons_in_one_call(self, mock_get_embedding_service, mock_collection):
+        # Arrange
+        mock_get_embedding_service.return_value.embed_batch.return_value = [[0.1], [0.2]]
+
+        # Act
+        vector_db_tool.insert_meetings("meetings", {"Person 1": ["doc 1", "doc 2"], "Person 2": ["doc 3"]})
+
+        # Assert
+        mock_get_embedding_service.return_value.embed_batch.assert_called_once_with(["doc 1", "doc 3"])
+        mock_collection.return_value.insert.assert_called_once_with([{"embedding": [0.1]}, {"embedding": [0.2]}])
+
+
+    @patch("tools.vector_db_tool.create_collection")
+    @patch("tools.vector_db_tool.Collection")
+    @patch("tools.vector_db_tool.utility")
+    def test_init_vectors_store_keeps_existing_collection(self, mock_utility, mock_collection,
+                                                          mock_create_collection):
+        # Arrange
+        mock_utility.has_collection.return_value = True
+        mock_collection.return_value.schema.fields = vector_db_tool.get_meetings_fields(embedding_dim=1024)
+
+        # Act
+        vector_db_tool.init_vectors_store(auto_id_pk=True, drop_existing=False)
+
+        # Assert
+        mock_utility.drop_collection.assert_not_called()
+        mock_create_collection.assert_not_called()
+        mock_collection.return_value.load.assert_called_once()
+
+    @patch("tools.vector_db_tool.Collection")
+    @patch("tools.vector_db_tool.utility")
+    def test_init_collection_with_other_embedding_dim_raises_exception(self, mock_utility, mock_collection):
+        # Arrange
+        mock_utility.has_collection.return_value = True
+        mock_collection.return_value.schema.fields = vector_db_tool.get_meetings_fields(embedding_dim=1024)
+
+        # Act & Assert
+        with self.assertRaises(vector_db_tool.EmbeddingDimensionMismatchException):
+            vector_db_tool.init_collection("meeting_summaries", 384, auto_id_pk=True, drop_existing=False)
+        mock_collection.return_value.load.assert_not_called()
+
+    @patch("tools.vector_db_tool.create_collection")
+    @patch("tools.vector_db_tool.utility")
+    def test_init_vectors_store_follows_configured_embedding_model(self, mock_utility, mock_create_collection):
+        # Arrange
+        mock_utility.has_collection.return_value = False
+
+        # Act
+        with patch("tools.vector_db_tool.consts.EMBEDDING_MODEL_NAME", "sentence-transformers/all-MiniLM-L6-v2"):
+            vector_db_tool.init_vectors_store(auto_id_pk=False)
+
+        # Assert
+        fields = mock_create_collection.call_args.args[1]
+        self.assertEqual(fields[1].params["dim"], 384)
+        self.assertFalse(fields[0].auto_id)
+        mock_create_collection.return_value.load.assert_called_once()
+
+    @patch("tools.vector_db_tool.AutoConfig")
+    def test_get_embedding_dim(self, mock_AutoConfig):
+        # Arrange
+        mock_AutoConfig.from_pretrained.return_value.hidden_size = 768
+
+        # Act & Assert
+        self.assertEqual(vector_db_tool.get_embedding_dim("facebook/bart-large-cnn"), 1024)
+        self.assertEqual(vector_db_tool.get_embedding_dim("org/other-model"), 768)
+        mock_AutoConfig.from_pretrained.assert_called_once_with("org/other-model")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import consts
+import logging
+import weakref
+import threading
+from typing import Any
+import aiomysql
+from tools.config import Config, DbConfig
+
+logger = logging.getLogger(__name__)
+
+# Connection pools of the process by the DB server, user and the event loop they were created in.
+ASYNC_CONNECTION_POOLS: dict[tuple, aiomysql.Pool] = {}
+# asyncio locks are bound to the event loop they are first used in, so every event loop has its own lock.
+ASYNC_CONNECTION_POOLS_LOCKS: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = \
+    weakref.WeakKeyDictionary()
+ASYNC_CONNECTION_POOLS_LOCKS_LOCK = threading.Lock()
+
+
+def _get_connection_pools_lock() -> asyncio.Lock:
+    with ASYNC_CONNECTION_POOLS_LOCKS_LOCK:
+        return ASYNC_CONNECTION_POOLS_LOCKS.setdefault(asyncio.get_running_loop(), asyncio.Lock())
+
+
+async def get_async_connection_pool(db_config: Config, charset: str, collation: str) -> aiomysql.Pool:
+    """Returns the connection pool of the DB server and user in the running event loop, it is created on first use.
+
+    Connections select the database of the DB config when they connect and connections idle for longer
+    than DB_POOL_MAX_IDLE_SECONDS are replaced when they are acquired.
+    """
+    pool_key = (db_config.host, db_config.port, db_config.user, db_config.database_name, charset, collation,
+                asyncio.get_running_loop())
+    async with _get_connection_pools_lock():
+        if pool_key not in ASYNC_CONNECTION_POOLS:
+            logger.debug(f"Creating async DB connection pool to {db_config.host}:{db_config.port} "
+                         f"for user {db_config.user}")
+            ASYNC_CONNECTION_POOLS[pool_key] = await aiomysql.create_pool(
+                minsize=0, maxsize=consts.DB_POOL_SIZE, pool_recycle=consts.DB_POOL_MAX_IDLE_SECONDS,
+                host=db_config.host, port=int(db_config.port), user=db_config.user, password=db_config.password,
+                db=db_config.database_name, charset=charset, init_command=f"SET NAMES {charset} COLLATE {collation}")
+        return ASYNC_CONNECTION_POOLS[pool_key]
+
+
+async def close_async_connection_pools() -> None:
+    """Closes the connection pools of the running event loop, e.g. when the API shuts down."""
+    loop = asyncio.get_running_loop()
+    async with _get_connection_pools_lock():
+        pool_keys = [pool_key for pool_key in ASYNC_CONNECTION_POOLS if pool_key[-1] is loop]
+        for pool_key in pool_keys:
+            pool = ASYNC_CONNECTION_POOLS.pop(pool_key)
+            pool.close()
+            await pool.wait_closed()
+
+
+class AsyncSqlQueryManager:
+    """asyncio counterpart of `SqlQueryManager`, for the API.
+
+    Connections are acquired from the process-wide async connection pool for the `async with` block and
+    released, with their uncommitted changes rolled back, when the block ends. Statements run without
+    blocking the event loop. The database is selected when a connection connects, so statements are sent
+    without a preceding USE statement.
+    """
+
+    def __init__(self,
+                 db_config: Config = DbConfig(),
+                 charset: str = "utf8mb4",
+                 collation: str = "utf8mb4_unicode_ci"):
+        self.db_config = db_config
+        self.charset = charset
+        self.collation = collation
+        self.db_pool = None
+        self.db_conn = None
+        self.db_cursor = None
+
+    async def __aenter__(self):
+        self.db_pool = await get_async_connection_pool(self.db_config, self.charset, self.collation)
+        self.db_conn = await self.db_pool.acquire()
+        self.db_cursor = await self.db_conn.cursor()
+        return self
+
+    async def execute(self, query: str, params = (), set_default_database=True) -> Any:
+        # Parameters are passed only when there are any, the same way as for mysql.connector, so queries
+        # without parameters may contain literal % characters.
+        return await self.db_cursor.execute(query, params or None)
+
+    async def executemany(self, query: str, data: list[Any]) -> Any:
+        return await self.db_cursor.executemany(query, data)
+
+    # aiomysql returns rows as a tuple, they are returned as a list, the way mysql.connector returns them,
+    # since callers such as `Query._add_filter` tell query results by their list type.
+    async def fetchall(self) -> list:
+        return list(await self.db_cursor.fetchall())
+
+    async def fetchmany(self, size: int) -> list:
+        return list(await self.db_cursor.fetchmany(size))
+
+    async def commit(self) -> None:
+        await self.db_conn.commit()
+
+    async def rollback(self) -> None:
+        await self.db_conn.rollback()
+
+    async def __aexit__(self, type, value, traceback):
+        if self.db_conn is None:
+            return
+        try:
+            await self.db_cursor.close()
+            if self.db_conn.get_transaction_status():
+                await self.db_conn.rollback()
+        except Exception as ex:
+            logger.warning(f"Closing async DB connection - {ex}")
+            self.db_conn.close()
+        finally:
+            self.db_pool.release(self.db_conn)
+            self.db_conn = None
@@ -0,0 +1,204 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+METRIC_PREFIX = "meetings_build_"
+
+
+def _get_labels_key(labels: dict | None) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels_key: tuple) -> str:
+    if not labels_key:
+        return ""
+    labels = ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels_key)
+    return f"{{{labels}}}"
+
+
+class BuildMetrics:
+    """Thread-safe counters, gauges and latency summaries of a persistence store build.
+
+    Metrics are kept in the process which builds the persistence store, summarization workers report
+    theirs with the results of their jobs. A snapshot can be written as JSON or in the Prometheus text
+    format, e.g. for the textfile collector of the node exporter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.counters: dict[str, dict[tuple, float]] = {}
+        self.gauges: dict[str, dict[tuple, float]] = {}
+        # Count, sum and maximum of the observed durations, in seconds.
+        self.timings: dict[str, dict[tuple, list[float]]] = {}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.start_time = time.monotonic()
+            self.counters = {}
+            self.gauges = {}
+            self.timings = {}
+
+    def increment(self, name: str, value: float = 1, labels: dict | None = None) -> None:
+        with self._lock:
+            values = self.counters.setdefault(name, {})
+            labels_key = _get_labels_key(labels)
+            values[labels_key] = values.get(labels_key, 0) + value
+
+    def set_gauge(self, name: str, value: float, labels: dict | None = None) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[_get_labels_key(labels)] = value
+
+    def add_to_gauge(self, name: str, value: float, labels: dict | None = None) -> None:
+        with self._lock:
+            values = self.gauges.setdefault(name, {})
+            labels_key = _get_labels_key(labels)
+            values[labels_key] = values.get(labels_key, 0) + value
+
+    def observe(self, name: str, seconds: float, labels: dict | None = None) -> None:
+        with self._lock:
+            timing = self.timings.setdefault(name, {}).setdefault(_get_labels_key(labels), [0, 0.0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+            timing[2] = max(timing[2], seconds)
+
+    @contextmanager
+    def time(self, name: str, labels: dict | None = None):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, labels)
+
+    def get_counter(self, name: str) -> float:
+        """Returns the total of the counter over all of its labels."""
+        with self._lock:
+            return sum(self.counters.get(name, {}).values())
+
+    def get_gauge(self, name: str) -> float:
+        with self._lock:
+            return sum(self.gauges.get(name, {}).values())
+
+    def get_elapsed_seconds(self) -> float:
+        return time.monotonic() - self.start_time
+
+    def get_rate(self, name: str) -> float:
+        """Returns the per second rate of the counter since the metrics were started."""
+        elapsed_seconds = self.get_elapsed_seconds()
+        return self.get_counter(name) / elapsed_seconds if elapsed_seconds > 0 else 0.0
+
+    def get_snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "elapsed_seconds": self.get_elapsed_seconds(),
+                "counters": {name: [{"labels": dict(labels_key), "value": value}
+                                    for labels_key, value in values.items()]
+                             for name, values in self.counters.items()},
+                "gauges": {name: [{"labels": dict(labels_key), "value": value}
+                                  for labels_key, value in values.items()]
+                           for name, values in self.gauges.items()},
+                "timings": {name: [{"labels": dict(labels_key), "count": count, "sum": total, "max": maximum}
+                                   for labels_key, (count, total, maximum) in values.items()]
+                            for name, values in self.timings.items()}
+            }
+
+    def to_prometheus_text(self) -> str:
+        lines = [f"# TYPE {METRIC_PREFIX}elapsed_seconds gauge",
+                 f"{METRIC_PREFIX}elapsed_seconds {self.get_elapsed_seconds():.3f}"]
+        with self._lock:
+            for name, values in sorted(self.counters.items()):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} counter")
+                lines.extend(f"{METRIC_PREFIX}{name}{_format_labels(labels_key)} {value}"
+                             for labels_key, value in values.items())
+            for name, values in sorted(self.gauges.items()):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} gauge")
+                lines.extend(f"{METRIC_PREFIX}{name}{_format_labels(labels_key)} {value}"
+                             for labels_key, value in values.items())
+            for name, values in sorted(self.timings.items()):
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} summary")
+                for labels_key, (count, total, _) in values.items():
+                    labels = _format_labels(labels_key)
+                    lines.append(f"{METRIC_PREFIX}{name}_count{labels} {count}")
+                    lines.append(f"{METRIC_PREFIX}{name}_sum{labels} {total:.6f}")
+                # A summary has only quantiles, a sum and a count, so the maximum is a gauge family of its own.
+                lines.append(f"# TYPE {METRIC_PREFIX}{name}_max gauge")
+                lines.extend(f"{METRIC_PREFIX}{name}_max{_format_labels(labels_key)} {maximum:.6f}"
+                             for labels_key, (_, _, maximum) in values.items())
+        return "\n".join(lines) + "\n"
+
+    def write(self, file_path: str) -> None:
+        """Writes a JSON snapshot to a .json file and the Prometheus text format to any other file."""
+        content = (json.dumps(self.get_snapshot(), indent=2) if file_path.endswith(".json")
+                   else self.to_prometheus_text())
+        temp_file_path = f"{file_path}.tmp"
+        with open(temp_file_path, "w", encoding="utf8") as fh:
+            fh.write(content)
+        # Readers, such as the node exporter, never see a partially written file.
+        os.replace(temp_file_path, file_path)
+
+
+METRICS = BuildMetrics()
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class BuildProgress:
+    """Progress, throughput and ETA line of a persistence store build, printed to the terminal.
+
+    Meetings skipped because a previous build already summarized them are left out of the ETA.
+    """
+
+    def __init__(self, total_meetings: int, metrics: BuildMetrics = METRICS, stream=sys.stderr, show: bool = True):
+        self.total_meetings = total_meetings
+        self.metrics = metrics
+        self.stream = stream
+        self.show = show
+        self.done_meetings = 0
+        self.skipped_meetings = 0
+        self.start_time = time.monotonic()
+
+    def get_eta_seconds(self) -> float | None:
+        if self.done_meetings == 0:
+            return None
+        elapsed_seconds = time.monotonic() - self.start_time
+        remaining_meetings = self.total_meetings - self.skipped_meetings - self.done_meetings
+        return elapsed_seconds / self.done_meetings * max(remaining_meetings, 0)
+
+    def format_line(self) -> str:
+        eta_seconds = self.get_eta_seconds()
+        finished_meetings = self.done_meetings + self.skipped_meetings
+        percent = 100 * finished_meetings / self.total_meetings if self.total_meetings else 100.0
+        return (f"Meetings {finished_meetings}/{self.total_meetings} ({percent:.1f}%) | "
+                f"{self.metrics.get_rate('summarization_input_tokens_total'):.0f} tokens/s in, "
+                f"{self.metrics.get_rate('summarization_output_tokens_total'):.0f} tokens/s out | "
+                f"queued jobs {self.metrics.get_gauge('summarization_queued_jobs'):.0f} | "
+                f"ETA {_format_duration(eta_seconds) if eta_seconds is not None else '-'}")
+
+    def skip(self, skipped_meetings: int = 1) -> None:
+        self.skipped_meetings += skipped_meetings
+
+    def update(self, done_meetings: int = 1) -> None:
+        self.done_meetings += done_meetings
+        self.metrics.set_gauge("meetings_total", self.total_meetings)
+        self.metrics.set_gauge("meetings_done", self.done_meetings + self.skipped_meetings)
+        eta_seconds = self.get_eta_seconds()
+        if eta_seconds is not None:
+            self.metrics.set_gauge("eta_seconds", eta_seconds)
+        if self.show:
+            end = "\r" if self.stream.isatty() else "\n"
+            print(self.format_line(), end=end, file=self.stream, flush=True)
+
+    def close(self) -> None:
+        if self.show and self.stream.isatty():
+            print(file=self.stream, flush=True)
@@ -1,8 +1,14 @@
 import os
 import re
+import sys
+import time
+import consts
 import logging
+import weakref
+import threading
+from collections import deque
 from datetime import datetime
-from typing import Union, Any
+from typing import Union, Any, Iterable, Iterator
 import mysql.connector as connector
 from mysql.connector import errorcode
 from tools.config import Config, DbConfig
@@ -12,40 +18,193 @@ from mysql.connector.abstracts import  MySQLConnectionAbstract
 
 logger = logging.getLogger(__name__)
 
+# Database selected on every open connection, so a pooled connection keeps it between checkouts.
+SELECTED_DATABASES = weakref.WeakKeyDictionary()
+# Statements which may change the database selected on the connection.
+SELECTED_DATABASE_CHANGE_PATTERN = re.compile(r"(^|;)\s*(USE\s|DROP\s+(DATABASE|SCHEMA)\s)", re.IGNORECASE)
+
+
+class SqlConnectionPoolTimeoutException(Exception):
+    pass
+
+
+class SqlConnectionPool:
+    """Pool of DB connections shared by all threads of the process.
+
+    Connections are checked for health when they are checked out, connections idle for longer than
+    `max_idle_seconds` are closed instead of being reused, and at most `size` connections are checked
+    out at a time.
+    """
+
+    def __init__(self,
+                 connect,
+                 size: int = consts.DB_POOL_SIZE,
+                 max_idle_seconds: float = consts.DB_POOL_MAX_IDLE_SECONDS,
+                 checkout_timeout_seconds: float = consts.DB_POOL_CHECKOUT_TIMEOUT_SECONDS):
+        self._connect = connect
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self.checkout_timeout_seconds = checkout_timeout_seconds
+        self._checkouts_semaphore = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        # Idle connections with the time they were checked in, the most recently used last.
+        self._idle_connections = deque()
+
+    def _close_connection(self, db_conn) -> None:
+        try:
+            db_conn.close()
+        except Exception as ex:
+            logger.debug(f"Closing pooled DB connection failed - {ex}")
+
+    def _close_expired_connections(self) -> None:
+        expired_connections = []
+        with self._lock:
+            while (self._idle_connections and
+                   time.monotonic() - self._idle_connections[0][1] > self.max_idle_seconds):
+                expired_connections.append(self._idle_connections.popleft()[0])
+        for db_conn in expired_connections:
+            self._close_connection(db_conn)
+
+    def checkout(self):
+        if not self._checkouts_semaphore.acquire(timeout=self.checkout_timeout_seconds):
+            raise SqlConnectionPoolTimeoutException(
+                f"No DB connection was checked in within {self.checkout_timeout_seconds} seconds.")
+        try:
+            self._close_expired_connections()
+            while True:
+                with self._lock:
+                    db_conn = self._idle_connections.pop()[0] if self._idle_connections else None
+                if db_conn is None:
+                    return self._connect()
+                if db_conn.is_connected():
+                    return db_conn
+                logger.info("Closing broken pooled DB connection.")
+                self._close_connection(db_conn)
+        except BaseException:
+            self._checkouts_semaphore.release()
+            raise
+
+    def checkin(self, db_conn, discard: bool = False) -> None:
+        """Returns a checked out connection to the pool, a discarded connection is closed instead."""
+        try:
+            if discard:
+                self._close_connection(db_conn)
+                return
+            with self._lock:
+                self._idle_connections.append((db_conn, time.monotonic()))
+            self._close_expired_connections()
+        finally:
+            self._checkouts_semaphore.release()
+
+    def close(self) -> None:
+        """Closes the idle connections, checked out connections are closed when they are checked in."""
+        with self._lock:
+            idle_connections = [db_conn for db_conn, _ in self._idle_connections]
+            self._idle_connections.clear()
+        for db_conn in idle_connections:
+            self._close_connection(db_conn)
+
+
+CONNECTION_POOLS: dict[tuple, SqlConnectionPool] = {}
+CONNECTION_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(db_config: Config, charset: str, collation: str) -> SqlConnectionPool:
+    """Returns the process-wide connection pool of the DB server and user, it is created on first use."""
+    pool_key = (db_config.host, db_config.port, db_config.user, charset, collation)
+    with CONNECTION_POOLS_LOCK:
+        if pool_key not in CONNECTION_POOLS:
+            CONNECTION_POOLS[pool_key] = SqlConnectionPool(
+                lambda: _connect(db_config, charset, collation))
+        return CONNECTION_POOLS[pool_key]
+
+
+def _connect(db_config: Config, charset: str, collation: str) -> PooledMySQLConnection | MySQLConnectionAbstract:
+    logger.debug(f"Creating DB connection to {db_config.host}:{db_config.port} for user {db_config.user}")
+    return connector.connect(host=db_config.host, port=db_config.port, user=db_config.user,
+                             password=db_config.password, charset=charset, collation=collation)
+
 
 class SqlQueryManager:
+    """Runs SQL statements on a DB connection opened for the `with` block.
+
+    With `pooled`, the connection is checked out of the process-wide connection pool and checked back in,
+    with its uncommitted changes rolled back, when the block ends, instead of being opened and closed.
+    """
+
     def __init__(self,
                  db_config: Config = DbConfig(),
                  charset: str = "utf8mb4",
-                 collation: str = "utf8mb4_unicode_ci"):
+                 collation: str = "utf8mb4_unicode_ci",
+                 pooled: bool = False):
         self.db_config = db_config
         self.charset = charset
         self.collation = collation
+        self.pooled = pooled
+        self.db_conn = None
 
     def __enter__(self):
-        logger.debug(f"Creating DB connection to {self.db_config.host}:{self.db_config.port} for user {self.db_config.user}")
-        db_conn = connector.connect(host=self.db_config.host, port=self.db_config.port, user=self.db_config.user,
-                                    password=self.db_config.password, charset=self.charset, collation=self.collation)
-        self.db_conn = db_conn
+        if self.pooled:
+            self.db_conn = get_connection_pool(self.db_config, self.charset, self.collation).checkout()
+        else:
+            self.db_conn = _connect(self.db_config, self.charset, self.collation)
         self.db_cursor = self.db_conn.cursor()
         return self
 
+    def _use_default_database(self) -> None:
+        """Selects the database of the DB config, unless it is already selected on the connection."""
+        if SELECTED_DATABASES.get(self.db_conn) != self.db_config.database_name:
+            self.db_cursor.execute(f"USE {self.db_config.database_name}")
+            SELECTED_DATABASES[self.db_conn] = self.db_config.database_name
+
+    def _track_selected_database(self, query: str) -> None:
+        if SELECTED_DATABASE_CHANGE_PATTERN.search(query):
+            # The database is selected again by the next statement which needs it.
+            SELECTED_DATABASES.pop(self.db_conn, None)
+
     def execute(self, query: str, params = (), set_default_database=True) -> Any:
         if set_default_database:
-            self.db_cursor.execute(f"USE {self.db_config.database_name}")
-        return self.db_cursor.execute(query, params)
+            self._use_default_database()
+        try:
+            return self.db_cursor.execute(query, params)
+        finally:
+            self._track_selected_database(query)
 
     def executemany(self, query: str, data: list[Any]) -> Any:
-        self.db_cursor.execute(f"USE {self.db_config.database_name}")
+        self._use_default_database()
         return self.db_cursor.executemany(query, data)
 
     def fetchall(self):
         return self.db_cursor.fetchall()
 
+    def fetchmany(self, size: int):
+        return self.db_cursor.fetchmany(size)
+
+    def commit(self) -> None:
+        self.db_conn.commit()
+
+    def rollback(self) -> None:
+        self.db_conn.rollback()
+
     def __exit__(self, type, value, traceback):
-        if self.db_conn is not None:
+        if self.db_conn is None:
+            return
+        if not self.pooled:
             self.db_cursor.close()
             self.db_conn.close()
+            SELECTED_DATABASES.pop(self.db_conn, None)
+            return
+        discard = False
+        try:
+            self.db_cursor.close()
+            # Changes which were not committed are not left to the next user of the connection.
+            if self.db_conn.in_transaction:
+                self.db_conn.rollback()
+        except Exception as ex:
+            logger.warning(f"Discarding pooled DB connection - {ex}")
+            discard = True
+        get_connection_pool(self.db_config, self.charset, self.collation).checkin(self.db_conn, discard)
+        self.db_conn = None
 
 
 def get_tables_schema():
@@ -133,35 +292,48 @@ def parse_db_schema(sql: str) -> dict:
     return tables_definition
 
 
+def _executemany_in_batches(query_manager: SqlQueryManager, sql: str, rows: list[tuple],
+                            batch_size: int = consts.DB_INSERT_BATCH_SIZE) -> None:
+    # Every batch is sent as one multi-row INSERT statement, bounded by the batch size instead of the input
+    # size, so large inputs don't exceed max_allowed_packet.
+    for start in range(0, len(rows), batch_size):
+        query_manager.executemany(sql, rows[start:start + batch_size])
+
+
 def insert_meetings(meetings: list[dict], query_manager: SqlQueryManager) -> None:
+    """Inserts the meetings which are not in the DB yet, meetings with an existing number are left unchanged."""
     if len(meetings) == 0:
         logger.info("There are no meetings to insert.")
         return
 
-    new_meetings = _get_new_meetings(meetings, query_manager)
-
     meetings_data = [(
         m["number"],datetime.strptime(m["date"], "%Y-%m-%d"),datetime.strptime(m['start_time'], "%H:%M"),
         datetime.strptime(m['end_time'], "%H:%M"),m["time_zone"])
-        for m in new_meetings]
+        for m in meetings]
+    # Existing meetings are detected by the primary key, the no-op update skips them.
     sql = ("INSERT INTO meetings (number, date, start_time, end_time, time_zone) "
-           "VALUES (%s, %s, %s, %s, %s)")
-    query_manager.executemany(sql, meetings_data)
+           "VALUES (%s, %s, %s, %s, %s) "
+           "ON DUPLICATE KEY UPDATE number = number")
+    _executemany_in_batches(query_manager, sql, meetings_data)
 
 
 def insert_meeting_subjects(meetings: list[dict], query_manager: SqlQueryManager) -> None:
+    """Inserts the subject-meeting pairs which are not in the DB yet."""
     if len(meetings) == 0:
         logger.info("There are no meeting subjects to insert.")
         return
 
-    new_subjects = _get_new_subjects(meetings, query_manager)
+    # Duplicate pairs are dropped here, the pairs already in the DB by the primary key.
+    subjects = list(dict.fromkeys((name, m["number"]) for m in meetings for name in m["subjects"]))
 
     query_manager.execute("SET FOREIGN_KEY_CHECKS=0")
     sql = ("INSERT INTO meeting_subjects (name, meeting_number) "
-           "VALUES (%s, %s)")
-    params = list(new_subjects)
-    query_manager.executemany(sql, params)
-    query_manager.execute("SET FOREIGN_KEY_CHECKS=1")
+           "VALUES (%s, %s) "
+           "ON DUPLICATE KEY UPDATE meeting_number = meeting_number")
+    try:
+        _executemany_in_batches(query_manager, sql, subjects)
+    finally:
+        query_manager.execute("SET FOREIGN_KEY_CHECKS=1")
 
 
 def insert_meeting_conversations(meetings: list[dict], query_manager: SqlQueryManager) -> None:
@@ -189,37 +361,6 @@ def insert_meeting_summaries(meetings_summaries: list[tuple[int, str, int, str]]
     query_manager.executemany(sql, meetings_summaries)
 
 
-def _get_new_meetings(meetings: list[dict], query_manager: SqlQueryManager) -> list[dict]:
-    meeting_nums = [m["number"] for m in meetings]
-    values_placeholders = ",".join(["%s"] * len(meeting_nums))
-    select_existing_meeting_nums_sql = ("SELECT number FROM meetings "
-                                        f"WHERE number in ({values_placeholders})")
-    existing_meeting_nums = []
-    query_manager.execute(select_existing_meeting_nums_sql, meeting_nums)
-    for row in query_manager.fetchall():
-        existing_meeting_nums.append(row[0])
-    new_meeting_nums = list(set(meeting_nums) - set(existing_meeting_nums))
-    new_meetings = [m for m in meetings if m["number"] in new_meeting_nums]
-
-    return new_meetings
-
-
-def _get_new_subjects(meetings: list[dict], query_manager: SqlQueryManager) -> set[tuple[str, int]]:
-    # Make flat list of subject-meeting pairs.
-    subjects = sum([sum([[name, m["number"]] for name in m["subjects"]], []) for m in meetings], [])
-    values_placeholders = ",".join(["(%s, %s)"] * int(len(subjects)/2))
-    sql = (f"SELECT name, meeting_number FROM meeting_subjects "
-           f"WHERE (name, meeting_number) IN ({values_placeholders})")
-    query_manager.execute(sql, subjects)
-    existing_subjects_set = set()
-    for subject_record in query_manager.fetchall():
-        existing_subjects_set.add((subject_record[0], subject_record[1]))
-    subjects_set = set([(subjects[i], subjects[i + 1]) for i in range(0, len(subjects) - 1, 2)])
-    new_subjects = subjects_set - existing_subjects_set
-
-    return new_subjects
-
-
 def get_conversations(db_name: str, query_manager: SqlQueryManager) -> list[dict]:
     pass
 
@@ -239,6 +380,18 @@ def get_meeting_summaries(vector_ids: list[int], query_manager: SqlQueryManager)
     return summaries
 
 
+def iter_meeting_summaries(query_manager: SqlQueryManager, batch_size: int = 1000) -> Iterator[list[tuple[int, str]]]:
+    """Yields the vector ids and the summaries of all meeting summaries, `batch_size` rows at a time."""
+    query_manager.execute("SELECT vector_id, summary FROM meeting_summaries WHERE vector_id IS NOT NULL")
+    while rows := query_manager.fetchmany(batch_size):
+        yield rows
+
+
+def get_summarized_meeting_numbers(query_manager: SqlQueryManager) -> set[int]:
+    query_manager.execute("SELECT DISTINCT meeting_number FROM meeting_summaries")
+    return set(r[0] for r in query_manager.fetchall())
+
+
 def init_db(query_manager: SqlQueryManager) -> None:
     db_config = DbConfig()
     query_manager.execute("SHOW DATABASES", set_default_database=False)
@@ -251,6 +404,128 @@ def init_db(query_manager: SqlQueryManager) -> None:
     _create_tables(query_manager)
 
 
+# Tokens which change the state of the SQL script splitter, outside of strings and comments.
+SQL_SCRIPT_TOKEN_PATTERN = re.compile(r"['\"`;#]|--(?=\s|$)|/\*")
+SQL_STRING_END_PATTERNS = {"'": re.compile(r"[\\']"), '"': re.compile(r'[\\"]'), "`": re.compile("`")}
+SQL_TABLE_LOCK_PATTERN = re.compile(r"(UN)?LOCK\s+TABLES?\b", re.IGNORECASE)
+SQL_INSERT_PATTERN = re.compile(r"(INSERT|REPLACE)\s", re.IGNORECASE)
+
+
+def iter_sql_statements(lines: Iterable[str]) -> Iterator[str]:
+    """Splits the lines of an SQL script, such as a mysqldump dump, into its statements as they are read.
+
+    Comments are dropped, except for the executable /*! ... */ comments of the dump. Semicolons in strings,
+    quoted identifiers and comments don't end a statement.
+    """
+    statement_parts = []
+    # Quote of the string or identifier, or the start of the comment, the splitter is in.
+    quote = None
+    comment = None
+    for line in lines:
+        position = 0
+        while position < len(line):
+            if comment is not None:
+                comment_end = line.find("*/", position)
+                if comment_end < 0:
+                    if comment == "/*!":
+                        statement_parts.append(line[position:])
+                    break
+                if comment == "/*!":
+                    statement_parts.append(line[position:comment_end + 2])
+                position = comment_end + 2
+                comment = None
+            elif quote is not None:
+                match = SQL_STRING_END_PATTERNS[quote].search(line, position)
+                if match is None:
+                    statement_parts.append(line[position:])
+                    break
+                # The character after a backslash is escaped, it may be the end of the line.
+                end = match.end() + 1 if match.group() == "\\" else match.end()
+                statement_parts.append(line[position:end])
+                position = end
+                if match.group() == quote:
+                    quote = None
+            else:
+                match = SQL_SCRIPT_TOKEN_PATTERN.search(line, position)
+                if match is None:
+                    statement_parts.append(line[position:])
+                    break
+                statement_parts.append(line[position:match.start()])
+                token = match.group()
+                position = match.end()
+                if token == ";":
+                    statement = "".join(statement_parts).strip()
+                    statement_parts = []
+                    if statement:
+                        yield statement
+                elif token in SQL_STRING_END_PATTERNS:
+                    quote = token
+                    statement_parts.append(token)
+                elif token == "/*":
+                    comment = "/*!" if line.startswith(("/*!", "/*M!"), match.start()) else "/*"
+                    statement_parts.append(token if comment == "/*!" else " ")
+                else:
+                    statement_parts.append("\n")
+                    break
+    statement = "".join(statement_parts).strip()
+    if statement:
+        yield statement
+
+
+def load_sql_dump(file_path: str, query_manager: SqlQueryManager,
+                  commit_statements: int = consts.SQL_DUMP_COMMIT_STATEMENTS, show_progress: bool = False) -> int:
+    """Loads an SQL dump, e.g. data/data.sql, one statement at a time without reading the whole file.
+
+    Rows are inserted in transactions of `commit_statements` INSERT statements, with unique and foreign key
+    checks disabled until the dump is loaded. The table locks of the dump are skipped, as they would commit
+    the transactions. Progress is logged after every transaction and printed to stderr with `show_progress`.
+    Returns the number of executed statements.
+    """
+    total_bytes = os.path.getsize(file_path)
+    read_bytes = 0
+    executed_statements = 0
+    uncommitted_inserts = 0
+
+    def read_lines(fh) -> Iterator[str]:
+        nonlocal read_bytes
+        for line in fh:
+            read_bytes += len(line)
+            yield line.decode("utf-8")
+
+    def report_progress() -> None:
+        percent = 100 * read_bytes / total_bytes if total_bytes else 100.0
+        progress_line = (f"Loaded {read_bytes}/{total_bytes} bytes ({percent:.1f}%) of {file_path}, "
+                         f"{executed_statements} statements executed.")
+        logger.info(progress_line)
+        if show_progress:
+            print(progress_line, end="\r" if sys.stderr.isatty() else "\n", file=sys.stderr, flush=True)
+
+    query_manager.execute("SET FOREIGN_KEY_CHECKS=0")
+    query_manager.execute("SET UNIQUE_CHECKS=0")
+    try:
+        with open(file_path, "rb") as fh:
+            for statement in iter_sql_statements(read_lines(fh)):
+                if SQL_TABLE_LOCK_PATTERN.match(statement):
+                    continue
+                query_manager.execute(statement)
+                executed_statements += 1
+                if SQL_INSERT_PATTERN.match(statement):
+                    uncommitted_inserts += 1
+                    if uncommitted_inserts >= commit_statements:
+                        query_manager.commit()
+                        uncommitted_inserts = 0
+                        report_progress()
+        query_manager.commit()
+        report_progress()
+        if show_progress and sys.stderr.isatty():
+            print(file=sys.stderr, flush=True)
+    finally:
+        query_manager.execute("SET UNIQUE_CHECKS=1")
+        query_manager.execute("SET FOREIGN_KEY_CHECKS=1")
+
+    return executed_statements
+
+
 if __name__ == "__main__":
     with open(os.path.join(os.getcwd(), "..", "..", "data", "data.sql"), "r") as fp:
         db_schema_sql = fp.read()
@@ -0,0 +1,65 @@
+"""Re-embeds the meeting summaries with another embedding model into a new Milvus collection, side by side
+with the current collection, which is left unchanged.
+
+Run from the src folder:
+    python -m tools.embeddings_migration meeting_summaries_minilm --embedding-model sentence-transformers/all-MiniLM-L6-v2
+
+Vectors keep the ids of the current collection, so the vector ids of the meeting summaries in the relational
+DB stay valid. To switch to the new collection, set MILVUS_MEETING_SUMMARIES in the .env file and the
+EMBEDDING_MODEL_NAME environment variable to the new collection and model.
+"""
+import consts
+import logging
+import argparse
+from tools import vector_db_tool
+from tools.db_tools import SqlQueryManager, iter_meeting_summaries
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidMigrationTargetException(Exception):
+    pass
+
+
+def migrate_meeting_summaries_embeddings(target_collection_name: str,
+                                         embedding_model_name: str,
+                                         tokenizer_model_name: str | None = None,
+                                         batch_size: int = consts.VECTOR_DB_INSERT_BATCH_SIZE) -> int:
+    """Embeds all meeting summaries with the embedding model into the target collection, which is recreated.
+    Returns the number of migrated summaries."""
+    if target_collection_name == vector_db_tool.MILVUS_CONFIG.meeting_summaries:
+        raise InvalidMigrationTargetException(
+            f"The target collection {target_collection_name} is the current meeting summaries collection.")
+    embedding_dim = vector_db_tool.get_embedding_dim(embedding_model_name)
+    embedding_service = vector_db_tool.EmbeddingService(tokenizer_model_name or embedding_model_name,
+                                                        embedding_model_name)
+    collection = vector_db_tool.init_collection(target_collection_name, embedding_dim, auto_id_pk=False)
+    rows_count = 0
+    with SqlQueryManager() as query_manager:
+        for rows in iter_meeting_summaries(query_manager, batch_size):
+            embeddings = embedding_service.embed_batch([summary for _, summary in rows])
+            result = collection.insert([[vector_id for vector_id, _ in rows], embeddings])
+            rows_count += result.insert_count
+            logger.info(f"Migrated {rows_count} meeting summaries to {target_collection_name}.")
+    collection.flush()
+    logger.info(f"Migrated {rows_count} meeting summaries to {target_collection_name} with {embedding_dim}-dim "
+                f"vectors, raw vectors size: {rows_count * embedding_dim * 4 / 2 ** 20:.1f} MiB.")
+
+    return rows_count
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Re-embeds the meeting summaries into a new collection.")
+    arg_parser.add_argument("target_collection", help="name of the new Milvus collection")
+    arg_parser.add_argument("--embedding-model", required=True, help="embedding model of the new collection")
+    arg_parser.add_argument("--tokenizer-model", help="tokenizer of the embedding model, the embedding model by default")
+    arg_parser.add_argument("--batch-size", type=int, default=consts.VECTOR_DB_INSERT_BATCH_SIZE,
+                            help="number of summaries embedded and inserted at a time")
+    args = arg_parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        vector_db_tool.connect()
+        migrate_meeting_summaries_embeddings(args.target_collection, args.embedding_model, args.tokenizer_model,
+                                             args.batch_size)
+    finally:
+        vector_db_tool.disconnect()
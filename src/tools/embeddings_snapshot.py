@@ -0,0 +1,133 @@
+import os
+import json
+import struct
+import consts
+import logging
+import numpy as np
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+# Snapshot layout: a fixed size header, the float32 embeddings matrix stored row by row and the int64 ids array
+# starting at the first 8-byte aligned offset after the matrix. All values are little-endian.
+SNAPSHOT_MAGIC = b"CPEMBSNP"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER_FORMAT = "<8sIIQ8x"
+SNAPSHOT_HEADER_SIZE = struct.calcsize(SNAPSHOT_HEADER_FORMAT)
+EMBEDDING_DTYPE = np.dtype("<f4")
+ID_DTYPE = np.dtype("<i8")
+
+
+class InvalidSnapshotException(Exception):
+    pass
+
+
+def _get_ids_offset(rows_count: int, embedding_dim: int) -> int:
+    matrix_end = SNAPSHOT_HEADER_SIZE + rows_count * embedding_dim * EMBEDDING_DTYPE.itemsize
+    return (matrix_end + ID_DTYPE.itemsize - 1) // ID_DTYPE.itemsize * ID_DTYPE.itemsize
+
+
+class EmbeddingsSnapshotWriter:
+    """Writes an embeddings snapshot chunk by chunk, without knowing the number of rows in advance.
+
+    The snapshot is written to a temporary file which replaces the destination file on close.
+    """
+
+    def __init__(self, file_path: str, embedding_dim: int):
+        self.file_path = file_path
+        self.temp_file_path = f"{file_path}.tmp"
+        self.embedding_dim = embedding_dim
+        self.rows_count = 0
+        self.ids_chunks = []
+        self.fh = open(self.temp_file_path, "wb")
+        self._write_header()
+
+    def _write_header(self) -> None:
+        self.fh.seek(0)
+        self.fh.write(struct.pack(SNAPSHOT_HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION,
+                                  self.embedding_dim, self.rows_count))
+
+    def write(self, ids, embeddings) -> None:
+        ids = np.asarray(ids, dtype=ID_DTYPE)
+        embeddings = np.asarray(embeddings, dtype=EMBEDDING_DTYPE)
+        if embeddings.ndim != 2 or embeddings.shape != (len(ids), self.embedding_dim):
+            raise ValueError(f"Expected {len(ids)} embeddings with {self.embedding_dim} dimensions, "
+                             f"got an array with shape {embeddings.shape}")
+        self.fh.write(np.ascontiguousarray(embeddings).tobytes())
+        self.ids_chunks.append(ids)
+        self.rows_count += len(ids)
+
+    def close(self) -> None:
+        ids_offset = _get_ids_offset(self.rows_count, self.embedding_dim)
+        self.fh.write(b"\0" * (ids_offset - self.fh.tell()))
+        for ids in self.ids_chunks:
+            self.fh.write(ids.tobytes())
+        self._write_header()
+        self.fh.close()
+        os.replace(self.temp_file_path, self.file_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is None:
+            self.close()
+        else:
+            self.fh.close()
+            os.remove(self.temp_file_path)
+
+
+def save_embeddings_snapshot(file_path: str, ids, embeddings) -> None:
+    embeddings = np.asarray(embeddings, dtype=EMBEDDING_DTYPE)
+    with EmbeddingsSnapshotWriter(file_path, embeddings.shape[1]) as writer:
+        writer.write(ids, embeddings)
+
+
+def read_embeddings_snapshot_header(file_path: str) -> tuple[int, int]:
+    with open(file_path, "rb") as fh:
+        header = fh.read(SNAPSHOT_HEADER_SIZE)
+    if len(header) != SNAPSHOT_HEADER_SIZE:
+        raise InvalidSnapshotException(f"File {file_path} is too short to be an embeddings snapshot")
+    magic, version, embedding_dim, rows_count = struct.unpack(SNAPSHOT_HEADER_FORMAT, header)
+    if magic != SNAPSHOT_MAGIC:
+        raise InvalidSnapshotException(f"File {file_path} is not an embeddings snapshot")
+    if version != SNAPSHOT_VERSION:
+        raise InvalidSnapshotException(f"Unsupported embeddings snapshot version {version} in {file_path}")
+    expected_size = _get_ids_offset(rows_count, embedding_dim) + rows_count * ID_DTYPE.itemsize
+    if os.path.getsize(file_path) != expected_size:
+        raise InvalidSnapshotException(f"Embeddings snapshot {file_path} is truncated or corrupted")
+
+    return embedding_dim, rows_count
+
+
+def load_embeddings_snapshot(file_path: str) -> tuple[np.ndarray, np.ndarray]:
+    """Returns read-only memory-mapped ids and embeddings arrays of the snapshot."""
+    embedding_dim, rows_count = read_embeddings_snapshot_header(file_path)
+    if rows_count == 0:
+        return np.empty(0, dtype=ID_DTYPE), np.empty((0, embedding_dim), dtype=EMBEDDING_DTYPE)
+    embeddings = np.memmap(file_path, dtype=EMBEDDING_DTYPE, mode="r", offset=SNAPSHOT_HEADER_SIZE,
+                           shape=(rows_count, embedding_dim))
+    ids = np.memmap(file_path, dtype=ID_DTYPE, mode="r", offset=_get_ids_offset(rows_count, embedding_dim),
+                    shape=(rows_count,))
+
+    return ids, embeddings
+
+
+def iter_embeddings_snapshot(file_path: str, chunk_size: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    ids, embeddings = load_embeddings_snapshot(file_path)
+    for start in range(0, len(ids), chunk_size):
+        yield ids[start:start + chunk_size], embeddings[start:start + chunk_size]
+
+
+def convert_embeddings_json_to_snapshot(json_file_path: str, snapshot_file_path: str) -> None:
+    with open(json_file_path, "r") as fp:
+        json_data = json.load(fp)
+    ids = np.fromiter((item["id"] for item in json_data), dtype=ID_DTYPE, count=len(json_data))
+    embeddings = np.array([item["embedding"] for item in json_data], dtype=EMBEDDING_DTYPE)
+    save_embeddings_snapshot(snapshot_file_path, ids, embeddings)
+    logger.info(f"Converted {len(ids)} embeddings from {json_file_path} to {snapshot_file_path}.")
+
+
+if __name__ == "__main__":
+    convert_embeddings_json_to_snapshot(consts.VECTOR_DB_EMBEDDINGS_FILE_PATH,
+                                        consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH)
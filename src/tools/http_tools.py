@@ -0,0 +1,204 @@
+import io
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+import requests
+from typing import Callable, Iterable, Any
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class HostRateLimiter:
+    """Spaces out request starts to a single host so that no more than
+    `requests_per_second` requests are sent to it."""
+
+    def __init__(self, requests_per_second: float):
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class ResponseCache:
+    """On-disk cache of successful responses keyed by URL.
+
+    Each entry is stored as a body file and a metadata file holding the ETag, the Last-Modified
+    value and the SHA-256 hash of the body, which are used for sending conditional requests.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _get_entry_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha256(url.encode("utf8")).hexdigest())
+
+    def _write_atomically(self, file_path: str, data: bytes) -> None:
+        temp_file_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temp_file_path, "wb") as fh:
+            fh.write(data)
+        os.replace(temp_file_path, file_path)
+
+    def get_metadata(self, url: str) -> dict | None:
+        entry_path = self._get_entry_path(url)
+        if not (os.path.exists(f"{entry_path}.json") and os.path.exists(f"{entry_path}.body")):
+            return None
+        with open(f"{entry_path}.json", encoding="utf8") as fh:
+            return json.load(fh)
+
+    def get_conditional_headers(self, url: str) -> dict:
+        metadata = self.get_metadata(url)
+        headers = {}
+        if metadata is not None:
+            if metadata.get("etag"):
+                headers["If-None-Match"] = metadata["etag"]
+            if metadata.get("last_modified"):
+                headers["If-Modified-Since"] = metadata["last_modified"]
+        return headers
+
+    def load(self, url: str) -> requests.Response | None:
+        metadata = self.get_metadata(url)
+        if metadata is None:
+            return None
+        with open(f"{self._get_entry_path(url)}.body", "rb") as fh:
+            response = requests.Response()
+            response.raw = io.BytesIO(fh.read())
+        response.status_code = 200
+        response.url = url
+        response.encoding = metadata["encoding"]
+        response.headers.update(metadata["headers"])
+        response.from_cache = True
+        return response
+
+    def store(self, url: str, response: requests.Response) -> bool:
+        """Stores the response and returns False if the cached body was already identical."""
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        metadata = self.get_metadata(url)
+        is_changed = metadata is None or metadata["content_hash"] != content_hash
+        entry_path = self._get_entry_path(url)
+        if is_changed:
+            self._write_atomically(f"{entry_path}.body", response.content)
+        metadata = {
+            "url": url,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "content_hash": content_hash,
+            "encoding": response.encoding,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "")}
+        }
+        self._write_atomically(f"{entry_path}.json", json.dumps(metadata).encode("utf8"))
+        return is_changed
+
+
+class HttpFetcher:
+    """Thread-safe HTTP client sharing one keep-alive session between workers.
+
+    Every host gets its own connection pool, a bound on the number of requests in flight
+    and a rate limiter. Failed requests (connection errors, timeouts and retryable
+    status codes) are retried with exponential backoff. When a response cache is given,
+    requests for cached URLs are sent as conditional requests and a 304 response is
+    answered from the cache.
+    """
+
+    def __init__(self,
+                 max_workers: int = 8,
+                 max_workers_per_host: int = 4,
+                 requests_per_second: float = 4.0,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 timeout: float = 30.0,
+                 retry_status_codes: tuple[int, ...] = RETRY_STATUS_CODES,
+                 cache: ResponseCache = None):
+        self.max_workers = max_workers
+        self.max_workers_per_host = max_workers_per_host
+        self.requests_per_second = requests_per_second
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+        self.retry_status_codes = retry_status_codes
+        self.cache = cache
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers_per_host, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._host_semaphores = {}
+        self._host_rate_limiters = {}
+        self._lock = threading.Lock()
+
+    def _get_host_limits(self, url: str) -> tuple[threading.Semaphore, HostRateLimiter]:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_workers_per_host)
+                self._host_rate_limiters[host] = HostRateLimiter(self.requests_per_second)
+            return self._host_semaphores[host], self._host_rate_limiters[host]
+
+    def _get_backoff_delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff_factor * (2 ** attempt)
+
+    def get(self, url: str, headers: dict | None = None) -> requests.Response:
+        if self.cache is None:
+            return self._get(url, headers)
+        conditional_headers = self.cache.get_conditional_headers(url)
+        response = self._get(url, {**conditional_headers, **(headers or {})})
+        if response.status_code == 304 and conditional_headers:
+            logger.debug(f"Page '{url}' not modified, using the cached copy.")
+            return self.cache.load(url)
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        response.from_cache = False
+        return response
+
+    def _get(self, url: str, headers: dict | None = None) -> requests.Response:
+        host_semaphore, host_rate_limiter = self._get_host_limits(url)
+        with host_semaphore:
+            for attempt in range(self.max_retries + 1):
+                host_rate_limiter.wait()
+                try:
+                    response = self.session.get(url, headers=headers, timeout=self.timeout)
+                except (requests.ConnectionError, requests.Timeout) as ex:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self._get_backoff_delay(attempt)
+                    logger.warning(f"Request to '{url}' failed ({ex}), retrying in {delay:.2f}s ...")
+                else:
+                    if response.status_code not in self.retry_status_codes or attempt == self.max_retries:
+                        return response
+                    delay = self._get_backoff_delay(attempt, response)
+                    logger.warning(f"Request to '{url}' returned {response.status_code}, retrying in {delay:.2f}s ...")
+                    response.close()
+                time.sleep(delay)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> list[Any]:
+        """Runs `fn` over `items` concurrently and returns the results in the order of `items`."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(executor.map(fn, items))
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
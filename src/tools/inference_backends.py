@@ -0,0 +1,151 @@
+import os
+import math
+import shutil
+import torch
+import consts
+import logging
+from transformers import pipeline, AutoTokenizer, AutoModel
+from transformers.modeling_outputs import BaseModelOutput
+
+logger = logging.getLogger(__name__)
+
+PYTORCH_BACKEND = "pytorch"
+ONNX_BACKEND = "onnx"
+ONNX_INT8_BACKEND = "onnx-int8"
+INFERENCE_BACKENDS = (PYTORCH_BACKEND, ONNX_BACKEND, ONNX_INT8_BACKEND)
+SEQ2SEQ_TASK = "text2text-generation-with-past"
+FEATURE_EXTRACTION_TASK = "feature-extraction"
+
+
+class UnsupportedInferenceBackendException(Exception):
+    pass
+
+
+def _check_inference_backend(inference_backend: str) -> None:
+    if inference_backend not in INFERENCE_BACKENDS:
+        raise UnsupportedInferenceBackendException(
+            f"Unsupported inference backend {inference_backend}, supported backends: {', '.join(INFERENCE_BACKENDS)}.")
+
+
+def get_onnx_model_dir(model_name: str, task: str, quantized: bool,
+                       onnx_models_dir: str = consts.ONNX_MODELS_DIR) -> str:
+    return os.path.join(onnx_models_dir, f"{model_name.replace('/', '--')}--{task}{'--int8' if quantized else ''}")
+
+
+def _get_ort_model_class(task: str):
+    # ONNX Runtime packages are needed only by the ONNX backends.
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM, ORTModelForFeatureExtraction
+    return {SEQ2SEQ_TASK: ORTModelForSeq2SeqLM, FEATURE_EXTRACTION_TASK: ORTModelForFeatureExtraction}[task]
+
+
+def _quantize_onnx_model(model_dir: str, quantized_model_dir: str) -> None:
+    """Quantizes the weights of all ONNX files of the model to int8, activations are quantized dynamically."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    temp_model_dir = f"{quantized_model_dir}.tmp"
+    shutil.rmtree(temp_model_dir, ignore_errors=True)
+    shutil.copytree(model_dir, temp_model_dir, ignore=shutil.ignore_patterns("*.onnx", "*.onnx_data"))
+    for file_name in sorted(f for f in os.listdir(model_dir) if f.endswith(".onnx")):
+        quantize_dynamic(os.path.join(model_dir, file_name), os.path.join(temp_model_dir, file_name),
+                         weight_type=QuantType.QInt8)
+    os.replace(temp_model_dir, quantized_model_dir)
+
+
+def export_onnx_model(model_name: str, task: str, quantized: bool = False,
+                      onnx_models_dir: str = consts.ONNX_MODELS_DIR) -> str:
+    """Exports the model to ONNX, and quantizes it when `quantized` is set, unless it was already exported.
+    Returns the folder of the exported model."""
+    quantized_model_dir = get_onnx_model_dir(model_name, task, True, onnx_models_dir)
+    model_dir = get_onnx_model_dir(model_name, task, False, onnx_models_dir)
+    if not os.path.exists(model_dir):
+        logger.info(f"Exporting the {model_name} model to ONNX ...")
+        temp_model_dir = f"{model_dir}.tmp"
+        _get_ort_model_class(task).from_pretrained(model_name, export=True).save_pretrained(temp_model_dir)
+        os.replace(temp_model_dir, model_dir)
+    if not quantized:
+        return model_dir
+    if not os.path.exists(quantized_model_dir):
+        logger.info(f"Quantizing the {model_name} ONNX model ...")
+        _quantize_onnx_model(model_dir, quantized_model_dir)
+    return quantized_model_dir
+
+
+def export_onnx_models(model_name: str, task: str, inference_backend: str = consts.INFERENCE_BACKEND) -> None:
+    """Exports the model for the ONNX backends, so worker processes only load it."""
+    _check_inference_backend(inference_backend)
+    if inference_backend != PYTORCH_BACKEND:
+        export_onnx_model(model_name, task, quantized=inference_backend == ONNX_INT8_BACKEND)
+
+
+class OnnxEmbeddingModel:
+    """Runs an ONNX feature extraction model with the inputs and outputs of the PyTorch model.
+
+    Encoder-decoder models, such as BART, are exported with decoder inputs which the PyTorch model creates
+    from the input ids, so they are created the same way here.
+    """
+
+    def __init__(self, ort_model):
+        self.ort_model = ort_model
+
+    def __call__(self, **inputs) -> BaseModelOutput:
+        if "decoder_input_ids" in self.ort_model.input_names and "decoder_input_ids" not in inputs:
+            config = self.ort_model.config
+            input_ids = inputs["input_ids"]
+            decoder_input_ids = input_ids.new_full(input_ids.shape, config.pad_token_id)
+            decoder_input_ids[:, 1:] = input_ids[:, :-1]
+            decoder_input_ids[:, 0] = config.decoder_start_token_id
+            inputs["decoder_input_ids"] = decoder_input_ids
+        onnx_inputs = {name: inputs[name].cpu().numpy() for name in self.ort_model.input_names}
+        last_hidden_state, = self.ort_model.model.run(["last_hidden_state"], onnx_inputs)
+        return BaseModelOutput(last_hidden_state=torch.from_numpy(last_hidden_state))
+
+
+def _load_ort_model(model_name: str, task: str, inference_backend: str):
+    model_dir = export_onnx_model(model_name, task, quantized=inference_backend == ONNX_INT8_BACKEND)
+    return _get_ort_model_class(task).from_pretrained(model_dir)
+
+
+def load_summarization_pipeline(summarizer_model_name: str = consts.SUMMARIZER_MODEL_NAME,
+                                tokenizer_model_name: str = consts.TOKENIZER_MODEL_NAME,
+                                inference_backend: str = consts.INFERENCE_BACKEND):
+    _check_inference_backend(inference_backend)
+    if inference_backend == PYTORCH_BACKEND:
+        return pipeline("summarization", model=summarizer_model_name, tokenizer=tokenizer_model_name)
+    return pipeline("summarization",
+                    model=_load_ort_model(summarizer_model_name, SEQ2SEQ_TASK, inference_backend),
+                    tokenizer=AutoTokenizer.from_pretrained(tokenizer_model_name))
+
+
+def load_embedding_model(embedding_model_name: str = consts.EMBEDDING_MODEL_NAME,
+                         inference_backend: str = consts.INFERENCE_BACKEND):
+    """Loads the embedding model, ONNX models take the same inputs and return the same outputs as PyTorch models."""
+    _check_inference_backend(inference_backend)
+    if inference_backend == PYTORCH_BACKEND:
+        return AutoModel.from_pretrained(embedding_model_name)
+    return OnnxEmbeddingModel(_load_ort_model(embedding_model_name, FEATURE_EXTRACTION_TASK, inference_backend))
+
+
+def get_cosine_similarity(first_vector: list[float], second_vector: list[float]) -> float:
+    dot_product = sum(a * b for a, b in zip(first_vector, second_vector))
+    norms_product = math.sqrt(sum(a * a for a in first_vector)) * math.sqrt(sum(b * b for b in second_vector))
+    return dot_product / norms_product if norms_product > 0 else 0.0
+
+
+def get_rouge_l(summary: str, reference_summary: str) -> float:
+    """Returns the ROUGE-L F1 score of the summary, computed on lower-cased words."""
+    words = summary.lower().split()
+    reference_words = reference_summary.lower().split()
+    if not words or not reference_words:
+        return float(words == reference_words)
+    # Length of the longest common subsequence, computed one row at a time.
+    previous_row = [0] * (len(reference_words) + 1)
+    for word in words:
+        row = [0]
+        for j, reference_word in enumerate(reference_words):
+            row.append(previous_row[j] + 1 if word == reference_word else max(previous_row[j + 1], row[j]))
+        previous_row = row
+    lcs_length = previous_row[-1]
+    if lcs_length == 0:
+        return 0.0
+    precision = lcs_length / len(words)
+    recall = lcs_length / len(reference_words)
+    return 2 * precision * recall / (precision + recall)
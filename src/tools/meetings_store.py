@@ -0,0 +1,133 @@
+import os
+import json
+import consts
+import logging
+from typing import Iterator
+
+logger = logging.getLogger(__name__)
+
+
+class MeetingsStore:
+    """Append-only JSON Lines store with one meeting per line.
+
+    The offset and the length of every meeting record are kept in a separate index file, so a
+    single meeting can be read without parsing the other ones and iterating over the store
+    keeps only one meeting in memory at a time. Appending a meeting with an already stored
+    number adds a new record which supersedes the old one.
+    """
+
+    def __init__(self, store_file_path: str = consts.MEETINGS_STORE_FILE_PATH):
+        self.store_file_path = store_file_path
+        self.index_file_path = f"{store_file_path}.idx"
+        self.index = {}
+        self._load_index()
+
+    def _get_data_size(self) -> int:
+        return os.path.getsize(self.store_file_path) if os.path.exists(self.store_file_path) else 0
+
+    def _load_index(self) -> None:
+        data_size = self._get_data_size()
+        if os.path.exists(self.index_file_path):
+            with open(self.index_file_path, encoding="utf8") as fh:
+                index_data = json.load(fh)
+            if index_data["data_size"] == data_size:
+                self.index = {number: (offset, length) for number, offset, length in index_data["meetings"]}
+                return
+            logger.warning(f"Meetings store index {self.index_file_path} is out of date, rebuilding it ...")
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        self.index = {}
+        if not os.path.exists(self.store_file_path):
+            return
+        with open(self.store_file_path, "rb+") as fh:
+            offset = 0
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    # Drop the incomplete record left behind by an interrupted append.
+                    fh.truncate(offset)
+                    break
+                self.index[json.loads(line)["number"]] = (offset, len(line))
+                offset += len(line)
+        self._save_index()
+
+    def _save_index(self) -> None:
+        index_data = {
+            "data_size": self._get_data_size(),
+            "meetings": [[number, offset, length] for number, (offset, length) in self.index.items()]
+        }
+        temp_index_file_path = f"{self.index_file_path}.tmp"
+        with open(temp_index_file_path, "w", encoding="utf8") as fh:
+            json.dump(index_data, fh)
+        os.replace(temp_index_file_path, self.index_file_path)
+
+    def append(self, meetings: dict | list[dict]) -> None:
+        meetings = meetings if isinstance(meetings, list) else [meetings]
+        with open(self.store_file_path, "ab") as fh:
+            for meeting in meetings:
+                offset = fh.tell()
+                line = (json.dumps(meeting) + "\n").encode("utf8")
+                fh.write(line)
+                self.index[meeting["number"]] = (offset, len(line))
+        self._save_index()
+
+    def meeting_numbers(self) -> list[int]:
+        return list(self.index.keys())
+
+    def get_meeting(self, number: int) -> dict:
+        if number not in self.index:
+            raise KeyError(f"Meeting {number} not found in the meetings store {self.store_file_path}")
+        offset, length = self.index[number]
+        with open(self.store_file_path, "rb") as fh:
+            fh.seek(offset)
+            return json.loads(fh.read(length))
+
+    def iter_meetings(self) -> Iterator[dict]:
+        if not self.index:
+            return
+        offsets = set(offset for offset, _ in self.index.values())
+        with open(self.store_file_path, "rb") as fh:
+            offset = 0
+            for line in fh:
+                # Records superseded by a later record of the same meeting are skipped.
+                if offset in offsets:
+                    yield json.loads(line)
+                offset += len(line)
+
+    def __iter__(self) -> Iterator[dict]:
+        return self.iter_meetings()
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, number: int) -> bool:
+        return number in self.index
+
+
+def convert_meetings_json(meetings_file_path: str, store_file_path: str) -> MeetingsStore:
+    with open(meetings_file_path, encoding="utf8") as fh:
+        meetings = json.load(fh)
+    store = MeetingsStore(store_file_path)
+    new_meetings = [m for m in meetings if m["number"] not in store]
+    store.append(new_meetings)
+    # The store is marked as up to date with the .json file even when no meetings were added, so the
+    # .json file is not loaded again until it changes.
+    store_mtime_ns = max(os.stat(store_file_path).st_mtime_ns, os.stat(meetings_file_path).st_mtime_ns)
+    os.utime(store_file_path, ns=(store_mtime_ns, store_mtime_ns))
+    logger.info(f"Added {len(new_meetings)} meetings from {meetings_file_path} to {store_file_path}.")
+
+    return store
+
+
+def get_meetings_store(store_file_path: str = consts.MEETINGS_STORE_FILE_PATH,
+                       meetings_file_path: str = consts.MEETINGS_DATA_FILE_PATH) -> MeetingsStore:
+    """Opens the meetings store, adding the meetings from the meetings .json file produced by the scraper
+    when the store does not exist yet or when the .json file was updated after the store."""
+    if os.path.exists(meetings_file_path) and (not os.path.exists(store_file_path) or
+                                               os.path.getmtime(meetings_file_path) > os.path.getmtime(store_file_path)):
+        return convert_meetings_json(meetings_file_path, store_file_path)
+    return MeetingsStore(store_file_path)
+
+
+if __name__ == "__main__":
+    convert_meetings_json(consts.MEETINGS_DATA_FILE_PATH, consts.MEETINGS_STORE_FILE_PATH)
@@ -2,7 +2,7 @@ import os
 import re
 import json
 import logging
-from tools.summarization_tools import SummarizationTool
+from tools.summarization_tools import SummarizationTool, HierarchicalSummarizationTool
 
 logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.DEBUG)
@@ -41,14 +41,14 @@ def get_meeting_docs_per_person(meeting: dict) -> dict[str, list[str]]:
     return documents
 
 
-def create_meeting_summaries(meeting: dict) -> list[tuple[str, str]]:
+def create_meeting_summaries(meeting: dict, summarization_tool: SummarizationTool = None) -> list[tuple[str, str]]:
     meeting_docs = get_meeting_docs_per_person(meeting)
-    meeting_summaries = []
-    summarization_tool = SummarizationTool(max_parallel_processes=4)
-    for speaker, docs in meeting_docs.items():
-        speaker_summary_lines = summarization_tool.run(docs)
-        speaker_summary = "".join([l for l in speaker_summary_lines])
-        logger.debug(f"{os.linesep}Total input tokens: {summarization_tool.total_input_tokens_count}{os.linesep}")
-        meeting_summaries.append((speaker, speaker_summary))
+    if summarization_tool is None:
+        summarization_tool = SummarizationTool(max_parallel_processes=4)
+    # Chunk summaries of long speeches are summarized again until the speaker summary fits the target length.
+    hierarchical_summarization_tool = HierarchicalSummarizationTool(summarization_tool)
+    speakers_summaries = hierarchical_summarization_tool.run_batch(list(meeting_docs.values()))
+    meeting_summaries = list(zip(meeting_docs.keys(), speakers_summaries))
+    logger.debug(f"{os.linesep}Total input tokens: {summarization_tool.total_input_tokens_count}{os.linesep}")
 
     return meeting_summaries
@@ -1,69 +1,289 @@
+import os
+import json
 import consts
 import logging
+import argparse
+from typing import Iterable, Iterator
 from tools import vector_db_tool
 from tools.db_tools import (
     SqlQueryManager,
     init_db,
     insert_meetings,
     insert_meeting_subjects,
-    insert_meeting_summaries
+    insert_meeting_summaries,
+    load_sql_dump,
+    get_summarized_meeting_numbers
 )
-from pymilvus import MilvusException
-from tools.meetings_tools import create_meeting_summaries
+from tools.summary_cache import SummaryCache
+from tools.build_metrics import METRICS, BuildProgress
+from tools.summarization_scheduler import SummarizationScheduler
+from tools.summarization_tools import SummarizationWorkerPool
 
 
 logger = logging.getLogger(__file__)
 logging.basicConfig(filename=consts.MAIN_LOG_FILE_PATH, encoding="utf-8", level=logging.DEBUG, force=True)
 
 
-def init_meetings_persistence_store(query_manager: SqlQueryManager, auto_id_pk: bool = True) -> None:
-    vector_db_tool.init_vectors_store(auto_id_pk)
+def init_meetings_persistence_store(query_manager: SqlQueryManager, auto_id_pk: bool = True,
+                                    drop_existing: bool = True) -> None:
+    vector_db_tool.init_vectors_store(auto_id_pk, drop_existing)
     init_db(query_manager)
 
 
-def load_saved_data():
+def load_saved_data(show_progress: bool = False):
     try:
         vector_db_tool.connect()
         with SqlQueryManager() as query_manager:
             init_meetings_persistence_store(query_manager, auto_id_pk=False)
-            with open(consts.SQL_DATA_FILE_PATH, "r") as fp:
-                data = fp.read()
-                query_manager.execute(data)
-            vector_db_tool.load_meeting_summaries_embeddings(consts.VECTOR_DB_EMBEDDINGS_FILE_PATH)
+            load_sql_dump(consts.SQL_DATA_FILE_PATH, query_manager, show_progress=show_progress)
+            if os.path.exists(consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH):
+                vector_db_tool.load_meeting_summaries_embeddings_snapshot(consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH)
+            else:
+                vector_db_tool.load_meeting_summaries_embeddings(consts.VECTOR_DB_EMBEDDINGS_FILE_PATH)
     finally:
         vector_db_tool.disconnect()
 
 
-def build_meetings_persistence_store(meetings: list[dict]) -> None:
+class BuildCheckpoint:
+    """Per-meeting progress of a persistence store build, kept in a JSON state file.
+
+    Meetings go through the summarized, embedded and persisted stages. The ids of the vectors inserted
+    for an embedded meeting are kept until its summaries are committed to the relational DB, so vectors
+    left behind by an interrupted build can be deleted when the build is resumed.
+    """
+    SUMMARIZED = "summarized"
+    EMBEDDED = "embedded"
+    PERSISTED = "persisted"
+
+    def __init__(self, state_file_path: str = consts.BUILD_STATE_FILE_PATH):
+        self.state_file_path = state_file_path
+        self.meetings = {}
+        if os.path.exists(state_file_path):
+            with open(state_file_path, encoding="utf8") as fh:
+                state = json.load(fh)
+            self.meetings = {int(number): meeting_state for number, meeting_state in state["meetings"].items()}
+
+    def _save(self) -> None:
+        temp_state_file_path = f"{self.state_file_path}.tmp"
+        with open(temp_state_file_path, "w", encoding="utf8") as fh:
+            json.dump({"meetings": {str(number): meeting_state for number, meeting_state in self.meetings.items()}}, fh)
+        os.replace(temp_state_file_path, self.state_file_path)
+
+    def get_stage(self, meeting_number: int) -> str | None:
+        return self.meetings.get(meeting_number, {}).get("stage")
+
+    def set_stage(self, meeting_numbers: Iterable[int], stage: str,
+                  vector_ids: dict[int, list[int]] | None = None) -> None:
+        for meeting_number in meeting_numbers:
+            self.meetings[meeting_number] = {"stage": stage, "vector_ids": (vector_ids or {}).get(meeting_number, [])}
+        self._save()
+
+    def get_embedded_vector_ids(self) -> dict[int, list[int]]:
+        return {number: meeting_state["vector_ids"] for number, meeting_state in self.meetings.items()
+                if meeting_state["stage"] == self.EMBEDDED}
+
+    def reset(self) -> None:
+        self.meetings = {}
+        self._save()
+
+
+class MeetingSummariesWriter:
+    """Accumulates meeting summaries across meetings and writes them in chunks, with one vector DB insert
+    and one batched SQL write per chunk.
+
+    Summaries waiting to be written are kept in a spool file until their chunk is written, so summaries
+    created before a failure are written by the next build instead of being created again. Without `resume`,
+    the spool file left by a previous build is removed. When a build checkpoint is given, the stage of every
+    meeting is recorded in it.
+    """
+
+    def __init__(self,
+                 query_manager: SqlQueryManager,
+                 spool_file_path: str = consts.SUMMARIES_SPOOL_FILE_PATH,
+                 flush_size: int = consts.SUMMARIES_FLUSH_SIZE,
+                 flush_meetings: int = consts.SUMMARIES_FLUSH_MEETINGS,
+                 checkpoint: BuildCheckpoint | None = None,
+                 resume: bool = True):
+        self.query_manager = query_manager
+        self.spool_file_path = spool_file_path
+        self.flush_size = flush_size
+        self.flush_meetings = flush_meetings
+        self.checkpoint = checkpoint
+        self.pending_summaries = []
+        self.pending_meetings = set()
+        if resume:
+            self._load_spool()
+        elif os.path.exists(spool_file_path):
+            logger.info(f"Removing the summaries spooled by a previous build from {spool_file_path}.")
+            os.remove(spool_file_path)
+        if checkpoint is not None:
+            checkpoint.set_stage([n for n in self.pending_meetings if checkpoint.get_stage(n) is None],
+                                 BuildCheckpoint.SUMMARIZED)
+
+    def _set_stage(self, meeting_numbers: Iterable[int], stage: str,
+                   vector_ids: dict[int, list[int]] | None = None) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.set_stage(meeting_numbers, stage, vector_ids)
+
+    def _load_spool(self) -> None:
+        if not os.path.exists(self.spool_file_path):
+            return
+        with open(self.spool_file_path, "rb+") as fh:
+            offset = 0
+            for line in fh:
+                if not line.endswith(b"\n"):
+                    # Drop the incomplete record left behind by an interrupted build.
+                    fh.truncate(offset)
+                    break
+                offset += len(line)
+                record = json.loads(line)
+                if (self.checkpoint is not None and
+                        self.checkpoint.get_stage(record["meeting_number"]) == BuildCheckpoint.PERSISTED):
+                    # The chunk was committed but the build stopped before the spool file was removed.
+                    continue
+                self.pending_summaries.append((record["summary"], record["meeting_number"], record["speaker"]))
+                self.pending_meetings.add(record["meeting_number"])
+        logger.info(f"Resuming with {len(self.pending_summaries)} summaries of {len(self.pending_meetings)} "
+                    f"meetings from {self.spool_file_path}.")
+
+    def is_pending(self, meeting_number: int) -> bool:
+        return meeting_number in self.pending_meetings
+
+    def add(self, meeting_number: int, speakers_summaries: list[tuple[str, str]]) -> None:
+        with open(self.spool_file_path, "a", encoding="utf8") as fh:
+            for speaker, summary in speakers_summaries:
+                fh.write(json.dumps({"meeting_number": meeting_number, "speaker": speaker, "summary": summary}) + "\n")
+        self.pending_summaries.extend((summary, meeting_number, speaker) for speaker, summary in speakers_summaries)
+        self.pending_meetings.add(meeting_number)
+        self._set_stage([meeting_number], BuildCheckpoint.SUMMARIZED)
+        if len(self.pending_summaries) >= self.flush_size or len(self.pending_meetings) >= self.flush_meetings:
+            self.flush()
+
+    def flush(self) -> None:
+        if len(self.pending_summaries) > 0:
+            vector_ids = vector_db_tool.insert_meeting_summaries([summary for summary, _, _ in self.pending_summaries])
+            summary_data_to_insert = [(vector_id, summary, meeting_number, speaker)
+                                      for vector_id, (summary, meeting_number, speaker)
+                                      in zip(vector_ids, self.pending_summaries)]
+            meetings_vector_ids = {}
+            for vector_id, _, meeting_number, _ in summary_data_to_insert:
+                meetings_vector_ids.setdefault(meeting_number, []).append(vector_id)
+            self._set_stage(self.pending_meetings, BuildCheckpoint.EMBEDDED, meetings_vector_ids)
+            try:
+                with METRICS.time("mariadb_write_seconds"):
+                    insert_meeting_summaries(summary_data_to_insert, self.query_manager)
+                    self.query_manager.commit()
+            except Exception:
+                # Keep the vector DB consistent with the relational DB, the chunk is written again on resume.
+                self.query_manager.rollback()
+                vector_db_tool.delete_meeting_summaries(vector_ids)
+                self._set_stage(self.pending_meetings, BuildCheckpoint.SUMMARIZED)
+                raise
+            logger.info(f"Wrote {len(self.pending_summaries)} summaries of {len(self.pending_meetings)} meetings.")
+        if len(self.pending_meetings) > 0:
+            # Meetings without speakers have no summaries to write, they are persisted all the same.
+            self._set_stage(self.pending_meetings, BuildCheckpoint.PERSISTED)
+            METRICS.increment("persisted_meetings_total", len(self.pending_meetings))
+            METRICS.increment("persisted_summaries_total", len(self.pending_summaries))
+        self.pending_summaries = []
+        self.pending_meetings = set()
+        if os.path.exists(self.spool_file_path):
+            os.remove(self.spool_file_path)
+
+
+def _resume_checkpoint(checkpoint: BuildCheckpoint, query_manager: SqlQueryManager) -> None:
+    persisted_meeting_numbers = get_summarized_meeting_numbers(query_manager)
+    checkpoint.set_stage([n for n in persisted_meeting_numbers if checkpoint.get_stage(n) != BuildCheckpoint.PERSISTED],
+                         BuildCheckpoint.PERSISTED)
+    for meeting_number, vector_ids in checkpoint.get_embedded_vector_ids().items():
+        # The build stopped after inserting the vectors of the meeting and before committing its summaries.
+        logger.info(f"Deleting {len(vector_ids)} uncommitted vectors of meeting {meeting_number} ...")
+        vector_db_tool.delete_meeting_summaries(vector_ids)
+        checkpoint.set_stage([meeting_number], BuildCheckpoint.SUMMARIZED)
+
+
+def _get_meetings_to_summarize(meetings: Iterable[dict], checkpoint: BuildCheckpoint,
+                               summaries_writer: MeetingSummariesWriter, progress: BuildProgress) -> Iterator[dict]:
+    for meeting in meetings:
+        if checkpoint.get_stage(meeting["number"]) == BuildCheckpoint.PERSISTED:
+            logger.info(f"Meeting {meeting['number']} already persisted.")
+            progress.skip()
+            continue
+        if summaries_writer.is_pending(meeting["number"]):
+            logger.info(f"Summaries of meeting {meeting['number']} already created.")
+            progress.skip()
+            continue
+        logger.info(f"Processing meeting {meeting['number']} ...")
+        yield meeting
+
+
+def build_meetings_persistence_store(meetings: list[dict],
+                                     spool_file_path: str = consts.SUMMARIES_SPOOL_FILE_PATH,
+                                     flush_size: int = consts.SUMMARIES_FLUSH_SIZE,
+                                     flush_meetings: int = consts.SUMMARIES_FLUSH_MEETINGS,
+                                     resume: bool = False,
+                                     state_file_path: str = consts.BUILD_STATE_FILE_PATH,
+                                     metrics_file_path: str | None = consts.BUILD_METRICS_FILE_PATH,
+                                     show_progress: bool = False) -> None:
+    """Builds the persistence store from the meetings data.
+
+    By default the vector DB collection is recreated. With `resume` the existing collection is kept and
+    only meetings whose summaries are not yet persisted are summarized and written.
+    Build metrics are written to `metrics_file_path` after every meeting, as JSON when it is a .json file
+    and in the Prometheus text format otherwise.
+    """
+    METRICS.reset()
+    progress = BuildProgress(len(meetings), show=show_progress)
     try:
         vector_db_tool.connect()
         with SqlQueryManager() as query_manager:
-            init_meetings_persistence_store(query_manager)
+            init_meetings_persistence_store(query_manager, drop_existing=not resume)
             insert_meetings(meetings, query_manager)
             insert_meeting_subjects(meetings, query_manager)
-            for meeting in meetings:
-                logger.info(f"Processing meeting {meeting['number']} ...")
-                speakers_summaries = create_meeting_summaries(meeting)
-                summary_data_to_insert = []
-                logger.info(f"{len(speakers_summaries)} summaries created.")
-                for speaker, summary in speakers_summaries:
-                    try:
-                        summary_vector_id = vector_db_tool.insert_meeting_summary(summary)
-                        summary_data_to_insert.append(
-                            (summary_vector_id, summary, meeting["number"], speaker)
-                        )
-                    except MilvusException as ex:
-                        print(f"Failed to insert summary for {speaker} into the vector DB.")
-                insert_meeting_summaries(summary_data_to_insert, query_manager)
+            checkpoint = BuildCheckpoint(state_file_path)
+            if resume:
+                _resume_checkpoint(checkpoint, query_manager)
+            else:
+                checkpoint.reset()
+            summaries_writer = MeetingSummariesWriter(query_manager, spool_file_path, flush_size, flush_meetings,
+                                                      checkpoint, resume)
+            # One pool of summarization workers, each loading the model once, is shared by all meetings.
+            # Summaries of text chunks and levels summarized by previous builds are taken from the summary cache.
+            with (SummarizationWorkerPool(max_workers=consts.SUMMARIZATION_MAX_WORKERS) as worker_pool,
+                  SummaryCache(consts.SUMMARY_CACHE_FILE_PATH) as summary_cache):
+                scheduler = SummarizationScheduler(worker_pool, batch_size=consts.SUMMARIZATION_BATCH_SIZE,
+                                                   summary_cache=summary_cache)
+                # Speakers of upcoming meetings are summarized while completed meetings are written.
+                meetings_to_summarize = _get_meetings_to_summarize(meetings, checkpoint, summaries_writer, progress)
+                for meeting, speakers_summaries in scheduler.run(meetings_to_summarize):
+                    logger.info(f"{len(speakers_summaries)} summaries of meeting {meeting['number']} created.")
+                    summaries_writer.add(meeting["number"], speakers_summaries)
+                    progress.update()
+                    if metrics_file_path is not None:
+                        METRICS.write(metrics_file_path)
+                if scheduler.failed_meeting_numbers:
+                    logger.error(f"Summarization of meetings {scheduler.failed_meeting_numbers} failed, they are not "
+                                 f"persisted and are summarized again when the build is resumed.")
+            summaries_writer.flush()
     finally:
+        progress.close()
+        if metrics_file_path is not None:
+            METRICS.write(metrics_file_path)
         vector_db_tool.disconnect()
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Builds the meetings persistence store.")
+    arg_parser.add_argument("--resume", action="store_true",
+                            help="keep the existing vector DB collection and add only meetings that are not persisted yet")
+    arg_parser.add_argument("--metrics-file", default=consts.BUILD_METRICS_FILE_PATH,
+                            help="file the build metrics are written to, a JSON snapshot for a .json file and "
+                                 "the Prometheus text format otherwise")
+    args = arg_parser.parse_args()
     # Uncomment the following block of code to build the persistence store from the meetings data.
-    from meetings_tools import load_meetings
-    meetings = load_meetings(consts.MEETINGS_DATA_FILE_PATH)
-    build_meetings_persistence_store(meetings)
+    from meetings_store import get_meetings_store
+    # The meetings store streams meetings from disk, so it is never loaded into memory as a whole.
+    build_meetings_persistence_store(get_meetings_store(), resume=args.resume, metrics_file_path=args.metrics_file,
+                                     show_progress=True)
     # Uncomment the following line to load the saved data into the persistence store.
     #load_saved_data()
-
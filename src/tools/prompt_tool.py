@@ -2,6 +2,7 @@ import re
 import os
 import enum
 import json
+import asyncio
 import consts
 import logging
 import instructor
@@ -12,6 +13,7 @@ from ctransformers import AutoModelForCausalLM
 from tools import vector_db_tool
 from tools.openai_tools import get_open_ai_client
 from tools.db_tools import SqlQueryManager, get_meeting_summaries
+from tools.async_db_tools import AsyncSqlQueryManager
 
 
 MISTRAL_MODEL_DOWNLOAD_PATH = os.path.join(consts.ML_MODELS_DOWNLOAD_DIR, "7B-Instruct-v0.3")
@@ -116,7 +118,7 @@ class Query(BaseModel):
                     if dependency_num.isdigit():
                         dependency_num = int(re.sub(r"\D+", "", dependency_num))
                         dependency_results = self.parameters["dependencies_results"][dependency_num]
-                        if isinstance(dependency_results, list):
+                        if isinstance(dependency_results, (list, tuple)):
                             if len(dependency_results) > 0:
                                 query += f" IN ({','.join([str(i[0]) for i in dependency_results])})"
                         else:
@@ -133,12 +135,18 @@ class Query(BaseModel):
         return query
 
     def _execute_query(self, query):
-        with SqlQueryManager() as query_manager:
+        with SqlQueryManager(pooled=True) as query_manager:
             query_manager.execute(query)
             results = query_manager.fetchall()
             return results
 
-    def run(self) -> list[tuple]:
+    async def _execute_query_async(self, query):
+        async with AsyncSqlQueryManager() as query_manager:
+            await query_manager.execute(query)
+            results = await query_manager.fetchall()
+            return results
+
+    def _build_query(self) -> str | None:
         columns = ["*"] if "columns" not in self.parameters else self.parameters.get("columns")
         query = f"SELECT {",".join(columns)} FROM"
         if ((self.query_type == QueryType.MEETING_SEARCH) or
@@ -165,8 +173,18 @@ class Query(BaseModel):
 
             logger.info(f"query: {query}")
 
+            return query
+
+    def run(self) -> list[tuple]:
+        query = self._build_query()
+        if query is not None:
             return self._execute_query(query)
 
+    async def run_async(self) -> list[tuple]:
+        query = self._build_query()
+        if query is not None:
+            return await self._execute_query_async(query)
+
 
 class QueryPlan(BaseModel):
     """Container class representing a tree of queries to run against a database, to answer a user's question"""
@@ -190,6 +208,19 @@ class QueryPlan(BaseModel):
 
         return results
 
+    async def execute_async(self):
+        results = {}
+
+        # Queries depend on the results of the previous ones, so they run one after another, but without
+        # blocking the event loop.
+        for index, query in enumerate(self.query_plan):
+            logger.debug(f"Running query {query.id}: {query.query_type.name}")
+            if query.dependencies:
+                query.parameters["dependencies_results"] = results
+            results[index + 1] = await query.run_async()
+
+        return results
+
 
 class PromptTool(ABC):
     def __init__(self, planning_model="gpt-4-0613", query_planner_prompt=QUERY_PLANNER_PROMPT, prompt_template=PROMPT_TEMPLATE):
@@ -261,6 +292,15 @@ class PromptTool(ABC):
     def _prompt_llm_model(self, prompt_text: str) -> str:
         pass
 
+    def _get_prompt_text(self, question: str, query_plan_results: dict[int, list], plan: QueryPlan) -> str | None:
+        # If any of the subqueries fail to found results, return no results message.
+        if not all([len(v) for v in query_plan_results.values()]):
+            return None
+        #query_plan_results_json = self._query_results_to_json(query_plan_results, plan)
+        #prompt_text = self.prompt_text.format(results_json=query_plan_results_json, question=question)
+        formatted_query_results = self._format_query_results(query_plan_results, plan)
+        return self.prompt_text.format(results=formatted_query_results, question=question)
+
     def generate(self, question: str) -> str:
         try:
             plan = self._get_query_planner(question)
@@ -269,18 +309,35 @@ class PromptTool(ABC):
             return f"No results found for the question: {question}"
         print(plan.model_dump())
         query_plan_results = plan.execute()
-        # If any of the subqueries fail to found results, return no results message.
-        if not all([len(v) for v in query_plan_results.values()]):
+        prompt_text = self._get_prompt_text(question, query_plan_results, plan)
+        if prompt_text is None:
             return f"No results found for the question: {question}"
-        #query_plan_results_json = self._query_results_to_json(query_plan_results, plan)
-        #prompt_text = self.prompt_text.format(results_json=query_plan_results_json, question=question)
-        formatted_query_results = self._format_query_results(query_plan_results, plan)
-        prompt_text = self.prompt_text.format(results=formatted_query_results, question=question)
 
         prompt_result = self._prompt_llm_model(prompt_text)
 
         return prompt_result
 
+    async def generate_async(self, question: str) -> str:
+        """Same as `generate`, for the API, the event loop keeps serving other questions meanwhile.
+
+        The queries run on the async DB connection pool, the LLM clients are blocking, so they are called
+        from worker threads.
+        """
+        try:
+            plan = await asyncio.to_thread(self._get_query_planner, question)
+        except Exception as ex:
+            logger.error(ex)
+            return f"No results found for the question: {question}"
+        logger.debug(f"Query plan: {plan.model_dump()}")
+        query_plan_results = await plan.execute_async()
+        prompt_text = self._get_prompt_text(question, query_plan_results, plan)
+        if prompt_text is None:
+            return f"No results found for the question: {question}"
+
+        prompt_result = await asyncio.to_thread(self._prompt_llm_model, prompt_text)
+
+        return prompt_result
+
 
 class OpenAIPrompt(PromptTool):
     def _prompt_llm_model(self, prompt_text: str) -> str:
@@ -347,7 +404,7 @@ def _get_prompt_text(query: str, vector_db_host_name="localhost") -> str:
     vector_search_results = vector_db_tool.search(query)
     vector_ids = vector_search_results.ids
     vector_db_tool.disconnect()
-    with SqlQueryManager() as query_manager:
+    with SqlQueryManager(pooled=True) as query_manager:
         summaries = get_meeting_summaries(vector_ids, query_manager)
         prompt_text = f"""<s>[INST] Given the following context:
         {''.join(summaries)}
@@ -0,0 +1,124 @@
+import consts
+import logging
+import threading
+from typing import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from tools.summary_cache import SummaryCache
+from tools.build_metrics import METRICS
+from tools.meetings_tools import get_meeting_docs_per_person
+from tools.summarization_tools import (
+    SummarizationTool,
+    SummarizationWorkerPool,
+    HierarchicalSummarizationTool
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _get_job_size(docs_lists: list[list[str]]) -> int:
+    # Characters are a cheap proxy of the token count, jobs are only ordered by it.
+    return sum(len(doc) for docs in docs_lists for doc in docs)
+
+
+class SummarizationScheduler:
+    """Schedules the summarization of the speakers of many meetings on a shared summarization worker pool.
+
+    Meetings are read ahead in a window of `window_meetings` meetings. Newly read meetings are grouped,
+    longest first, into jobs of `job_meetings` meetings and every job summarizes all speakers of its meetings
+    with one hierarchical `run_batch` call, so text chunks of different speakers and meetings share length
+    batches. Up to `max_jobs` jobs run at a time, each in a job thread which submits its text chunks to the
+    worker pool, so the worker pool always has chunks of several meetings queued.
+    Meetings are returned as soon as their job completes, in the order the jobs complete. Meetings with
+    a speaker whose text chunks failed every retry are not returned, so they are neither written nor
+    checkpointed and a resumed build summarizes them again. Their numbers are kept in `failed_meeting_numbers`.
+    """
+
+    def __init__(self,
+                 worker_pool: SummarizationWorkerPool,
+                 batch_size: int = consts.SUMMARIZATION_BATCH_SIZE,
+                 summary_cache: SummaryCache | None = None,
+                 max_jobs: int = consts.SUMMARIZATION_MAX_JOBS,
+                 window_meetings: int = consts.SUMMARIZATION_WINDOW_MEETINGS,
+                 job_meetings: int = consts.SUMMARIZATION_JOB_MEETINGS):
+        self.worker_pool = worker_pool
+        self.batch_size = batch_size
+        self.summary_cache = summary_cache
+        self.max_jobs = max_jobs
+        self.window_meetings = window_meetings
+        self.job_meetings = job_meetings
+        self.summarization_tools = []
+        self.failed_meeting_numbers = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def total_input_tokens_count(self) -> int:
+        with self._lock:
+            return sum(tool.total_input_tokens_count for tool in self.summarization_tools)
+
+    def _get_summarization_tool(self) -> HierarchicalSummarizationTool:
+        # Summarization tools keep per-run state and their tokenizer can't be called from several threads,
+        # so every job thread has its own tool.
+        if not hasattr(self._local, "summarization_tool"):
+            summarization_tool = SummarizationTool(worker_pool=self.worker_pool, batch_size=self.batch_size,
+                                                   summary_cache=self.summary_cache)
+            with self._lock:
+                self.summarization_tools.append(summarization_tool)
+            self._local.summarization_tool = HierarchicalSummarizationTool(summarization_tool)
+        return self._local.summarization_tool
+
+    def _summarize_speakers(self, docs_lists: list[list[str]]) -> tuple[list[str], set[int]]:
+        """Returns the summaries of the docs lists and the indices of the docs lists with failed text chunks."""
+        summarization_tool = self._get_summarization_tool()
+        summaries = summarization_tool.run_batch(docs_lists)
+        return summaries, set(summarization_tool.failed_docs_indices)
+
+    def _get_jobs(self, meetings_docs: list[tuple[dict, dict[str, list[str]]]]) -> list[list[tuple[dict, dict]]]:
+        """Groups the meetings with their docs per speaker into jobs of `job_meetings` meetings, longest first."""
+        meetings_docs = sorted(meetings_docs, key=lambda meeting_docs: _get_job_size(list(meeting_docs[1].values())),
+                               reverse=True)
+        return [meetings_docs[i:i + self.job_meetings] for i in range(0, len(meetings_docs), self.job_meetings)]
+
+    def run(self, meetings: Iterable[dict]) -> Iterator[tuple[dict, list[tuple[str, str]]]]:
+        """Summarizes the speakers of the meetings and yields every meeting with its (speaker, summary) pairs."""
+        meetings_iterator = iter(meetings)
+        running_meetings_count = 0
+        job_futures: dict[Future, list[tuple[dict, dict[str, list[str]]]]] = {}
+        executor = ThreadPoolExecutor(max_workers=self.max_jobs, thread_name_prefix="SummarizationJob")
+        try:
+            while True:
+                new_meetings_docs = []
+                while running_meetings_count + len(new_meetings_docs) < self.window_meetings:
+                    meeting = next(meetings_iterator, None)
+                    if meeting is None:
+                        break
+                    new_meetings_docs.append((meeting, get_meeting_docs_per_person(meeting)))
+                running_meetings_count += len(new_meetings_docs)
+                for job in self._get_jobs(new_meetings_docs):
+                    docs_lists = [docs for _, meeting_docs in job for docs in meeting_docs.values()]
+                    job_futures[executor.submit(self._summarize_speakers, docs_lists)] = job
+                if not job_futures:
+                    break
+                done, _ = wait(job_futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = job_futures.pop(future)
+                    speakers_summaries, failed_indices = future.result()
+                    first_index = 0
+                    for meeting, meeting_docs in job:
+                        running_meetings_count -= 1
+                        speakers = list(meeting_docs)
+                        indices = range(first_index, first_index + len(speakers))
+                        first_index += len(speakers)
+                        failed_speakers = [speaker for i, speaker in zip(indices, speakers) if i in failed_indices]
+                        if failed_speakers:
+                            logger.error(f"Summarization of meeting {meeting['number']} failed for speakers "
+                                         f"{failed_speakers}, the meeting is left to be summarized again.")
+                            METRICS.increment("summarization_failed_meetings_total")
+                            self.failed_meeting_numbers.append(meeting["number"])
+                            continue
+                        summaries = [(speaker, speakers_summaries[i]) for i, speaker in zip(indices, speakers)]
+                        logger.info(f"Summarized {len(summaries)} speakers of meeting {meeting['number']}, "
+                                    f"{len(job_futures)} jobs running or queued.")
+                        yield meeting, summaries
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,44 +1,318 @@
 import os
-import consts
+import json
 import queue
+import consts
+import time
+import weakref
 import logging
+import itertools
+import threading
 import multiprocessing as mp
-from transformers import pipeline
 from transformers import AutoTokenizer
-from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from concurrent.futures import ProcessPoolExecutor, Future, InvalidStateError
+from concurrent.futures.process import BrokenProcessPool
+from tools.summary_cache import SummaryCache
+from tools.build_metrics import METRICS
+from tools.inference_backends import load_summarization_pipeline, export_onnx_models, SEQ2SEQ_TASK
 
 logger = logging.getLogger(__name__)
 
 SUMMARIZATION_PIPELINE = None
+SUMMARIZATION_TOKENIZER = None
+# Model load time of the worker process, reported with the result of its first job.
+WORKER_MODEL_LOAD_SECONDS = None
+# Queue the worker process reports the jobs it starts to, so their timeouts count from the job start.
+WORKER_JOB_STARTS_QUEUE = None
+SENTENCE_END_CHARACTERS = (".", "!", "?")
 
 
-def meeting_summarization_worker(text_chunks_queue, summarized_text_chunks_queue, min_tokens_count=100):
-    logger = logging.getLogger(__name__)
+def init_summarization_worker(summarizer_model_name: str = consts.SUMMARIZER_MODEL_NAME,
+                              tokenizer_model_name: str = consts.TOKENIZER_MODEL_NAME,
+                              loaded_workers_semaphore=None,
+                              inference_backend: str = consts.INFERENCE_BACKEND,
+                              job_starts_queue=None) -> None:
+    """Loads the summarization pipeline when a worker process starts, it is kept for the lifetime of the process."""
+    global SUMMARIZATION_PIPELINE, SUMMARIZATION_TOKENIZER, WORKER_MODEL_LOAD_SECONDS, WORKER_JOB_STARTS_QUEUE
+    WORKER_JOB_STARTS_QUEUE = job_starts_queue
     process_name = mp.current_process().name
-    logger.info(f"{process_name} Running text summarization ...")
-    tokenizer = AutoTokenizer.from_pretrained(consts.TOKENIZER_MODEL_NAME)
-    global SUMMARIZATION_PIPELINE
-    if SUMMARIZATION_PIPELINE is None:
-        SUMMARIZATION_PIPELINE = pipeline("summarization",
-                                          model=consts.SUMMARIZER_MODEL_NAME,
-                                          tokenizer=consts.TOKENIZER_MODEL_NAME)
+    logger.info(f"{process_name} Loading the {summarizer_model_name} summarization model, "
+                f"{inference_backend} backend ...")
+    start_time = time.perf_counter()
+    SUMMARIZATION_TOKENIZER = AutoTokenizer.from_pretrained(tokenizer_model_name)
+    SUMMARIZATION_PIPELINE = load_summarization_pipeline(summarizer_model_name, tokenizer_model_name, inference_backend)
+    WORKER_MODEL_LOAD_SECONDS = time.perf_counter() - start_time
+    if loaded_workers_semaphore is not None:
+        loaded_workers_semaphore.release()
+
+
+def get_summary_length_limits(tokens_count: int, min_tokens_count: int = 100,
+                              length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS) -> tuple[int, int]:
+    """Returns the minimum and the maximum summary length of a text chunk of `tokens_count` tokens.
+
+    The maximum length is the token count rounded down to a multiple of `length_step`, so text chunks of
+    similar lengths share their limits and are summarized in one batch. The limits depend on the text chunk
+    only, never on the other chunks of its batch.
+    """
+    max_length = tokens_count if tokens_count < length_step else tokens_count - tokens_count % length_step
+    return min(min_tokens_count, max_length), max_length
+
+
+def summarize_text_chunk(index: int, text_chunk: str, min_tokens_count: int = 100,
+                         length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS) -> tuple[int, str]:
+    process_name = mp.current_process().name
+    logger.info(f"{process_name} Tokenizing text chunk with index {index} ...")
+    tokens_count = len(SUMMARIZATION_TOKENIZER.tokenize(text_chunk))
+    logger.info(f"{process_name} Summarizing text chunk with index {index}, tokens count: {tokens_count} ...")
+    min_length, max_length = get_summary_length_limits(tokens_count, min_tokens_count, length_step)
+    summarized = SUMMARIZATION_PIPELINE(text_chunk, min_length=min_length, max_length=max_length)
+    logger.debug(f"{process_name} summarized text length: {len(summarized)}.")
+    logger.info(f"Tokenization and summarization completed for text chunk {index}.")
+    return index, summarized[0]["summary_text"]
+
+
+def summarize_text_chunks_batch(text_chunks: list[tuple[Any, str, int]], min_tokens_count: int = 100,
+                                length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS) -> list[tuple[Any, str]]:
+    """Summarizes text chunks with batched pipeline calls, one call per group of chunks with the same length limits.
+
+    Every chunk gets the length limits it would get when summarized alone, see `get_summary_length_limits`.
+    """
+    process_name = mp.current_process().name
+    limits_batches = {}
+    for text_chunk in text_chunks:
+        limits = get_summary_length_limits(text_chunk[2], min_tokens_count, length_step)
+        limits_batches.setdefault(limits, []).append(text_chunk)
+    summaries = {}
+    for (min_length, max_length), batch in limits_batches.items():
+        logger.info(f"{process_name} Summarizing {len(batch)} text chunks, "
+                    f"tokens counts: {[tokens_count for _, _, tokens_count in batch]} ...")
+        summarized = SUMMARIZATION_PIPELINE([text_chunk for _, text_chunk, _ in batch], batch_size=len(batch),
+                                            min_length=min_length, max_length=max_length)
+        summaries.update((key, summary["summary_text"]) for (key, _, _), summary in zip(batch, summarized))
+    logger.info(f"{process_name} Summarization completed for {len(text_chunks)} text chunks.")
+    return [(key, summaries[key]) for key, _, _ in text_chunks]
+
+
+def _get_length_batches(text_chunks: list[tuple[Any, str, int]], batch_size: int, min_tokens_count: int = 100,
+                        length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS) -> list[list[tuple[Any, str, int]]]:
+    """Groups text chunks with the same summary length limits into batches of at most `batch_size` chunks,
+    longest chunks first. Chunks without other chunks of the same limits get a batch of their own."""
+    batches = []
+    batch_limits = None
+    for text_chunk in sorted(text_chunks, key=lambda text_chunk: text_chunk[2], reverse=True):
+        limits = get_summary_length_limits(text_chunk[2], min_tokens_count, length_step)
+        if not batches or limits != batch_limits or len(batches[-1]) == batch_size:
+            batches.append([])
+            batch_limits = limits
+        batches[-1].append(text_chunk)
+    return batches
+
+
+def _get_worker_pid() -> int:
+    return os.getpid()
+
+
+def _run_worker_job(job_id: int, function, *args) -> tuple[dict, Any]:
+    """Runs a job in a worker process and returns the stats of the job, reported to the build metrics, with its result."""
+    global WORKER_MODEL_LOAD_SECONDS
+    if WORKER_JOB_STARTS_QUEUE is not None:
+        WORKER_JOB_STARTS_QUEUE.put((job_id, os.getpid()))
+    start_time = time.perf_counter()
+    result = function(*args)
+    stats = {"worker": mp.current_process().name, "seconds": time.perf_counter() - start_time}
+    if WORKER_MODEL_LOAD_SECONDS is not None:
+        stats["model_load_seconds"] = WORKER_MODEL_LOAD_SECONDS
+        WORKER_MODEL_LOAD_SECONDS = None
+    return stats, result
+
+
+class SummarizationJobTimeoutException(Exception):
+    pass
+
+
+def _set_future_result(future: Future, result: Any = None, exception: BaseException | None = None) -> None:
+    # A job future may already have been failed by the timeout watchdog.
     try:
-        while not text_chunks_queue.empty():
-            index, text_chunk = text_chunks_queue.get(block=False, timeout=1)
-            logger.info(f"{process_name} Tokenizing text chunk with index {index} ...")
-            tokens_count = len(tokenizer.tokenize(text_chunk))
-            logger.info(f"{process_name} Summarizing text chunk with index {index}, tokens count: {tokens_count} ...")
-            summarized = SUMMARIZATION_PIPELINE(text_chunk,
-                                                min_length=min(min_tokens_count, tokens_count),
-                                                max_length=tokens_count)
-            logger.debug(f"{process_name} summarized text length: {len(summarized)}.")
-            summarized_text_chunks_queue.put((index, summarized[0]["summary_text"]), block=False, timeout=1)
-            logger.info(f"Tokenization and summarization completed for text chunk {index}.")
-            text_chunks_queue.task_done()
-    except queue.Empty:
-        logger.error(f"{process_name} Summarization worker - queue empty error")
-    except Exception as ex:
-        logger.error(f"{process_name} Summarization worker - {ex}")
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+class SummarizationWorkerPool:
+    """Long-lived pool of summarization worker processes.
+
+    Each worker loads the summarization model once, when the worker process starts, and keeps it for
+    all the text chunks it summarizes, so one pool can be shared by all speakers of all meetings.
+
+    Every job gets its own future, which always completes: with the job result, with the exception raised
+    by the job, or with `SummarizationJobTimeoutException` when the job runs longer than `job_timeout_seconds`
+    since a worker started it. The worker process of a timed out job is terminated, which breaks the process
+    pool, so the workers are replaced by new ones and the other jobs of the broken pool are submitted again.
+    Jobs of workers which crashed on their own fail with `BrokenProcessPool` and can be submitted again.
+    """
+
+    def __init__(self,
+                 max_workers: int = os.cpu_count(),
+                 summarizer_model_name: str = consts.SUMMARIZER_MODEL_NAME,
+                 tokenizer_model_name: str = consts.TOKENIZER_MODEL_NAME,
+                 inference_backend: str = consts.INFERENCE_BACKEND,
+                 job_timeout_seconds: float | None = consts.SUMMARIZATION_JOB_TIMEOUT_SECONDS):
+        self.max_workers = max_workers
+        self.summarizer_model_name = summarizer_model_name
+        self.inference_backend = inference_backend
+        self.job_timeout_seconds = job_timeout_seconds
+        # The model is exported once, before the workers start, so the workers only load it.
+        export_onnx_models(summarizer_model_name, SEQ2SEQ_TASK, inference_backend)
+        self._mp_context = mp.get_context("spawn")
+        self._loaded_workers_semaphore = self._mp_context.Semaphore(0)
+        self._job_starts_queue = self._mp_context.Queue()
+        self._initargs = (summarizer_model_name, tokenizer_model_name, self._loaded_workers_semaphore, inference_backend,
+                          self._job_starts_queue)
+        self._executor_lock = threading.Lock()
+        self._job_ids = itertools.count()
+        # Job id -> job future, the executor of the job, the worker process id and the job start time.
+        self._jobs: dict[int, list] = {}
+        # Executors broken by the watchdog terminating a worker process.
+        self._terminated_executors = weakref.WeakSet()
+        # Jobs stopped together with a timed out job, the watchdog submits them again.
+        self._stopped_jobs: list = []
+        self.executor = self._create_executor()
+        self._watchdog_stopped = threading.Event()
+        self._watchdog = None
+        if job_timeout_seconds is not None:
+            self._watchdog = threading.Thread(target=self._watch_jobs, name="SummarizationWatchdog", daemon=True)
+            self._watchdog.start()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=self._mp_context,
+                                   initializer=init_summarization_worker,
+                                   initargs=self._initargs)
+
+    def _restart_executor(self) -> None:
+        """Replaces the worker processes, it is called with the executor lock held."""
+        logger.warning("Restarting the summarization workers ...")
+        METRICS.increment("summarization_worker_restarts_total")
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.executor = self._create_executor()
+
+    def _watch_jobs(self) -> None:
+        # Jobs are sent to the workers ahead of time, so the timeout counts from the start reported by the worker.
+        check_interval_seconds = min(1.0, self.job_timeout_seconds / 4)
+        while not self._watchdog_stopped.wait(check_interval_seconds):
+            timed_out_jobs = []
+            hung_processes = []
+            with self._executor_lock:
+                stopped_jobs, self._stopped_jobs = self._stopped_jobs, []
+            # They are submitted here, the process pool fails their futures with its own lock held.
+            for submit_worker_job in stopped_jobs:
+                submit_worker_job()
+            now = time.monotonic()
+            with self._executor_lock:
+                while True:
+                    try:
+                        job_id, pid = self._job_starts_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job_id in self._jobs:
+                        self._jobs[job_id][2:] = [pid, now]
+                for job_id, job in list(self._jobs.items()):
+                    if job[3] is not None and now - job[3] > self.job_timeout_seconds:
+                        timed_out_jobs.append(self._jobs.pop(job_id))
+                for _, executor, pid, _ in timed_out_jobs:
+                    # A busy worker process can't be stopped through the executor, so it is terminated.
+                    process = (getattr(executor, "_processes", None) or {}).get(pid)
+                    if process is not None:
+                        self._terminated_executors.add(executor)
+                        hung_processes.append(process)
+            for future, _, pid, _ in timed_out_jobs:
+                logger.warning(f"Summarization job of worker process {pid} did not complete within "
+                               f"{self.job_timeout_seconds} seconds, terminating the worker process ...")
+                METRICS.increment("summarization_timed_out_jobs_total")
+                _set_future_result(future, exception=SummarizationJobTimeoutException(
+                    f"Summarization job did not complete within {self.job_timeout_seconds} seconds."))
+            for process in hung_processes:
+                process.terminate()
+
+    def start(self) -> None:
+        """Starts all worker processes and waits until each of them has loaded the model.
+
+        Without calling it, worker processes are started on demand when text chunks are submitted.
+        """
+        # Every job submitted while no worker is idle starts a new worker process.
+        for _ in range(self.max_workers):
+            self.executor.submit(_get_worker_pid)
+        for _ in range(self.max_workers):
+            self._loaded_workers_semaphore.acquire()
+        logger.info(f"{self.max_workers} summarization workers started.")
+
+    def _submit(self, chunks_count: int, function, *args) -> Future:
+        """Submits a job to the workers and returns a future of its result, the job stats go to the build metrics."""
+        future = Future()
+        job_id = next(self._job_ids)
+        METRICS.add_to_gauge("summarization_queued_jobs", 1)
+
+        def submit_worker_job() -> None:
+            with self._executor_lock:
+                try:
+                    worker_future = self.executor.submit(_run_worker_job, job_id, function, *args)
+                except BrokenProcessPool:
+                    # A worker process died, e.g. it ran out of memory, so the workers are replaced.
+                    self._restart_executor()
+                    worker_future = self.executor.submit(_run_worker_job, job_id, function, *args)
+                self._jobs[job_id] = [future, self.executor, None, None]
+            worker_future.add_done_callback(on_worker_job_done)
+
+        def on_worker_job_done(worker_future: Future) -> None:
+            with self._executor_lock:
+                job = self._jobs.pop(job_id, None)
+                # The job is not at fault when the workers were stopped because of a timed out job of another worker.
+                stopped = job is not None and job[1] in self._terminated_executors and (
+                    worker_future.cancelled() or isinstance(worker_future.exception(), BrokenProcessPool))
+                if stopped:
+                    self._stopped_jobs.append(submit_worker_job)
+            if stopped:
+                logger.info(f"Summarization job {job_id} was stopped with the workers, submitting it again ...")
+                return
+            METRICS.add_to_gauge("summarization_queued_jobs", -1)
+            if worker_future.cancelled():
+                future.cancel()
+            elif worker_future.exception() is not None:
+                METRICS.increment("summarization_failed_jobs_total")
+                _set_future_result(future, exception=worker_future.exception())
+            else:
+                stats, result = worker_future.result()
+                labels = {"worker": stats["worker"]}
+                METRICS.increment("summarization_chunks_total", chunks_count, labels)
+                METRICS.observe("summarization_job_seconds", stats["seconds"], labels)
+                if "model_load_seconds" in stats:
+                    METRICS.set_gauge("summarization_model_load_seconds", stats["model_load_seconds"], labels)
+                _set_future_result(future, result)
+
+        submit_worker_job()
+        return future
+
+    def submit(self, index: int, text_chunk: str, min_tokens_count: int = 100,
+               length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS) -> Future:
+        return self._submit(1, summarize_text_chunk, index, text_chunk, min_tokens_count, length_step)
+
+    def submit_batch(self, text_chunks: list[tuple[Any, str, int]], min_tokens_count: int = 100,
+                     length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS) -> Future:
+        return self._submit(len(text_chunks), summarize_text_chunks_batch, text_chunks, min_tokens_count,
+                            length_step)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._watchdog_stopped.set()
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.shutdown(wait=type is None)
 
 
 class SummarizationTool:
@@ -46,59 +320,274 @@ class SummarizationTool:
     def __init__(self,
                  tokenizer_model_name: str = consts.TOKENIZER_MODEL_NAME,
                  # Maximum input length reduced to 1023 because of the issues with index out of range when
-                 # running text summarization pipeline.
+                 # running text summarization pipeline. It includes the special tokens the tokenizer adds.
                  max_input_length: int = 1023,
-                 max_parallel_processes: int = os.cpu_count()):
+                 max_parallel_processes: int = os.cpu_count(),
+                 worker_pool: SummarizationWorkerPool | None = None,
+                 batch_size: int = 1,
+                 min_tokens_count: int = 100,
+                 summary_cache: SummaryCache | None = None,
+                 max_retries: int = consts.SUMMARIZATION_MAX_RETRIES,
+                 length_step: int = consts.SUMMARIZATION_LENGTH_STEP_TOKENS):
         self.max_input_length = max_input_length
         self.max_parallel_processes = max_parallel_processes
+        self.worker_pool = worker_pool
+        # Summaries are cached by the model and the backend of the workers, a pool started for a single call
+        # uses the default ones.
+        self.summarizer_model_name = (worker_pool.summarizer_model_name if worker_pool is not None
+                                      else consts.SUMMARIZER_MODEL_NAME)
+        self.inference_backend = worker_pool.inference_backend if worker_pool is not None else consts.INFERENCE_BACKEND
+        self.batch_size = batch_size
+        self.min_tokens_count = min_tokens_count
+        self.summary_cache = summary_cache
+        self.max_retries = max_retries
+        self.length_step = length_step
         self.total_input_tokens_count = 0
+        self.cached_chunks_count = 0
+        self.failed_docs_indices = set()
+        self.failed_chunk_errors = {}
         self.tokenizer = AutoTokenizer.from_pretrained(tokenizer_model_name)
+        # Text chunks are packed by their content tokens, the BOS and EOS tokens are added to every chunk.
+        self.max_chunk_tokens_count = max_input_length - self.tokenizer.num_special_tokens_to_add()
 
-    def _get_text_chunks(self, docs: list[str]):
-        text_lines = []
+    def _split_tokens(self, tokens: list[str]) -> list[tuple[str, int]]:
+        """Splits the tokens of a doc longer than the maximum input length into parts which fit into it,
+        ending the parts at sentence ends where possible."""
+        parts = []
+        start = 0
+        while start < len(tokens):
+            end = min(start + self.max_chunk_tokens_count, len(tokens))
+            if end < len(tokens):
+                end = next((i + 1 for i in range(end - 1, start, -1) if tokens[i].endswith(SENTENCE_END_CHARACTERS)),
+                           end)
+            parts.append((self.tokenizer.convert_tokens_to_string(tokens[start:end]).strip(), end - start))
+            start = end
+        return parts
+
+    def _get_text_chunks(self, docs: list[str]) -> tuple[int, list[tuple[int, str]]]:
+        total_tokens_count, text_chunks = self._pack_text_chunks(docs)
+        return total_tokens_count, [(index, text_chunk) for index, text_chunk, _ in text_chunks]
+
+    def _pack_text_chunks(self, docs: list[str]) -> tuple[int, list[tuple[int, str, int]]]:
+        """Packs the docs into text chunks of at most `max_input_length` tokens, including the special tokens,
+        and returns the index, the text and the token count of every chunk.
+
+        Every doc is tokenized once and chunk sizes are tracked incrementally. Docs are tokenized with
+        a leading space, the way they are tokenized inside a chunk, so token counts of the docs add up
+        to the token count of the chunk.
+        """
         text_chunks = []
+        chunk_docs = []
+        chunk_tokens_count = 0
         total_tokens_count = 0
-        for index, doc in enumerate(docs):
+        for doc in docs:
             temp_doc = doc if doc.endswith(".") else f"{doc}."
-            entire_text = "".join(text_lines)
-            tokens_count = len(self.tokenizer.tokenize(entire_text + temp_doc))
-            if tokens_count >= self.max_input_length:
-                text_chunks.append((index, entire_text))
-                text_lines.clear()
-            total_tokens_count += tokens_count
-            text_lines.append(temp_doc)
-        text_chunks.append((len(text_chunks) + 1, "".join(text_lines)))
+            tokens = self.tokenizer.tokenize(f" {temp_doc}")
+            total_tokens_count += len(tokens)
+            parts = ([(temp_doc, len(tokens))] if len(tokens) <= self.max_chunk_tokens_count
+                     else self._split_tokens(tokens))
+            for part, part_tokens_count in parts:
+                if chunk_docs and chunk_tokens_count + part_tokens_count > self.max_chunk_tokens_count:
+                    text_chunks.append((len(text_chunks), " ".join(chunk_docs), chunk_tokens_count))
+                    chunk_docs = []
+                    chunk_tokens_count = 0
+                chunk_docs.append(part)
+                chunk_tokens_count += part_tokens_count
+        if chunk_docs:
+            text_chunks.append((len(text_chunks), " ".join(chunk_docs), chunk_tokens_count))
         return total_tokens_count, text_chunks
 
-    def run(self, docs: list[str]):
+    def _submit_job(self, worker_pool: SummarizationWorkerPool, text_chunks: list[tuple[Any, str, int]]) -> Future:
+        if self.batch_size > 1:
+            return worker_pool.submit_batch(text_chunks, self.min_tokens_count, self.length_step)
+        key, text_chunk, _ = text_chunks[0]
+        return worker_pool.submit(key, text_chunk, self.min_tokens_count, self.length_step)
+
+    def _summarize(self, worker_pool: SummarizationWorkerPool,
+                   text_chunks: list[tuple[Any, str, int]]) -> dict[Any, str]:
+        """Summarizes the text chunks and returns the summaries by the chunk keys, failed chunks are left out.
+
+        Text chunks of failed jobs are submitted again, one chunk per job, up to `max_retries` times, so a chunk
+        which can't be summarized fails alone. Errors of the chunks which failed every attempt are kept in
+        `failed_chunk_errors`.
+        """
+        if self.batch_size > 1:
+            jobs = _get_length_batches(text_chunks, self.batch_size, self.min_tokens_count, self.length_step)
+        else:
+            jobs = [[text_chunk] for text_chunk in text_chunks]
+        summaries = {}
+        for attempt in range(self.max_retries + 1):
+            failed_jobs = []
+            for job, future in [(job, self._submit_job(worker_pool, job)) for job in jobs]:
+                try:
+                    result = future.result()
+                    summaries.update(result if self.batch_size > 1 else [result])
+                except Exception as ex:
+                    logger.warning(f"Summarization of text chunks {[key for key, _, _ in job]} failed, "
+                                   f"attempt {attempt + 1} of {self.max_retries + 1} - {ex!r}")
+                    failed_jobs.append((job, ex))
+            jobs = [[text_chunk] for job, _ in failed_jobs for text_chunk in job]
+            if not jobs:
+                break
+        for job, ex in failed_jobs:
+            for key, _, _ in job:
+                logger.error(f"Summarization of text chunk {key} failed - {ex!r}")
+                METRICS.increment("summarization_failed_chunks_total")
+                self.failed_chunk_errors[key] = repr(ex)
+                self.failed_docs_indices.add(key[0])
+        return summaries
+
+    def _get_generation_params(self) -> dict:
+        # Batches are padded to their longest chunk, so the batch size is kept in the parameters as well.
+        return {"min_tokens_count": self.min_tokens_count, "length_step": self.length_step,
+                "batch_size": self.batch_size, "inference_backend": self.inference_backend}
+
+    def _load_cached_summaries(self, text_chunks: list[tuple[Any, str, int]]) -> tuple[dict[Any, str], dict[Any, str]]:
+        """Returns the cached summaries and the summary cache keys of the text chunks, by the chunk keys."""
+        if self.summary_cache is None:
+            return {}, {}
+        generation_params = self._get_generation_params()
+        cache_keys = {key: self.summary_cache.get_key(self.summarizer_model_name, generation_params, text_chunk)
+                      for key, text_chunk, _ in text_chunks}
+        cached_summaries = self.summary_cache.load_many(list(cache_keys.values()))
+        summaries = {key: cached_summaries[cache_key] for key, cache_key in cache_keys.items()
+                     if cache_key in cached_summaries}
+        self.cached_chunks_count += len(summaries)
+        METRICS.increment("summarization_cached_chunks_total", len(summaries))
+        logger.info(f"{len(summaries)} of {len(text_chunks)} text chunk summaries found in the summary cache.")
+        return summaries, cache_keys
+
+    def run_batch(self, docs_lists: list[list[str]]) -> list[list[str]]:
+        """Summarizes several lists of docs, e.g. the docs of all speakers of a meeting, at once.
+
+        Text chunks of all lists are summarized together, in batches of chunks with similar token counts
+        when `batch_size` is greater than 1. Returns the chunk summaries of every list of docs, in order.
+        Indices of the lists with failed text chunks are kept in `failed_docs_indices` and the errors of the
+        failed text chunks in `failed_chunk_errors`, by the (list index, chunk index) keys.
+        """
         process_name = mp.current_process().name
-        with mp.Manager() as manager:
-            text_chunks_queue = manager.Queue()
-            summarized_text_chunks_queue = manager.Queue()
-            log_messages_queue = manager.Queue()
-            total_tokens_count, text_chunks = self._get_text_chunks(docs)
+        self.failed_docs_indices = set()
+        self.failed_chunk_errors = {}
+        text_chunks = []
+        chunks_counts = []
+        for docs_index, docs in enumerate(docs_lists):
+            total_tokens_count, docs_text_chunks = self._pack_text_chunks(docs)
             self.total_input_tokens_count += total_tokens_count
-            _ = [text_chunks_queue.put(t) for t in text_chunks]
-            logger.info(f"{process_name} Text chunks queue size: {text_chunks_queue.qsize()}")
-            for index, text_chunk in text_chunks:
-                logger.debug(f"{process_name} Text chunk {index}: {text_chunk}")
-            with ProcessPoolExecutor(max_workers=min(text_chunks_queue.qsize(),
-                                                     self.max_parallel_processes),
-                                     mp_context=mp.get_context("spawn")) as executor:
-                executor.map(meeting_summarization_worker,
-                             [text_chunks_queue]*self.max_parallel_processes,
-                             [summarized_text_chunks_queue]*self.max_parallel_processes)
-            text_chunks_queue.join()
-
-            ordered_summaries = []
-            logger.info(f"{process_name} Summarized text chunks count: {summarized_text_chunks_queue.qsize()}")
-            while not summarized_text_chunks_queue.empty():
-                index, summary = summarized_text_chunks_queue.get()
-                ordered_summaries.append((index, summary))
-            ordered_summaries = sorted(ordered_summaries)
-            ordered_summaries = [s[1] for s in ordered_summaries]\
-
-            while not log_messages_queue.empty():
-                logger.info(log_messages_queue.get())
-
-            return ordered_summaries
+            METRICS.increment("summarization_input_tokens_total", total_tokens_count)
+            text_chunks.extend(((docs_index, index), text_chunk, tokens_count)
+                               for index, text_chunk, tokens_count in docs_text_chunks)
+            chunks_counts.append(len(docs_text_chunks))
+        logger.info(f"{process_name} Text chunks count: {len(text_chunks)}")
+        for key, text_chunk, _ in text_chunks:
+            logger.debug(f"{process_name} Text chunk {key}: {text_chunk}")
+        if len(text_chunks) == 0:
+            return [[] for _ in docs_lists]
+        summaries, cache_keys = self._load_cached_summaries(text_chunks)
+        missing_text_chunks = [text_chunk for text_chunk in text_chunks if text_chunk[0] not in summaries]
+        if len(missing_text_chunks) > 0:
+            if self.worker_pool is not None:
+                missing_summaries = self._summarize(self.worker_pool, missing_text_chunks)
+            else:
+                # Without a shared worker pool, a pool is started for this call only.
+                with SummarizationWorkerPool(max_workers=min(len(missing_text_chunks),
+                                                             self.max_parallel_processes)) as worker_pool:
+                    missing_summaries = self._summarize(worker_pool, missing_text_chunks)
+            summaries.update(missing_summaries)
+            METRICS.increment("summarization_output_tokens_total",
+                              sum(len(self.tokenizer.tokenize(summary)) for summary in missing_summaries.values()))
+            if self.summary_cache is not None:
+                self.summary_cache.store_many({cache_keys[key]: summary for key, summary in missing_summaries.items()})
+
+        return [[summaries[(docs_index, index)] for index in range(chunks_count) if (docs_index, index) in summaries]
+                for docs_index, chunks_count in enumerate(chunks_counts)]
+
+    def run(self, docs: list[str]) -> list[str]:
+        return self.run_batch([docs])[0]
+
+
+class HierarchicalSummarizationTool:
+    """Map-reduce summarizer built on `SummarizationTool`.
+
+    The docs are summarized chunk by chunk (map), then the chunk summaries are summarized again (reduce),
+    level by level, until they fit into `target_tokens_count` tokens or `max_levels` levels are done.
+    Each level summarizes the docs of all lists at once, so the worker pool is shared by all of them.
+    The summaries of every level are kept in the summary cache of the summarization tool as well, so
+    only the docs that changed since a previous run are summarized again.
+    """
+
+    def __init__(self,
+                 summarization_tool: SummarizationTool,
+                 target_tokens_count: int = consts.SUMMARY_TARGET_TOKENS_COUNT,
+                 max_levels: int = consts.SUMMARY_MAX_LEVELS):
+        self.summarization_tool = summarization_tool
+        self.target_tokens_count = target_tokens_count
+        self.max_levels = max_levels
+        self.failed_docs_indices = set()
+
+    def _get_tokens_count(self, summaries: list[str]) -> int:
+        return len(self.summarization_tool.tokenizer.tokenize(" ".join(summaries)))
+
+    def _get_level_cache_keys(self, docs_lists: list[list[str]]) -> list[str]:
+        summary_cache = self.summarization_tool.summary_cache
+        # Docs are packed into text chunks by the maximum input length, so it is a part of the level settings.
+        generation_params = {**self.summarization_tool._get_generation_params(),
+                             "max_input_length": self.summarization_tool.max_input_length,
+                             "summary_level": True}
+        return [summary_cache.get_key(self.summarization_tool.summarizer_model_name, generation_params,
+                                      json.dumps(docs))
+                for docs in docs_lists]
+
+    def _summarize_level(self, docs_lists: list[list[str]]) -> tuple[list[list[str]], set[int]]:
+        """Summarizes one level of the docs lists, taking the summaries of unchanged docs from the summary cache.
+
+        Returns the summaries of every docs list and the indices of the docs lists with failed text chunks.
+        """
+        summary_cache = self.summarization_tool.summary_cache
+        if summary_cache is None:
+            summaries_lists = self.summarization_tool.run_batch(docs_lists)
+            return summaries_lists, set(self.summarization_tool.failed_docs_indices)
+        keys = self._get_level_cache_keys(docs_lists)
+        cached_summaries = summary_cache.load_many(keys)
+        summaries_lists = [json.loads(cached_summaries[key]) if key in cached_summaries else None for key in keys]
+        missing_indices = [i for i, summaries in enumerate(summaries_lists) if summaries is None]
+        failed_indices = set()
+        if missing_indices:
+            missing_summaries_lists = self.summarization_tool.run_batch([docs_lists[i] for i in missing_indices])
+            failed_indices = {missing_indices[i] for i in self.summarization_tool.failed_docs_indices}
+            for i, summaries in zip(missing_indices, missing_summaries_lists):
+                summaries_lists[i] = summaries
+            # Summaries with failed text chunks are incomplete, so they are not cached.
+            summary_cache.store_many({keys[i]: json.dumps(summaries_lists[i]) for i in missing_indices
+                                      if i not in failed_indices})
+        return summaries_lists, failed_indices
+
+    def run_batch(self, docs_lists: list[list[str]]) -> list[str]:
+        """Summarizes every list of docs into a single summary and returns the summaries in order.
+
+        Indices of the lists with text chunks that failed at any level are kept in `failed_docs_indices`,
+        the summaries of these lists are incomplete and they are not reduced any further.
+        """
+        self.failed_docs_indices = set()
+        final_summaries = [""] * len(docs_lists)
+        pending = {i: docs for i, docs in enumerate(docs_lists) if docs}
+        tokens_counts = {i: None for i in pending}
+        for level in range(self.max_levels):
+            if not pending:
+                break
+            indices = list(pending.keys())
+            summaries_lists, failed_indices = self._summarize_level([pending[i] for i in indices])
+            self.failed_docs_indices.update(indices[i] for i in failed_indices)
+            pending = {}
+            for i, summaries in zip(indices, summaries_lists):
+                tokens_count = self._get_tokens_count(summaries)
+                logger.debug(f"Summarization level {level}: {len(summaries)} summaries, {tokens_count} tokens.")
+                final_summaries[i] = " ".join(summaries)
+                # A level that does not shrink the summaries any more ends the reduction.
+                if (i not in self.failed_docs_indices and tokens_count > self.target_tokens_count and summaries and
+                        (tokens_counts[i] is None or tokens_count < tokens_counts[i])):
+                    pending[i] = summaries
+                    tokens_counts[i] = tokens_count
+        return final_summaries
+
+    def run(self, docs: list[str]) -> str:
+        return self.run_batch([docs])[0]
@@ -0,0 +1,94 @@
+import json
+import time
+import consts
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Keeps the number of SQL variables of a query below the SQLite limit.
+QUERY_KEYS_BATCH_SIZE = 500
+
+
+class SummaryCache:
+    """Persistent content-addressed cache of text chunk summaries, stored in a SQLite database.
+
+    Entries are keyed by the SHA-256 hash of the summarizer model name, the generation parameters and the
+    text chunk, so the summary of a text chunk is reused as long as none of them changes. When the total
+    size of the cached summaries exceeds `max_size_bytes`, the least recently used entries are evicted.
+    """
+
+    def __init__(self,
+                 file_path: str = consts.SUMMARY_CACHE_FILE_PATH,
+                 max_size_bytes: int = consts.SUMMARY_CACHE_MAX_SIZE_BYTES):
+        self.file_path = file_path
+        self.max_size_bytes = max_size_bytes
+        self._lock = threading.Lock()
+        self.connection = sqlite3.connect(file_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS summaries_last_access ON summaries (last_access)")
+        self.connection.commit()
+
+    @staticmethod
+    def get_key(model_name: str, generation_params: dict, text_chunk: str) -> str:
+        key_data = json.dumps([model_name, generation_params, text_chunk], sort_keys=True)
+        return hashlib.sha256(key_data.encode("utf8")).hexdigest()
+
+    def load_many(self, keys: list[str]) -> dict[str, str]:
+        """Returns the cached summaries of the given keys, keys without a cached summary are left out."""
+        summaries = {}
+        with self._lock:
+            for i in range(0, len(keys), QUERY_KEYS_BATCH_SIZE):
+                batch_keys = keys[i:i + QUERY_KEYS_BATCH_SIZE]
+                placeholders = ", ".join("?" * len(batch_keys))
+                rows = self.connection.execute(f"SELECT key, summary FROM summaries WHERE key IN ({placeholders})",
+                                               batch_keys).fetchall()
+                summaries.update(rows)
+                self.connection.execute(f"UPDATE summaries SET last_access = ? WHERE key IN ({placeholders})",
+                                        [time.time(), *batch_keys])
+            self.connection.commit()
+        return summaries
+
+    def store_many(self, summaries: dict[str, str]) -> None:
+        now = time.time()
+        with self._lock:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO summaries (key, summary, size, last_access) VALUES (?, ?, ?, ?)",
+                [(key, summary, len(key) + len(summary.encode("utf8")), now) for key, summary in summaries.items()])
+            self._evict()
+            self.connection.commit()
+
+    def get_size(self) -> int:
+        with self._lock:
+            return self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+
+    def _evict(self) -> None:
+        total_size = self.connection.execute("SELECT COALESCE(SUM(size), 0) FROM summaries").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+        evicted_keys = []
+        for key, size in self.connection.execute("SELECT key, size FROM summaries ORDER BY last_access, key"):
+            if total_size <= self.max_size_bytes:
+                break
+            evicted_keys.append((key,))
+            total_size -= size
+        self.connection.executemany("DELETE FROM summaries WHERE key = ?", evicted_keys)
+        logger.info(f"Evicted {len(evicted_keys)} summaries from the summary cache.")
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, traceback):
+        self.close()
@@ -1,6 +1,9 @@
+import os
 import json
+import torch
 import consts
 import logging
+import threading
 from pymilvus import (
     connections,
     utility,
@@ -13,11 +16,20 @@ from pymilvus import (
     SearchFuture
 )
 from tools.config import MilvusConfig
-from transformers import AutoTokenizer, AutoModel
+from tools.build_metrics import METRICS
+from tools.embeddings_snapshot import EmbeddingsSnapshotWriter, iter_embeddings_snapshot
+from tools.inference_backends import load_embedding_model
+from transformers import AutoTokenizer, AutoConfig
 
 
 logger = logging.getLogger(__file__)
 MILVUS_CONFIG = MilvusConfig()
+EMBEDDING_SERVICE = None
+EMBEDDING_SERVICE_LOCK = threading.Lock()
+
+
+class EmbeddingDimensionMismatchException(Exception):
+    pass
 
 
 def connect() -> None:
@@ -57,6 +69,17 @@ def get_meetings_index():
     return field_name, index
 
 
+def get_embedding_dim(embedding_model_name: str = consts.EMBEDDING_MODEL_NAME) -> int:
+    if embedding_model_name in consts.EMBEDDING_MODEL_DIMS:
+        return consts.EMBEDDING_MODEL_DIMS[embedding_model_name]
+    return AutoConfig.from_pretrained(embedding_model_name).hidden_size
+
+
+def get_collection_embedding_dim(collection: Collection) -> int:
+    embedding_field = next(f for f in collection.schema.fields if f.dtype == DataType.FLOAT_VECTOR)
+    return int(embedding_field.params["dim"])
+
+
 def drop_collection(name: str) -> None:
     if utility.has_collection(name):
         utility.drop_collection(name)
@@ -76,51 +99,173 @@ def _get_tokenizer(tokenizer_model=consts.TOKENIZER_MODEL_NAME) -> object:
 
 
 def _get_text_embedding_model(embedding_model_name=consts.EMBEDDING_MODEL_NAME) -> object:
-    model = AutoModel.from_pretrained(embedding_model_name)
+    model = load_embedding_model(embedding_model_name, consts.INFERENCE_BACKEND)
     return model
 
 
-def _embedding_text(text: list[str], tokenizer, embedding_model) -> list[float]:
-    batch = tokenizer(text, max_length=512, padding=True, truncation=True, return_tensors="pt")
+def _get_length_buckets(lengths: list[int], batch_size: int, max_batch_tokens: int) -> list[list[int]]:
+    """Groups the indices of texts with similar lengths into batches of at most `batch_size` texts
+    whose padded size, the number of texts times the longest text length, fits into `max_batch_tokens`.
+    A text longer than `max_batch_tokens` gets a batch of its own."""
+    batches = []
+    batch = []
+    # The longest texts come first, so the first text of a batch sets its padded length.
+    for index in sorted(range(len(lengths)), key=lambda i: lengths[i], reverse=True):
+        if batch and (len(batch) == batch_size or (len(batch) + 1) * lengths[batch[0]] > max_batch_tokens):
+            batches.append(batch)
+            batch = []
+        batch.append(index)
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+
+def _get_batch_embeddings(batch: dict, embedding_model) -> torch.Tensor:
     outputs = embedding_model(**batch)
     last_hidden = outputs.last_hidden_state.masked_fill(~batch["attention_mask"][..., None].bool(), 0.0)
-    torch_embeddings_list = last_hidden.sum(dim=1) / batch["attention_mask"].sum(dim=1)[..., None]
 
-    return torch_embeddings_list[0].tolist()
+    return last_hidden.sum(dim=1) / batch["attention_mask"].sum(dim=1)[..., None]
+
+
+class EmbeddingService:
+    """Embeds texts with a tokenizer and an embedding model which are loaded once, on first use.
+
+    The service is shared by all threads of the process. The model runs in the evaluation mode
+    and without gradient tracking.
+    """
+
+    def __init__(self,
+                 tokenizer_model_name: str = consts.EMBEDDING_TOKENIZER_MODEL_NAME,
+                 embedding_model_name: str = consts.EMBEDDING_MODEL_NAME):
+        self.tokenizer_model_name = tokenizer_model_name
+        self.embedding_model_name = embedding_model_name
+        self._tokenizer = None
+        self._embedding_model = None
+        self._load_lock = threading.Lock()
+        # Fast tokenizers can't be called from several threads at the same time.
+        self._tokenizer_lock = threading.Lock()
+
+    def _load(self) -> None:
+        with self._load_lock:
+            if self._embedding_model is None:
+                logger.info(f"Loading the {self.embedding_model_name} embedding model ...")
+                tokenizer = _get_tokenizer(self.tokenizer_model_name)
+                embedding_model = _get_text_embedding_model(self.embedding_model_name)
+                if isinstance(embedding_model, torch.nn.Module):
+                    embedding_model.eval()
+                self._tokenizer = tokenizer
+                self._embedding_model = embedding_model
+
+    def embed(self, text: list[str]) -> list[float]:
+        """Returns the embedding of the first text in the list."""
+        return self.embed_batch(text[:1])[0]
+
+    def embed_batch(self,
+                    texts: list[str],
+                    batch_size: int = consts.EMBEDDING_BATCH_SIZE,
+                    max_batch_tokens: int = consts.EMBEDDING_MAX_BATCH_TOKENS) -> list[list[float]]:
+        """Returns one embedding per text, in the order of `texts`.
+
+        Texts are tokenized once, grouped by length and padded per batch, so short texts are not padded
+        to the length of the longest text in the list.
+        """
+        if not texts:
+            return []
+        if self._embedding_model is None:
+            self._load()
+        with self._tokenizer_lock:
+            encodings = self._tokenizer(texts, max_length=512, truncation=True)
+        embeddings = [None] * len(texts)
+        lengths = [len(input_ids) for input_ids in encodings["input_ids"]]
+        for indices in _get_length_buckets(lengths, batch_size, max_batch_tokens):
+            with self._tokenizer_lock:
+                batch = self._tokenizer.pad({key: [encodings[key][i] for i in indices] for key in encodings.keys()},
+                                            return_tensors="pt")
+            with torch.inference_mode(), METRICS.time("embedding_batch_seconds"):
+                batch_embeddings = _get_batch_embeddings(batch, self._embedding_model).tolist()
+            for index, embedding in zip(indices, batch_embeddings):
+                embeddings[index] = embedding
+
+        METRICS.increment("embedded_texts_total", len(texts))
+
+        return embeddings
+
+
+def get_embedding_service() -> EmbeddingService:
+    global EMBEDDING_SERVICE
+    if EMBEDDING_SERVICE is None:
+        with EMBEDDING_SERVICE_LOCK:
+            if EMBEDDING_SERVICE is None:
+                EMBEDDING_SERVICE = EmbeddingService()
+    return EMBEDDING_SERVICE
+
+
+def init_collection(collection_name: str, embedding_dim: int, auto_id_pk: bool,
+                    drop_existing: bool = True) -> Collection:
+    """Creates the collection unless it exists and loads it. An existing collection must have vectors of
+    `embedding_dim` dimensions."""
+    if drop_existing:
+        drop_collection(collection_name)
+    if utility.has_collection(collection_name):
+        collection = Collection(collection_name)
+        collection_embedding_dim = get_collection_embedding_dim(collection)
+        if collection_embedding_dim != embedding_dim:
+            raise EmbeddingDimensionMismatchException(
+                f"The {collection_name} collection has {collection_embedding_dim}-dim vectors, the embedding model "
+                f"creates {embedding_dim}-dim vectors. Migrate the collection with tools/embeddings_migration.py.")
+    else:
+        fields = get_meetings_fields(embedding_dim=embedding_dim, auto_id_pk=auto_id_pk)
+        index = get_meetings_index()
+        collection = create_collection(collection_name, fields, index)
+    collection.load()
 
+    return collection
 
-def init_vectors_store(auto_id_pk: bool) -> None:
-    fields = get_meetings_fields(auto_id_pk=auto_id_pk)
-    index = get_meetings_index()
-    drop_collection(MILVUS_CONFIG.meeting_summaries)
-    collection = create_collection(MILVUS_CONFIG.meeting_summaries, fields, index)
-    collection.load()
+
+def init_vectors_store(auto_id_pk: bool, drop_existing: bool = True) -> None:
+    init_collection(MILVUS_CONFIG.meeting_summaries, get_embedding_dim(consts.EMBEDDING_MODEL_NAME), auto_id_pk,
+                    drop_existing)
 
 
 def insert_meetings(collection_alias: str, meeting_docs_per_person: dict[str, list[str]]) -> None:
     collection = Collection(collection_alias)
-    embeddings = []
-    tokenizer = _get_tokenizer()
-    embedding_model = _get_text_embedding_model()
-    for person, docs in meeting_docs_per_person.items():
-        embedding = _embedding_text(docs, tokenizer, embedding_model)
-        embeddings.append({ "embedding": embedding })
+    # Only the first document of each person is embedded, all of them in one batched call.
+    first_docs = [docs[0] for docs in meeting_docs_per_person.values()]
+    embeddings = [{"embedding": embedding} for embedding in get_embedding_service().embed_batch(first_docs)]
     result = collection.insert(embeddings)
     print(f"Inserted {result.insert_count} meetings.")
 
 
 def insert_meeting_summary(summary: str | list[str]) -> int:
     collection = Collection(MILVUS_CONFIG.meeting_summaries)
-    tokenizer = _get_tokenizer()
-    embedding_model = _get_text_embedding_model()
     input = summary if isinstance(summary, list) else [summary]
-    embedding = _embedding_text(input, tokenizer, embedding_model)
+    embedding = get_embedding_service().embed(input)
     result = collection.insert([{"embedding": embedding}])
     print(f"Inserted {result.insert_count} meetings.")
 
     return result.primary_keys[0]
 
 
+def insert_meeting_summaries(summaries: list[str]) -> list[int]:
+    """Embeds the summaries in batches, inserts them with a single request and returns their primary keys
+    in the order of `summaries`."""
+    if len(summaries) == 0:
+        return []
+    collection = Collection(MILVUS_CONFIG.meeting_summaries)
+    embeddings = get_embedding_service().embed_batch(summaries)
+    with METRICS.time("milvus_insert_seconds"):
+        result = collection.insert([embeddings])
+    logger.info(f"Inserted {result.insert_count} meeting summaries.")
+
+    return list(result.primary_keys)
+
+
+def delete_meeting_summaries(ids: list[int]) -> None:
+    collection = Collection(MILVUS_CONFIG.meeting_summaries)
+    collection.delete(f"id in [{','.join(str(id) for id in ids)}]")
+
+
 def delete_meeting_summary(id: int) -> None:
     collection = Collection(MILVUS_CONFIG.meeting_summaries)
     try:
@@ -131,9 +276,7 @@ def delete_meeting_summary(id: int) -> None:
 
 def search(query: str, limit: int=3) -> SearchResult | SearchFuture:
     collection = Collection(MILVUS_CONFIG.meeting_summaries)
-    tokenizer = _get_tokenizer()
-    embedding_model = _get_text_embedding_model()
-    embedded_text = _embedding_text([query], tokenizer, embedding_model)
+    embedded_text = get_embedding_service().embed([query])
     param = {"metric_type": "COSINE"}
     result = collection.search([embedded_text], param=param, limit=limit, anns_field="embedding")
     return result[0]
@@ -157,9 +300,37 @@ def save_meeting_summaries_embeddings(dest_file_path: str, collection_alias="mee
         fp.write(embeddings_json)
 
 
+def load_meeting_summaries_embeddings_snapshot(snapshot_file_path: str,
+                                               batch_size: int = consts.VECTOR_DB_INSERT_BATCH_SIZE) -> int:
+    collection = Collection(MILVUS_CONFIG.meeting_summaries)
+    rows_count = 0
+    # The snapshot is memory-mapped, so only the rows of the batch being inserted are read from disk.
+    for ids, embeddings in iter_embeddings_snapshot(snapshot_file_path, batch_size):
+        result = collection.insert([ids.tolist(), embeddings.tolist()])
+        rows_count += result.insert_count
+    logger.info(f"Loaded {rows_count} embeddings from {snapshot_file_path}.")
+
+    return rows_count
+
+
+def save_meeting_summaries_embeddings_snapshot(dest_file_path: str, collection_alias="meeting_summaries",
+                                               batch_size: int = consts.VECTOR_DB_INSERT_BATCH_SIZE) -> None:
+    collection = Collection(collection_alias)
+    iterator = collection.query_iterator(batch_size=batch_size, expr="id > 0", output_fields=["embedding"])
+    try:
+        with EmbeddingsSnapshotWriter(dest_file_path, get_collection_embedding_dim(collection)) as writer:
+            while result := iterator.next():
+                writer.write([item["id"] for item in result], [item["embedding"] for item in result])
+    finally:
+        iterator.close()
+
+
 if __name__ == "__main__":
     connect()
-    load_meeting_summaries_embeddings(consts.VECTOR_DB_EMBEDDINGS_FILE_PATH)
+    if os.path.exists(consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH):
+        load_meeting_summaries_embeddings_snapshot(consts.VECTOR_DB_EMBEDDINGS_SNAPSHOT_FILE_PATH)
+    else:
+        load_meeting_summaries_embeddings(consts.VECTOR_DB_EMBEDDINGS_FILE_PATH)
     disconnect()
 
 